@@ -0,0 +1,50 @@
+from .models import ObjectChange
+
+__all__ = (
+    'ObjectChangeQueue',
+)
+
+
+class ObjectChangeQueue:
+    """
+    Buffer ObjectChange records created while performing a bulk operation, so that they can be written in bulk once it
+    has completed. The most recent record for each object is indexed, so that subsequent changes to the object's
+    many-to-many assignments can be merged into it in memory.
+    """
+    def __init__(self):
+        self.records = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def append(self, objectchange):
+        """
+        Queue a new ObjectChange record.
+        """
+        self.records.append(objectchange)
+        key = (objectchange.changed_object_type_id, objectchange.changed_object_id, objectchange.request_id)
+        self.index[key] = objectchange
+
+    def get(self, object_type, object_id, request_id):
+        """
+        Return the most recent ObjectChange queued for the specified object by the given request, if any.
+        """
+        return self.index.get((object_type.pk, object_id, request_id))
+
+    def flush(self):
+        """
+        Write all queued records, then clear the queue.
+        """
+        objectchanges = self.records
+        self.records = []
+        self.index = {}
+
+        # Record the user's name and the object's representation as static strings (see ObjectChange.save())
+        for objectchange in objectchanges:
+            if not objectchange.user_name:
+                objectchange.user_name = objectchange.user.username
+            if not objectchange.object_repr:
+                objectchange.object_repr = str(objectchange.changed_object)
+
+        return ObjectChange.objects.bulk_create(objectchanges, batch_size=1000)
@@ -3,19 +3,21 @@ from threading import local
 
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.db.models import SET_NULL, prefetch_related_objects
 from django.db.models.fields.reverse_related import ManyToManyRel, ManyToOneRel
 from django.db.models.signals import m2m_changed, post_save, pre_delete
 from django.dispatch import receiver, Signal
 from django.core.signals import request_finished
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django_prometheus.models import model_deletes, model_inserts, model_updates
 
 from core.choices import JobStatusChoices, ObjectChangeActionChoices
 from core.events import *
 from extras.events import enqueue_event
-from extras.utils import run_validators
+from extras.utils import is_taggable, run_validators
 from netbox.config import get_config
-from netbox.context import current_request, events_queue
+from netbox.context import changelog_queue, current_request, events_queue
 from netbox.models.features import ChangeLoggingMixin
 from utilities.exceptions import AbortRequest
 from .models import ConfigRevision, DataSource, ObjectChange
@@ -82,9 +84,15 @@ def handle_changed_object(sender, instance, **kwargs):
         OBJECT_DELETED: ObjectChangeActionChoices.ACTION_DELETE,
     }[event_type]
     objectchange = instance.to_objectchange(action)
+    changelog = changelog_queue.get()
     # If this is a many-to-many field change, check for a previous ObjectChange instance recorded
-    # for this object by this request and update it
-    if m2m_changed and (
+    # for this object by this request and update it. If change records are being queued, the
+    # previous record is updated in memory.
+    if m2m_changed and changelog is not None and (
+        prev_change := changelog.get(ContentType.objects.get_for_model(instance), instance.pk, request.id)
+    ):
+        prev_change.postchange_data = objectchange.postchange_data
+    elif m2m_changed and (
         prev_change := ObjectChange.objects.filter(
             changed_object_type=ContentType.objects.get_for_model(instance),
             changed_object_id=instance.pk,
@@ -96,11 +104,14 @@ def handle_changed_object(sender, instance, **kwargs):
     elif objectchange and objectchange.has_changes:
         objectchange.user = request.user
         objectchange.request_id = request.id
-        objectchange.save()
+        if changelog is not None:
+            changelog.append(objectchange)
+        else:
+            objectchange.save()
 
     # Ensure that we're working with fresh M2M assignments
-    if m2m_changed:
-        instance.refresh_from_db()
+    if m2m_changed and hasattr(instance, '_prefetched_objects_cache'):
+        instance._prefetched_objects_cache.clear()
 
     # Enqueue the object for event processing
     queue = events_queue.get()
@@ -153,38 +164,26 @@ def handle_deleted_object(sender, instance, **kwargs):
         objectchange = instance.to_objectchange(ObjectChangeActionChoices.ACTION_DELETE)
         objectchange.user = request.user
         objectchange.request_id = request.id
-        objectchange.save()
+        if (changelog := changelog_queue.get()) is not None:
+            changelog.append(objectchange)
+        else:
+            objectchange.save()
 
     # Django does not automatically send an m2m_changed signal for the reverse direction of a
-    # many-to-many relationship (see https://code.djangoproject.com/ticket/17688), so we need to
-    # trigger one manually. We do this by checking for any reverse M2M relationships on the
-    # instance being deleted, and explicitly call .remove() on the remote M2M field to delete
-    # the association. This triggers an m2m_changed signal with the `post_remove` action type
-    # for the forward direction of the relationship, ensuring that the change is recorded.
-    # Similarly, for many-to-one relationships, we set the value on the related object to None
-    # and save it to trigger a change record on that object.
+    # many-to-many relationship (see https://code.djangoproject.com/ticket/17688), and nullifies
+    # many-to-one references (SET_NULL) without saving the referring objects. To ensure that
+    # these changes are recorded, we remove the associations and nullify the references on all
+    # related objects in bulk, and record the resulting change to each object.
     for relation in instance._meta.related_objects:
         if type(relation) not in [ManyToManyRel, ManyToOneRel]:
             continue
-        related_model = relation.related_model
-        related_field_name = relation.remote_field.name
-        if not issubclass(related_model, ChangeLoggingMixin):
-            # We only care about triggering the m2m_changed signal for models which support
-            # change logging
+        if not issubclass(relation.related_model, ChangeLoggingMixin):
+            # We only care about recording changes for models which support change logging
             continue
-        for obj in related_model.objects.filter(**{related_field_name: instance.pk}):
-            obj.snapshot()  # Ensure the change record includes the "before" state
-            if type(relation) is ManyToManyRel:
-                getattr(obj, related_field_name).remove(instance)
-            elif type(relation) is ManyToOneRel and relation.field.null is True:
-                setattr(obj, related_field_name, None)
-                # make sure the object hasn't been deleted - in case of
-                # deletion chaining of related objects
-                try:
-                    obj.refresh_from_db()
-                except DoesNotExist:
-                    continue
-                obj.save()
+        if type(relation) is ManyToManyRel:
+            remove_related_objects(instance, relation, request)
+        elif relation.on_delete is SET_NULL:
+            nullify_related_objects(instance, relation, request)
 
     # Enqueue the object for event processing
     queue = events_queue.get()
@@ -195,6 +194,99 @@ def handle_deleted_object(sender, instance, **kwargs):
     model_deletes.labels(instance._meta.model_name).inc()
 
 
+def get_related_objects(instance, relation, *prefetch):
+    """
+    Retrieve all change-logged objects which reference the given instance via a reverse relation (excluding any which
+    are being deleted by the current request), and snapshot their current state.
+    """
+    related_model = relation.related_model
+    queryset = related_model.objects.filter(**{relation.remote_field.name: instance.pk})
+    if is_taggable(related_model):
+        prefetch = (*prefetch, 'tags')
+    object_type = ContentType.objects.get_for_model(related_model)
+    deleted = getattr(_signals_received, 'pre_delete', set())
+    objects = [
+        obj for obj in queryset.prefetch_related(*prefetch) if (object_type, obj.pk) not in deleted
+    ]
+    for obj in objects:
+        obj.snapshot()  # Ensure the change record includes the "before" state
+    return objects
+
+
+def remove_related_objects(instance, relation, request):
+    """
+    Remove the given instance from a many-to-many field on all objects to which it is assigned, using a single query,
+    and record the change to each object.
+    """
+    field = relation.remote_field
+    if not (objects := get_related_objects(instance, relation, field.name)):
+        return
+
+    field.remote_field.through.objects.filter(**{
+        f'{field.m2m_field_name()}__in': [obj.pk for obj in objects],
+        field.m2m_reverse_field_name(): instance.pk,
+    }).delete()
+
+    # Refresh the prefetched assignments on all objects to reflect the removal
+    for obj in objects:
+        obj._prefetched_objects_cache.pop(field.name, None)
+    prefetch_related_objects(objects, field.name)
+
+    record_related_changes(objects, request)
+
+
+def nullify_related_objects(instance, relation, request):
+    """
+    Nullify a foreign key referencing the given instance on all related objects, using a single query, and record the
+    change to each object.
+    """
+    field = relation.remote_field
+    if not (objects := get_related_objects(instance, relation)):
+        return
+
+    updates = {field.name: None}
+    if any(f.name == 'last_updated' for f in relation.related_model._meta.concrete_fields):
+        updates['last_updated'] = timezone.now()
+    relation.related_model.objects.filter(pk__in=[obj.pk for obj in objects]).update(**updates)
+    for obj in objects:
+        for name, value in updates.items():
+            setattr(obj, name, value)
+
+    record_related_changes(objects, request)
+
+
+def record_related_changes(objects, request):
+    """
+    Record an ObjectChange and enqueue an update event for each of the given objects, which have been modified in bulk.
+    """
+    changelog = changelog_queue.get()
+    objectchanges = []
+    for obj in objects:
+        objectchange = obj.to_objectchange(ObjectChangeActionChoices.ACTION_UPDATE)
+        object_type = ContentType.objects.get_for_model(obj)
+        # Merge the change into any record already queued for this object by this request
+        if changelog is not None and (prev_change := changelog.get(object_type, obj.pk, request.id)):
+            prev_change.postchange_data = objectchange.postchange_data
+        elif objectchange.has_changes:
+            objectchange.user = request.user
+            objectchange.user_name = request.user.username
+            objectchange.request_id = request.id
+            if changelog is not None:
+                changelog.append(objectchange)
+            else:
+                objectchanges.append(objectchange)
+    ObjectChange.objects.bulk_create(objectchanges)
+
+    # Enqueue the objects for event processing
+    queue = events_queue.get()
+    for obj in objects:
+        enqueue_event(queue, obj, request.user, request.id, OBJECT_UPDATED)
+    events_queue.set(queue)
+
+    # Increment metric counters
+    model_updates.labels(objects[0]._meta.model_name).inc(len(objects))
+
+
 @receiver(request_finished)
 def clear_signal_history(sender, **kwargs):
     """
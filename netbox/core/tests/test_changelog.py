@@ -1,5 +1,8 @@
+import uuid
+
 from django.contrib.contenttypes.models import ContentType
-from django.test import override_settings
+from django.db import transaction
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from rest_framework import status
 
@@ -9,8 +12,10 @@ from dcim.choices import SiteStatusChoices
 from dcim.models import Site, CableTermination, Device, DeviceType, DeviceRole, Interface, Cable
 from extras.choices import *
 from extras.models import CustomField, CustomFieldChoiceSet, Tag
+from ipam.models import VLAN
+from netbox.context_managers import deferred_change_logging, event_tracking
 from utilities.testing import APITestCase
-from utilities.testing.utils import create_tags, post_data
+from utilities.testing.utils import create_tags, create_test_device, post_data
 from utilities.testing.views import ModelViewTestCase
 from dcim.models import Manufacturer
 
@@ -622,3 +627,83 @@ class ChangeLogAPITest(APITestCase):
         self.assertEqual(objectchange.prechange_data['name'], 'Site 1')
         self.assertEqual(objectchange.prechange_data['slug'], 'site-1')
         self.assertEqual(objectchange.postchange_data, None)
+
+    def test_delete_object_with_related_objects(self):
+        vlans = VLAN.objects.bulk_create((
+            VLAN(name='VLAN 1', vid=1),
+            VLAN(name='VLAN 2', vid=2),
+        ))
+        device = create_test_device('Device 1')
+        interfaces = Interface.objects.bulk_create([
+            Interface(device=device, name=f'Interface {i}', mode='tagged', untagged_vlan=vlans[0]) for i in range(3)
+        ])
+        for interface in interfaces:
+            interface.tagged_vlans.set(vlans)
+
+        self.add_permissions('ipam.delete_vlan')
+        url = reverse('ipam-api:vlan-detail', kwargs={'pk': vlans[0].pk})
+        response = self.client.delete(url, **self.header)
+        self.assertHttpStatus(response, status.HTTP_204_NO_CONTENT)
+
+        # An update should be recorded for each interface, reflecting the removal of both the untagged and tagged
+        # VLAN assignments
+        objectchanges = ObjectChange.objects.filter(
+            changed_object_type=ContentType.objects.get_for_model(Interface),
+            action=ObjectChangeActionChoices.ACTION_UPDATE
+        )
+        self.assertEqual(objectchanges.count(), 3)
+        for objectchange in objectchanges:
+            self.assertEqual(objectchange.prechange_data['untagged_vlan'], vlans[0].pk)
+            self.assertEqual(objectchange.prechange_data['tagged_vlans'], [vlans[0].pk, vlans[1].pk])
+            self.assertIsNone(objectchange.postchange_data['untagged_vlan'])
+            self.assertEqual(objectchange.postchange_data['tagged_vlans'], [vlans[1].pk])
+        for interface in Interface.objects.all():
+            self.assertIsNone(interface.untagged_vlan)
+            self.assertEqual(list(interface.tagged_vlans.all()), [vlans[1]])
+
+
+class DeferredChangeLoggingTest(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Tag.objects.bulk_create((
+            Tag(name='Tag 1', slug='tag-1'),
+            Tag(name='Tag 2', slug='tag-2'),
+        ))
+
+    def test_deferred_change_logging(self):
+        request = RequestFactory().get(reverse('dcim:site_add'))
+        request.id = uuid.uuid4()
+        request.user = self.user
+
+        with event_tracking(request), deferred_change_logging():
+            site = Site.objects.create(name='Site 1', slug='site-1')
+            site.tags.set(Tag.objects.all())
+
+            # No records should be written until the context has exited
+            self.assertEqual(ObjectChange.objects.count(), 0)
+
+        # The M2M change should be merged into the creation record
+        objectchange = ObjectChange.objects.get()
+        self.assertEqual(objectchange.changed_object, site)
+        self.assertEqual(objectchange.action, ObjectChangeActionChoices.ACTION_CREATE)
+        self.assertEqual(objectchange.request_id, request.id)
+        self.assertEqual(objectchange.user_name, self.user.username)
+        self.assertEqual(objectchange.object_repr, 'Site 1')
+        self.assertEqual(objectchange.postchange_data['tags'], ['Tag 1', 'Tag 2'])
+
+    def test_deferred_change_logging_rollback(self):
+        request = RequestFactory().get(reverse('dcim:site_add'))
+        request.id = uuid.uuid4()
+        request.user = self.user
+
+        # Records queued within a transaction which is rolled back should be discarded along with it
+        with event_tracking(request):
+            try:
+                with transaction.atomic(), deferred_change_logging():
+                    Site.objects.create(name='Site 1', slug='site-1')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertFalse(Site.objects.exists())
+        self.assertEqual(ObjectChange.objects.count(), 0)
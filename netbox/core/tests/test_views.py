@@ -1,7 +1,11 @@
+import tempfile
 import urllib.parse
 import uuid
 from datetime import datetime
 
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from django_rq import get_queue
@@ -139,6 +143,32 @@ class ObjectChangeTestCase(TestCase):
         self.assertHttpStatus(response, 200)
 
 
+class JobTestCase(TestCase):
+
+    def test_job_download(self):
+        job_id = uuid.uuid4()
+        other_user = User.objects.create_user(username='testuser2')
+        with tempfile.TemporaryDirectory() as export_root, override_settings(EXPORT_FILES_ROOT=export_root):
+            path = storages['exports'].save(f'{job_id}/sites.txt', ContentFile(b'Site 1'))
+            job = Job.objects.create(name='Export Template 1', job_id=job_id, user=other_user, data={'file': path})
+            url = reverse('core:job_download', kwargs={'pk': job.pk})
+
+            # The file may not be downloaded by another user without permission to view the job
+            self.assertHttpStatus(self.client.get(url), 404)
+
+            # The file may be downloaded by the user who requested the job
+            job.user = self.user
+            job.save()
+            response = self.client.get(url)
+            self.assertHttpStatus(response, 200)
+            self.assertEqual(b''.join(response.streaming_content), b'Site 1')
+            response.close()
+
+            # Paths outside the job's output directory may not be downloaded
+            Job.objects.filter(pk=job.pk).update(data={'file': f'{uuid.uuid4()}/sites.txt'})
+            self.assertHttpStatus(self.client.get(url), 404)
+
+
 class BackgroundTaskTestCase(TestCase):
     user_permissions = ()
 
@@ -1,4 +1,5 @@
 import json
+import os
 import platform
 
 from django import __version__ as DJANGO_VERSION
@@ -6,8 +7,9 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.core.cache import cache
+from django.core.files.storage import storages
 from django.db import connection, ProgrammingError
-from django.http import HttpResponse, HttpResponseForbidden, Http404
+from django.http import FileResponse, HttpResponse, HttpResponseForbidden, Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -21,6 +23,7 @@ from rq.worker import Worker
 from rq.worker_registration import clean_worker_registry
 
 from core.utils import delete_rq_job, enqueue_rq_job, get_rq_jobs_from_status, requeue_rq_job, stop_rq_job
+from extras.jobs import ExportTemplateJob
 from netbox.config import get_config, PARAMS
 from netbox.registry import registry
 from netbox.views import generic
@@ -31,7 +34,9 @@ from utilities.forms import ConfirmationForm
 from utilities.htmx import htmx_partial
 from utilities.json import ConfigJSONEncoder
 from utilities.query import count_related
-from utilities.views import ContentTypePermissionRequiredMixin, GetRelatedModelsMixin, register_model_view
+from utilities.views import (
+    ConditionalLoginRequiredMixin, ContentTypePermissionRequiredMixin, GetRelatedModelsMixin, register_model_view,
+)
 from . import filtersets, forms, tables
 from .jobs import SyncDataSourceJob
 from .models import *
@@ -176,6 +181,25 @@ class JobView(generic.ObjectView):
     queryset = Job.objects.all()
 
 
+@register_model_view(Job, 'download')
+class JobDownloadView(ConditionalLoginRequiredMixin, View):
+    """
+    Download the file rendered by an export template job. The file may be retrieved only by the user who requested the
+    job, or by a user permitted to view the job.
+    """
+    def get(self, request, pk):
+        job = get_object_or_404(Job, pk=pk)
+        if job.user != request.user and not Job.objects.restrict(request.user, 'view').filter(pk=pk).exists():
+            raise Http404
+
+        path = job.data.get('file') if isinstance(job.data, dict) else None
+        storage = storages['exports']
+        if not path or not path.startswith(ExportTemplateJob.get_output_path(job.job_id)) or not storage.exists(path):
+            raise Http404
+
+        return FileResponse(storage.open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
+
+
 @register_model_view(Job, 'delete')
 class JobDeleteView(generic.ObjectDeleteView):
     queryset = Job.objects.defer('data')
@@ -232,7 +232,7 @@ class ConsoleServerPortTemplateType(ModularComponentTemplateType):
 
 @strawberry_django.type(
     models.Device,
-    fields='__all__',
+    exclude=['_config_context_data'],
     filters=DeviceFilter,
     pagination=True
 )
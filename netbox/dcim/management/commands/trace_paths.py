@@ -1,10 +1,15 @@
-from django.core.management.base import BaseCommand
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
 from django.core.management.color import no_style
-from django.db import connection
-from django.db.models import Q
+from django.db import connection, transaction
+from django.db.models import Count, Q
 
 from dcim.models import CablePath, ConsolePort, ConsoleServerPort, Interface, PowerFeed, PowerOutlet, PowerPort
-from dcim.signals import create_cablepath
+from dcim.tracing import CableGraph
+from dcim.utils import bulk_create_cablepaths
+from utilities.parallel import iterate_pks, run_parallel
 
 ENDPOINT_MODELS = (
     ConsolePort,
@@ -16,6 +21,77 @@ ENDPOINT_MODELS = (
 )
 
 
+def get_partition_field(model):
+    """
+    Return the field by which origins of the given model are partitioned among tasks: the parent device of a device
+    component, or the power panel of a power feed.
+    """
+    return 'power_panel' if model is PowerFeed else 'device'
+
+
+def get_origins(model, missing_only=False):
+    """
+    Return all cabled (or wirelessly linked) origins of the given model, optionally limited to those with no path.
+    """
+    params = Q(cable__isnull=False)
+    if hasattr(model, 'wireless_link'):
+        params |= Q(wireless_link__isnull=False)
+    origins = model.objects.filter(params)
+    if missing_only:
+        origins = origins.filter(_path__isnull=True)
+    return origins
+
+
+def compare_cablepath(cablepath, stored_path):
+    """
+    Compare a newly traced CablePath (or None) with the CablePath currently stored for its origin. Returns a
+    description of the discrepancy, or None if the two match.
+    """
+    if cablepath is None:
+        return 'stored path should not exist' if stored_path is not None else None
+    if stored_path is None:
+        return 'path is missing'
+    for attr in ('path', 'is_active', 'is_complete', 'is_split'):
+        if getattr(cablepath, attr) != getattr(stored_path, attr):
+            return f'stored path differs ({attr})'
+    return None
+
+
+def trace_origins(label, parent_ids, chunk_size, missing_only=False, verify=False):
+    """
+    Trace the paths from all origins of the given model belonging to the specified parent objects (see
+    get_partition_field()). Origins are retrieved in chunks, and the topology reachable from each chunk is loaded
+    into a CableGraph against which all of its paths are traced. The new CablePaths are then created in bulk.
+
+    If verify is True, each traced path is instead compared with that currently stored for its origin, and nothing
+    is written. Returns the label, the number of origins traced, and a list of (origin ID, discrepancy) tuples.
+    """
+    model = apps.get_model(label)
+    origins = get_origins(model, missing_only=missing_only).filter(**{
+        f'{get_partition_field(model)}__in': parent_ids
+    })
+    origin_count = 0
+    mismatches = []
+
+    for pks in iterate_pks(origins, chunk_size=chunk_size):
+        chunk = list(model.objects.filter(pk__in=pks).order_by('pk'))
+        graph = CableGraph()
+        graph.preload(chunk)
+        cablepaths = {obj.pk: CablePath.from_origin([obj], graph=graph) for obj in chunk}
+        origin_count += len(chunk)
+
+        if verify:
+            stored_paths = CablePath.objects.in_bulk([obj._path_id for obj in chunk if obj._path_id])
+            for obj in chunk:
+                if mismatch := compare_cablepath(cablepaths[obj.pk], stored_paths.get(obj._path_id)):
+                    mismatches.append((obj.pk, mismatch))
+        else:
+            with transaction.atomic():
+                bulk_create_cablepaths(cp for cp in cablepaths.values() if cp is not None)
+
+    return label, origin_count, mismatches
+
+
 class Command(BaseCommand):
     help = "Generate any missing cable paths among all cable termination objects in NetBox"
 
@@ -24,10 +100,22 @@ class Command(BaseCommand):
             "--force", action='store_true', dest='force',
             help="Force recalculation of all existing cable paths"
         )
+        parser.add_argument(
+            "--verify", "--dry-run", action='store_true', dest='verify',
+            help="Trace all paths and report any which differ from those stored, without modifying them"
+        )
         parser.add_argument(
             "--no-input", action='store_true', dest='no_input',
             help="Do not prompt user for any input/confirmation"
         )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Number of worker processes among which devices are divided (default: 1)"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000,
+            help="Number of origins for which paths are traced and written together (default: 1000)"
+        )
 
     def draw_progress_bar(self, percentage):
         """
@@ -36,7 +124,28 @@ class Command(BaseCommand):
         bar_size = int(percentage / 5)
         self.stdout.write(f"\r  [{'#' * bar_size}{' ' * (20 - bar_size)}] {int(percentage)}%", ending='')
 
+    @staticmethod
+    def get_partitions(origins, partition_field, size):
+        """
+        Divide origins by their parent objects into groups of roughly the specified size. Each group is traced as a
+        single task.
+        """
+        partitions = [[]]
+        count = 0
+        parent_counts = origins.order_by().values_list(partition_field).annotate(
+            count=Count('pk')
+        ).order_by(f'{partition_field}_id')
+        for parent_id, parent_count in parent_counts:
+            if count >= size:
+                partitions.append([])
+                count = 0
+            partitions[-1].append(parent_id)
+            count += parent_count
+        return [partition for partition in partitions if partition]
+
     def handle(self, *model_names, **options):
+        if options['force'] and options['verify']:
+            raise CommandError("--force and --verify are mutually exclusive.")
 
         # If --force was passed, first delete all existing CablePaths
         if options['force']:
@@ -66,25 +175,47 @@ class Command(BaseCommand):
                 for sql in sequence_sql:
                     cursor.execute(sql)
 
-        # Retrace paths
+        # Retrace paths (or verify existing paths)
+        missing_only = not (options['force'] or options['verify'])
+        start_time = time.monotonic()
+        total_count = 0
+        mismatch_count = 0
         for model in ENDPOINT_MODELS:
-            params = Q(cable__isnull=False)
-            if hasattr(model, 'wireless_link'):
-                params |= Q(wireless_link__isnull=False)
-            origins = model.objects.filter(params)
-            if not options['force']:
-                origins = origins.filter(_path__isnull=True)
+            label = f'{model._meta.app_label}.{model._meta.model_name}'
+            origins = get_origins(model, missing_only=missing_only)
             origins_count = origins.count()
             if not origins_count:
                 self.stdout.write(f'Found no missing {model._meta.verbose_name} paths; skipping')
                 continue
-            self.stdout.write(f'Retracing {origins_count} cabled {model._meta.verbose_name_plural}...')
+            action = 'Verifying' if options['verify'] else 'Retracing'
+            self.stdout.write(f'{action} {origins_count} cabled {model._meta.verbose_name_plural}...')
+
+            tasks = [
+                (label, parent_ids, options['chunk_size'], missing_only, options['verify'])
+                for parent_ids in self.get_partitions(origins, get_partition_field(model), options['chunk_size'])
+            ]
             i = 0
-            for i, obj in enumerate(origins, start=1):
-                create_cablepath([obj])
-                if not i % 100:
-                    self.draw_progress_bar(i * 100 / origins_count)
+            mismatches = []
+            for _, count, task_mismatches in run_parallel(trace_origins, tasks, workers=options['workers']):
+                i += count
+                mismatches.extend(task_mismatches)
+                self.draw_progress_bar(min(i * 100 / origins_count, 100))
             self.draw_progress_bar(100)
-            self.stdout.write(self.style.SUCCESS(f'\n  Retraced {i} {model._meta.verbose_name_plural}'))
 
+            if options['verify']:
+                self.stdout.write(f'\n  Verified {i} {model._meta.verbose_name_plural}')
+                for pk, mismatch in sorted(mismatches):
+                    self.stdout.write(self.style.ERROR(f'  {model._meta.verbose_name} {pk}: {mismatch}'))
+                mismatch_count += len(mismatches)
+            else:
+                self.stdout.write(self.style.SUCCESS(f'\n  Retraced {i} {model._meta.verbose_name_plural}'))
+            total_count += i
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(
+            f'Traced {total_count} paths in {elapsed:.1f} seconds '
+            f'({total_count / elapsed if elapsed else 0:.0f} paths/sec).'
+        )
+        if options['verify'] and mismatch_count:
+            self.stdout.write(self.style.ERROR(f'Found {mismatch_count} paths which differ from those stored.'))
         self.stdout.write(self.style.SUCCESS('Finished.'))
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dcim', '0211_cablepath_nodes_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='device',
+            name='_config_context_data',
+            field=models.JSONField(blank=True, editable=False, null=True, serialize=False),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import itertools
 
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import ValidationError
 from django.db import models
 from django.dispatch import Signal
@@ -10,7 +11,7 @@ from core.models import ObjectType
 from dcim.choices import *
 from dcim.constants import *
 from dcim.fields import PathField
-from dcim.utils import decompile_path_node, object_to_path_node
+from dcim.utils import compile_path_node, decompile_path_node, object_to_path_node
 from netbox.choices import ColorChoices
 from netbox.models import ChangeLoggedModel, PrimaryModel
 from utilities.conversion import to_meters
@@ -467,6 +468,10 @@ class CablePath(models.Model):
     _netbox_private = True
 
     class Meta:
+        indexes = (
+            # Enables efficient retrieval of all paths which traverse a given node (see the PathContains lookup)
+            GinIndex(fields=['_nodes'], name='dcim_cablepath_nodes'),
+        )
         verbose_name = _('cable path')
         verbose_name_plural = _('cable paths')
 
@@ -530,19 +535,29 @@ class CablePath(models.Model):
         return int(len(self.path) / 3)
 
     @classmethod
-    def from_origin(cls, terminations):
+    def from_origin(cls, terminations, graph=None):
         """
         Create a new CablePath instance as traced from the given termination objects. These can be any object to which a
         Cable or WirelessLink connects (interfaces, console ports, circuit termination, etc.). All terminations must be
         of the same type and must belong to the same parent object.
+
+        Cables, terminations, and port mappings are resolved via a CableGraph. A graph which has been preloaded for many
+        origins (see CableGraph.preload()) may be passed to trace each of them without further database queries;
+        otherwise, objects are retrieved in bulk as each hop is traced.
         """
-        from circuits.models import CircuitTermination
+        from circuits.models import CircuitTermination, ProviderNetwork
+        from dcim.tracing import CableGraph
 
         if not terminations:
             return None
 
+        if graph is None:
+            graph = CableGraph()
+
         # Ensure all originating terminations are attached to the same link
-        if len(terminations) > 1 and not all(t.link == terminations[0].link for t in terminations[1:]):
+        if len(terminations) > 1 and not all(
+            graph.get_link(t) == graph.get_link(terminations[0]) for t in terminations[1:]
+        ):
             raise UnsupportedCablePath(_("All originating terminations must be attached to the same link"))
 
         path = []
@@ -559,12 +574,12 @@ class CablePath(models.Model):
 
             # All mid-span terminations must all be attached to the same device
             if (not isinstance(terminations[0], PathEndpoint) and not
-                    all(t.parent_object == terminations[0].parent_object for t in terminations[1:])):
+                    all(graph.get_parent_id(t) == graph.get_parent_id(terminations[0]) for t in terminations[1:])):
                 raise UnsupportedCablePath(_("All mid-span terminations must have the same parent object"))
 
             # Check for a split path (e.g. rear port fanning out to multiple front ports with
             # different cables attached)
-            if len(set(t.link for t in terminations)) > 1 and (
+            if len(set(graph.get_link(t) for t in terminations)) > 1 and (
                     position_stack and len(terminations) != len(position_stack[-1])
             ):
                 is_split = True
@@ -576,7 +591,7 @@ class CablePath(models.Model):
             ])
 
             # Step 2: Determine the attached links (Cable or WirelessLink), if any
-            links = [termination.link for termination in terminations if termination.link is not None]
+            links = [link for t in terminations if (link := graph.get_link(t)) is not None]
             if len(links) == 0:
                 if len(path) == 1:
                     # If this is the start of the path and no link exists, return None
@@ -589,8 +604,7 @@ class CablePath(models.Model):
                 raise UnsupportedCablePath(_("All links must match first link type"))
 
             # Step 3: Record asymmetric paths as split
-            not_connected_terminations = [termination.link for termination in terminations if termination.link is None]
-            if len(not_connected_terminations) > 0:
+            if len(links) < len(terminations):
                 is_complete = False
                 is_split = True
 
@@ -602,34 +616,19 @@ class CablePath(models.Model):
             path.append(cables)
 
             # Step 5: Update the path status if a link is not connected
-            links_status = [link.status for link in links if link.status != LinkStatusChoices.STATUS_CONNECTED]
-            if any([status != LinkStatusChoices.STATUS_CONNECTED for status in links_status]):
+            if any(link.status != LinkStatusChoices.STATUS_CONNECTED for link in links):
                 is_active = False
 
             # Step 6: Determine the far-end terminations
             if isinstance(links[0], Cable):
-                termination_type = ObjectType.objects.get_for_model(terminations[0])
-                local_cable_terminations = CableTermination.objects.filter(
-                    termination_type=termination_type,
-                    termination_id__in=[t.pk for t in terminations]
-                )
-
-                q_filter = Q()
-                for lct in local_cable_terminations:
-                    cable_end = 'A' if lct.cable_end == 'B' else 'B'
-                    q_filter |= Q(cable=lct.cable, cable_end=cable_end)
+                remote_terminations = graph.get_far_end_terminations(terminations)
 
-                # Make sure this filter has been populated; if not, we have probably been given invalid data
-                if not q_filter:
+                # Make sure cable terminations were found; if not, we have probably been given invalid data
+                if remote_terminations is None:
                     break
-
-                remote_cable_terminations = CableTermination.objects.filter(q_filter)
-                remote_terminations = [ct.termination for ct in remote_cable_terminations]
             else:
                 # WirelessLink
-                remote_terminations = [
-                    link.interface_b if link.interface_a is terminations[0] else link.interface_a for link in links
-                ]
+                remote_terminations = [graph.get_wireless_peer(link, terminations[0]) for link in links]
 
             # Remote Terminations must all be of the same type, otherwise return a split path
             if not all(isinstance(t, type(remote_terminations[0])) for t in remote_terminations[1:]):
@@ -648,9 +647,7 @@ class CablePath(models.Model):
 
             if isinstance(remote_terminations[0], FrontPort):
                 # Follow FrontPorts to their corresponding RearPorts
-                rear_ports = RearPort.objects.filter(
-                    pk__in=[t.rear_port_id for t in remote_terminations]
-                )
+                rear_ports = graph.get_rear_ports(remote_terminations)
                 if len(rear_ports) > 1 or rear_ports[0].positions > 1:
                     position_stack.append([fp.rear_port_position for fp in remote_terminations])
 
@@ -658,10 +655,9 @@ class CablePath(models.Model):
 
             elif isinstance(remote_terminations[0], RearPort):
                 if len(remote_terminations) == 1 and remote_terminations[0].positions == 1:
-                    front_ports = FrontPort.objects.filter(
-                        rear_port_id__in=[rp.pk for rp in remote_terminations],
-                        rear_port_position=1
-                    )
+                    front_ports = [
+                        fp for fp in graph.get_front_ports(remote_terminations) if fp.rear_port_position == 1
+                    ]
                 # Obtain the individual front ports based on the termination and all positions
                 elif len(remote_terminations) > 1 and position_stack:
                     positions = position_stack.pop()
@@ -673,22 +669,26 @@ class CablePath(models.Model):
                         )
 
                     # Get our front ports
-                    q_filter = Q()
+                    rear_port_positions = set()
                     for rt in remote_terminations:
                         position = positions.pop()
-                        q_filter |= Q(rear_port_id=rt.pk, rear_port_position=position)
-                    if q_filter is Q():
+                        rear_port_positions.add((rt.pk, position))
+                    if not rear_port_positions:
                         raise UnsupportedCablePath(_("Remote termination position filter is missing"))
-                    front_ports = FrontPort.objects.filter(q_filter)
+                    front_ports = [
+                        fp for fp in graph.get_front_ports(remote_terminations)
+                        if (fp.rear_port_id, fp.rear_port_position) in rear_port_positions
+                    ]
                 # Obtain the individual front ports based on the termination and position
                 elif position_stack:
-                    front_ports = FrontPort.objects.filter(
-                        rear_port_id=remote_terminations[0].pk,
-                        rear_port_position__in=position_stack.pop()
-                    )
+                    positions = position_stack.pop()
+                    front_ports = [
+                        fp for fp in graph.get_front_ports(remote_terminations[:1])
+                        if fp.rear_port_position in positions
+                    ]
                 # If all rear ports have a single position, we can just get the front ports
                 elif all([rp.positions == 1 for rp in remote_terminations]):
-                    front_ports = FrontPort.objects.filter(rear_port_id__in=[rp.pk for rp in remote_terminations])
+                    front_ports = graph.get_front_ports(remote_terminations)
 
                     if len(front_ports) != len(remote_terminations):
                         # Some rear ports does not have a front port
@@ -706,25 +706,28 @@ class CablePath(models.Model):
                 if len(remote_terminations) > 1:
                     is_split = True
                     break
-                circuit_termination = CircuitTermination.objects.filter(
-                    circuit=remote_terminations[0].circuit,
-                    term_side='Z' if remote_terminations[0].term_side == 'A' else 'A'
-                ).first()
+                circuit_termination = graph.get_circuit_peer(remote_terminations[0])
                 if circuit_termination is None:
                     break
-                elif circuit_termination._provider_network:
+                elif circuit_termination._provider_network_id:
                     # Circuit terminates to a ProviderNetwork
                     path.extend([
                         [object_to_path_node(circuit_termination)],
-                        [object_to_path_node(circuit_termination._provider_network)],
+                        [compile_path_node(
+                            ObjectType.objects.get_for_model(ProviderNetwork).pk,
+                            circuit_termination._provider_network_id
+                        )],
                     ])
                     is_complete = True
                     break
-                elif circuit_termination.termination and not circuit_termination.cable:
+                elif circuit_termination.termination_id and not circuit_termination.cable_id:
                     # Circuit terminates to a Region/Site/etc.
                     path.extend([
                         [object_to_path_node(circuit_termination)],
-                        [object_to_path_node(circuit_termination.termination)],
+                        [compile_path_node(
+                            circuit_termination.termination_type_id,
+                            circuit_termination.termination_id
+                        )],
                     ])
                     break
 
@@ -27,6 +27,7 @@ from netbox.config import ConfigItem
 from netbox.models import NestedGroupModel, OrganizationalModel, PrimaryModel
 from netbox.models.mixins import WeightMixin
 from netbox.models.features import ContactsMixin, ImageAttachmentsMixin
+from utilities.counters import deferred_counter_updates
 from utilities.fields import ColorField, CounterCacheField
 from utilities.prefetch import get_prefetchable_fields
 from utilities.tracking import TrackingModelMixin
@@ -966,20 +967,22 @@ class Device(
 
         # If this is a new Device, instantiate all the related components per the DeviceType definition
         if is_new:
-            self._instantiate_components(self.device_type.consoleporttemplates.all())
-            self._instantiate_components(self.device_type.consoleserverporttemplates.all())
-            self._instantiate_components(self.device_type.powerporttemplates.all())
-            self._instantiate_components(self.device_type.poweroutlettemplates.all())
-            self._instantiate_components(self.device_type.interfacetemplates.all())
-            self._instantiate_components(self.device_type.rearporttemplates.all())
-            self._instantiate_components(self.device_type.frontporttemplates.all())
-            # Disable bulk_create to accommodate MPTT
-            self._instantiate_components(self.device_type.modulebaytemplates.all(), bulk_create=False)
-            self._instantiate_components(self.device_type.devicebaytemplates.all())
-            # Disable bulk_create to accommodate MPTT
-            self._instantiate_components(self.device_type.inventoryitemtemplates.all(), bulk_create=False)
-            # Interface bridges have to be set after interface instantiation
-            update_interface_bridges(self, self.device_type.interfacetemplates.all())
+            # Apply counter updates once per parent object rather than once per component
+            with deferred_counter_updates():
+                self._instantiate_components(self.device_type.consoleporttemplates.all())
+                self._instantiate_components(self.device_type.consoleserverporttemplates.all())
+                self._instantiate_components(self.device_type.powerporttemplates.all())
+                self._instantiate_components(self.device_type.poweroutlettemplates.all())
+                self._instantiate_components(self.device_type.interfacetemplates.all())
+                self._instantiate_components(self.device_type.rearporttemplates.all())
+                self._instantiate_components(self.device_type.frontporttemplates.all())
+                # Disable bulk_create to accommodate MPTT
+                self._instantiate_components(self.device_type.modulebaytemplates.all(), bulk_create=False)
+                self._instantiate_components(self.device_type.devicebaytemplates.all())
+                # Disable bulk_create to accommodate MPTT
+                self._instantiate_components(self.device_type.inventoryitemtemplates.all(), bulk_create=False)
+                # Interface bridges have to be set after interface instantiation
+                update_interface_bridges(self, self.device_type.interfacetemplates.all())
 
         # Update Site and Rack assignment for any child Devices
         devices = Device.objects.filter(parent_bay__device=self)
@@ -13,6 +13,7 @@ from extras.models import ConfigContextModel, CustomField
 from netbox.models import PrimaryModel
 from netbox.models.features import ImageAttachmentsMixin
 from netbox.models.mixins import WeightMixin
+from utilities.counters import deferred_counter_updates
 from utilities.jsonschema import validate_schema
 from utilities.string import title
 from .device_components import *
@@ -284,79 +285,81 @@ class Module(PrimaryModel, ConfigContextModel):
         if not is_new or (disable_replication and not adopt_components):
             return
 
-        # Iterate all component types
-        for templates, component_attribute, component_model in [
-            ("consoleporttemplates", "consoleports", ConsolePort),
-            ("consoleserverporttemplates", "consoleserverports", ConsoleServerPort),
-            ("interfacetemplates", "interfaces", Interface),
-            ("powerporttemplates", "powerports", PowerPort),
-            ("poweroutlettemplates", "poweroutlets", PowerOutlet),
-            ("rearporttemplates", "rearports", RearPort),
-            ("frontporttemplates", "frontports", FrontPort),
-            ("modulebaytemplates", "modulebays", ModuleBay),
-        ]:
-            create_instances = []
-            update_instances = []
-
-            # Prefetch installed components
-            installed_components = {
-                component.name: component
-                for component in getattr(self.device, component_attribute).filter(module__isnull=True)
-            }
-
-            # Get the template for the module type.
-            for template in getattr(self.module_type, templates).all():
-                template_instance = template.instantiate(device=self.device, module=self)
-
-                if adopt_components:
-                    existing_item = installed_components.get(template_instance.name)
-
-                    # Check if there's a component with the same name already
-                    if existing_item:
-                        # Assign it to the module
-                        existing_item.module = self
-                        update_instances.append(existing_item)
-                        continue
-
-                # Only create new components if replication is enabled
-                if not disable_replication:
-                    create_instances.append(template_instance)
-
-            # Set default values for any applicable custom fields
-            if cf_defaults := CustomField.objects.get_defaults_for_model(component_model):
-                for component in create_instances:
-                    component.custom_field_data = cf_defaults
-
-            if component_model is not ModuleBay:
-                component_model.objects.bulk_create(create_instances)
-                # Emit the post_save signal for each newly created object
-                for component in create_instances:
+        # Apply counter updates once per parent object rather than once per component
+        with deferred_counter_updates():
+            # Iterate all component types
+            for templates, component_attribute, component_model in [
+                ("consoleporttemplates", "consoleports", ConsolePort),
+                ("consoleserverporttemplates", "consoleserverports", ConsoleServerPort),
+                ("interfacetemplates", "interfaces", Interface),
+                ("powerporttemplates", "powerports", PowerPort),
+                ("poweroutlettemplates", "poweroutlets", PowerOutlet),
+                ("rearporttemplates", "rearports", RearPort),
+                ("frontporttemplates", "frontports", FrontPort),
+                ("modulebaytemplates", "modulebays", ModuleBay),
+            ]:
+                create_instances = []
+                update_instances = []
+
+                # Prefetch installed components
+                installed_components = {
+                    component.name: component
+                    for component in getattr(self.device, component_attribute).filter(module__isnull=True)
+                }
+
+                # Get the template for the module type.
+                for template in getattr(self.module_type, templates).all():
+                    template_instance = template.instantiate(device=self.device, module=self)
+
+                    if adopt_components:
+                        existing_item = installed_components.get(template_instance.name)
+
+                        # Check if there's a component with the same name already
+                        if existing_item:
+                            # Assign it to the module
+                            existing_item.module = self
+                            update_instances.append(existing_item)
+                            continue
+
+                    # Only create new components if replication is enabled
+                    if not disable_replication:
+                        create_instances.append(template_instance)
+
+                # Set default values for any applicable custom fields
+                if cf_defaults := CustomField.objects.get_defaults_for_model(component_model):
+                    for component in create_instances:
+                        component.custom_field_data = cf_defaults
+
+                if component_model is not ModuleBay:
+                    component_model.objects.bulk_create(create_instances)
+                    # Emit the post_save signal for each newly created object
+                    for component in create_instances:
+                        post_save.send(
+                            sender=component_model,
+                            instance=component,
+                            created=True,
+                            raw=False,
+                            using='default',
+                            update_fields=None
+                        )
+                else:
+                    # ModuleBays must be saved individually for MPTT
+                    for instance in create_instances:
+                        instance.name = instance.name.replace(MODULE_TOKEN, str(self.module_bay.position))
+                        instance.save()
+
+                update_fields = ['module']
+                component_model.objects.bulk_update(update_instances, update_fields)
+                # Emit the post_save signal for each updated object
+                for component in update_instances:
                     post_save.send(
                         sender=component_model,
                         instance=component,
-                        created=True,
+                        created=False,
                         raw=False,
                         using='default',
-                        update_fields=None
+                        update_fields=update_fields
                     )
-            else:
-                # ModuleBays must be saved individually for MPTT
-                for instance in create_instances:
-                    instance.name = instance.name.replace(MODULE_TOKEN, str(self.module_bay.position))
-                    instance.save()
-
-            update_fields = ['module']
-            component_model.objects.bulk_update(update_instances, update_fields)
-            # Emit the post_save signal for each updated object
-            for component in update_instances:
-                post_save.send(
-                    sender=component_model,
-                    instance=component,
-                    created=False,
-                    raw=False,
-                    using='default',
-                    update_fields=update_fields
-                )
 
         # Interface bridges have to be set after interface instantiation
         update_interface_bridges(self.device, self.module_type.interfacetemplates, self)
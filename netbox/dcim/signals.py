@@ -10,7 +10,7 @@ from .models import (
     VirtualChassis,
 )
 from .models.cables import trace_paths
-from .utils import create_cablepath, rebuild_paths
+from .utils import compile_path_node, create_cablepath, rebuild_paths, retrace_cablepaths
 
 COMPONENT_MODELS = (
     ConsolePort,
@@ -142,8 +142,7 @@ def retrace_cable_paths(instance, **kwargs):
     """
     When a Cable is deleted, check for and update its connected endpoints
     """
-    for cablepath in CablePath.objects.filter(_nodes__contains=instance):
-        cablepath.retrace()
+    retrace_cablepaths(CablePath.objects.filter(_nodes__contains=instance))
 
 
 @receiver(post_delete, sender=CableTermination)
@@ -154,11 +153,11 @@ def nullify_connected_endpoints(instance, **kwargs):
     model = instance.termination_type.model_class()
     model.objects.filter(pk=instance.termination_id).update(cable=None, cable_end='')
 
-    for cablepath in CablePath.objects.filter(_nodes__contains=instance.cable):
-        # Remove the deleted CableTermination if it's one of the path's originating nodes
-        if instance.termination in cablepath.origins:
-            cablepath.origins.remove(instance.termination)
-        cablepath.retrace()
+    # Retrace the affected paths, removing the deleted CableTermination if it's one of a path's originating nodes
+    retrace_cablepaths(
+        CablePath.objects.filter(_nodes__contains=instance.cable),
+        exclude_origins=[compile_path_node(instance.termination_type_id, instance.termination_id)]
+    )
 
 
 @receiver(post_save, sender=FrontPort)
@@ -168,5 +167,4 @@ def extend_rearport_cable_paths(instance, created, raw, **kwargs):
     """
     if created and not raw:
         rearport = instance.rear_port
-        for cablepath in CablePath.objects.filter(_nodes__contains=rearport):
-            cablepath.retrace()
+        retrace_cablepaths(CablePath.objects.filter(_nodes__contains=rearport))
@@ -1471,6 +1471,28 @@ class DeviceTest(APIViewTestCases.APIViewTestCase):
         self.assertHttpStatus(response, status.HTTP_200_OK)
         self.assertEqual(response.data['content'], f'Config for device {device.name}')
 
+    def test_render_config_bulk(self):
+        configtemplate = ConfigTemplate.objects.create(
+            name='Config Template 1',
+            template_code='Config for device {{ device.name }} ({{ foo }})'
+        )
+        devices = Device.objects.order_by('pk')[:2]
+        Device.objects.filter(pk=devices[0].pk).update(config_template=configtemplate)
+
+        self.add_permissions('dcim.add_device')
+        url = reverse('dcim-api:device-list') + 'render-config/?' + '&'.join(f'id={d.pk}' for d in devices)
+        response = self.client.post(url, {'foo': 'bar'}, format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = b''.join(response.streaming_content).splitlines()
+        results = {result['id']: result for result in map(json.loads, lines)}
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[devices[0].pk]['configtemplate'], configtemplate.pk)
+        self.assertEqual(results[devices[0].pk]['content'], f'Config for device {devices[0].name} (bar)')
+        self.assertIsNone(results[devices[1].pk]['configtemplate'])
+        self.assertIn('error', results[devices[1].pk])
+
 
 class ModuleTest(APIViewTestCases.APIViewTestCase):
     model = Module
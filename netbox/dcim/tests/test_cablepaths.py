@@ -4,7 +4,8 @@ from circuits.models import *
 from dcim.choices import LinkStatusChoices
 from dcim.models import *
 from dcim.svg import CableTraceSVG
-from dcim.utils import object_to_path_node
+from dcim.tracing import CableGraph
+from dcim.utils import bulk_create_cablepaths, object_to_path_node, retrace_cablepaths
 from utilities.exceptions import AbortRequest
 
 
@@ -2270,6 +2271,121 @@ class CablePathTestCase(TestCase):
         CableTraceSVG(interface1).render()
         CableTraceSVG(interface2).render()
 
+    def test_223_trace_paths_with_preloaded_graph(self):
+        """
+        [IF1] --C1-- [FP1] [RP1] --C5-- [RP2] [FP3] --C3-- [IF3]
+        [IF2] --C2-- [FP2]                    [FP4] --C4-- [IF4]
+        """
+        interfaces = [
+            Interface.objects.create(device=self.device, name=f'Interface {i}') for i in range(1, 5)
+        ]
+        rearport1 = RearPort.objects.create(device=self.device, name='Rear Port 1', positions=2)
+        rearport2 = RearPort.objects.create(device=self.device, name='Rear Port 2', positions=2)
+        frontports = [
+            FrontPort.objects.create(
+                device=self.device, name=f'Front Port {i}', rear_port=rearport, rear_port_position=position
+            )
+            for i, (rearport, position) in enumerate(
+                [(rearport1, 1), (rearport1, 2), (rearport2, 1), (rearport2, 2)], start=1
+            )
+        ]
+        for interface, frontport in zip(interfaces, frontports):
+            Cable(a_terminations=[interface], b_terminations=[frontport]).save()
+        Cable(a_terminations=[rearport1], b_terminations=[rearport2]).save()
+
+        interfaces = list(Interface.objects.filter(pk__in=[i.pk for i in interfaces]))
+        graph = CableGraph()
+        graph.preload(interfaces)
+
+        # Tracing against the preloaded graph should yield identical paths without any further queries
+        for interface in interfaces:
+            expected = CablePath.from_origin([interface])
+            with self.assertNumQueries(0):
+                cablepath = CablePath.from_origin([interface], graph=graph)
+            self.assertEqual(cablepath.path, expected.path)
+            self.assertEqual(cablepath.is_complete, expected.is_complete)
+            self.assertEqual(cablepath.is_active, expected.is_active)
+            self.assertEqual(cablepath.is_split, expected.is_split)
+            self.assertTrue(cablepath.is_complete)
+
+    def test_224_bulk_create_cablepaths(self):
+        """
+        [IF1] --C1-- [FP1] [RP1] --C2-- [IF2]
+        """
+        interface1 = Interface.objects.create(device=self.device, name='Interface 1')
+        interface2 = Interface.objects.create(device=self.device, name='Interface 2')
+        rearport1 = RearPort.objects.create(device=self.device, name='Rear Port 1', positions=1)
+        frontport1 = FrontPort.objects.create(
+            device=self.device, name='Front Port 1', rear_port=rearport1, rear_port_position=1
+        )
+        cable1 = Cable(a_terminations=[interface1], b_terminations=[frontport1])
+        cable1.save()
+        cable2 = Cable(a_terminations=[rearport1], b_terminations=[interface2])
+        cable2.save()
+
+        # Discard the paths created by signal handlers and recreate them in bulk
+        CablePath.objects.all().delete()
+        interfaces = list(Interface.objects.filter(pk__in=[interface1.pk, interface2.pk]))
+        graph = CableGraph()
+        graph.preload(interfaces)
+        bulk_create_cablepaths([CablePath.from_origin([interface], graph=graph) for interface in interfaces])
+
+        self.assertEqual(CablePath.objects.count(), 2)
+        path1 = self.assertPathExists(
+            (interface1, cable1, frontport1, rearport1, cable2, interface2),
+            is_complete=True,
+            is_active=True
+        )
+        path2 = self.assertPathExists(
+            (interface2, cable2, rearport1, frontport1, cable1, interface1),
+            is_complete=True,
+            is_active=True
+        )
+        interface1.refresh_from_db()
+        interface2.refresh_from_db()
+        self.assertPathIsSet(interface1, path1)
+        self.assertPathIsSet(interface2, path2)
+
+    def test_225_retrace_cablepaths(self):
+        """
+        [IF1] --C1-- [FP1] [RP1] --C3-- [RP2] [FP3] --C4-- [IF3]
+        [IF2] --C2-- [FP2]                    [FP4]
+        """
+        interfaces = [
+            Interface.objects.create(device=self.device, name=f'Interface {i}') for i in range(1, 4)
+        ]
+        rearport1 = RearPort.objects.create(device=self.device, name='Rear Port 1', positions=2)
+        rearport2 = RearPort.objects.create(device=self.device, name='Rear Port 2', positions=2)
+        frontports = [
+            FrontPort.objects.create(
+                device=self.device, name=f'Front Port {i}', rear_port=rearport, rear_port_position=position
+            )
+            for i, (rearport, position) in enumerate(
+                [(rearport1, 1), (rearport1, 2), (rearport2, 1), (rearport2, 2)], start=1
+            )
+        ]
+        for interface, frontport in zip(interfaces, frontports[:2] + frontports[2:3]):
+            Cable(a_terminations=[interface], b_terminations=[frontport]).save()
+        cable3 = Cable(a_terminations=[rearport1], b_terminations=[rearport2])
+        cable3.save()
+        expected_paths = {cp.pk: cp.path for cp in CablePath.objects.all()}
+        self.assertEqual(len(expected_paths), 3)
+
+        # Retracing stale paths in bulk should restore them
+        CablePath.objects.update(is_active=False, is_complete=False)
+        retrace_cablepaths(CablePath.objects.filter(_nodes__contains=cable3))
+        self.assertEqual({cp.pk: cp.path for cp in CablePath.objects.all()}, expected_paths)
+        self.assertEqual(CablePath.objects.filter(is_active=True).count(), 3)
+        self.assertEqual(CablePath.objects.filter(is_complete=True).count(), 2)
+
+        # Removing an origin from its path should delete the path
+        interface2 = interfaces[1]
+        retrace_cablepaths(
+            CablePath.objects.filter(_nodes__contains=interface2),
+            exclude_origins=[object_to_path_node(interface2)]
+        )
+        self.assertEqual(CablePath.objects.count(), 2)
+
     def test_301_create_path_via_existing_cable(self):
         """
         [IF1] --C1-- [FP1] [RP1] --C2-- [RP2] [FP2] --C3-- [IF2]
@@ -0,0 +1,265 @@
+from collections import defaultdict
+
+from circuits.models import CircuitTermination
+from core.models import ObjectType
+from dcim.models import Cable, CableTermination, FrontPort, Interface, RearPort
+from wireless.models import WirelessLink
+
+__all__ = (
+    'CableGraph',
+)
+
+
+class CableGraph:
+    """
+    An in-memory representation of the cables, cable terminations, and front/rear port mappings among a set of
+    devices, against which CablePaths can be traced without querying the database for each hop.
+
+    Objects not yet present in the graph are retrieved in bulk as they are encountered. Call preload() with a set of
+    origin terminations to retrieve everything reachable from them up front, one hop at a time across all origins, so
+    that each subsequent trace (via CablePath.from_origin()) can be completed entirely in memory.
+    """
+    def __init__(self):
+        self.cables = {}
+        self.wireless_links = {}
+
+        # CableTerminations by cable ID (in the order defined by CableTermination.Meta.ordering) and by terminating
+        # object
+        self.cable_terminations = defaultdict(list)
+        self.cable_terminations_by_object = {}
+
+        # Terminating objects keyed by (model, pk). The position of each front and rear port within its device (as
+        # ordered by the database) is recorded to preserve the order of path nodes.
+        self.objects = {}
+        self.positions = {}
+
+        # FrontPorts by RearPort ID
+        self.front_ports = defaultdict(list)
+
+        # CircuitTerminations by circuit ID and side
+        self.circuit_terminations = {}
+
+        # IDs of devices and circuits for which all ports/terminations have been loaded
+        self.devices = set()
+        self.circuits = set()
+
+    def __len__(self):
+        return len(self.objects)
+
+    #
+    # Loading
+    #
+
+    def _add_object(self, obj):
+        self.objects[(type(obj), obj.pk)] = obj
+
+    def load_links(self, terminations):
+        """
+        Retrieve the Cables (along with all of their CableTerminations) and WirelessLinks attached to the given
+        terminations.
+        """
+        cable_ids = {t.cable_id for t in terminations if t.cable_id} - self.cables.keys()
+        if cable_ids:
+            self.cables.update({cable.pk: cable for cable in Cable.objects.filter(pk__in=cable_ids)})
+            for ct in CableTermination.objects.filter(cable__in=cable_ids):
+                self.cable_terminations[ct.cable_id].append(ct)
+                self.cable_terminations_by_object[(ct.termination_type_id, ct.termination_id)] = ct
+
+        wireless_link_ids = {
+            t.wireless_link_id for t in terminations if getattr(t, 'wireless_link_id', None)
+        } - self.wireless_links.keys()
+        if wireless_link_ids:
+            self.wireless_links.update({
+                link.pk: link for link in WirelessLink.objects.filter(pk__in=wireless_link_ids)
+            })
+
+    def load_devices(self, device_ids):
+        """
+        Retrieve all front and rear ports belonging to the specified devices.
+        """
+        if device_ids := set(device_ids) - self.devices - {None}:
+            for model in (RearPort, FrontPort):
+                for i, port in enumerate(model.objects.filter(device__in=device_ids)):
+                    self._add_object(port)
+                    self.positions[(model, port.pk)] = i
+                    if model is FrontPort:
+                        self.front_ports[port.rear_port_id].append(port)
+            self.devices.update(device_ids)
+
+    def load_circuits(self, circuit_ids):
+        """
+        Retrieve all CircuitTerminations belonging to the specified circuits.
+        """
+        if circuit_ids := set(circuit_ids) - self.circuits:
+            for termination in CircuitTermination.objects.filter(circuit__in=circuit_ids):
+                self._add_object(termination)
+                self.circuit_terminations[(termination.circuit_id, termination.term_side)] = termination
+            self.circuits.update(circuit_ids)
+
+    def load_objects(self, model, pks):
+        """
+        Retrieve objects of the given model by primary key. Objects which do not exist are recorded as None.
+        """
+        if pks := {pk for pk in pks if (model, pk) not in self.objects}:
+            for obj in model.objects.filter(pk__in=pks):
+                self._add_object(obj)
+            for pk in pks:
+                self.objects.setdefault((model, pk), None)
+
+    def load_cable_terminations(self, cable_terminations):
+        """
+        Retrieve the objects to which the given CableTerminations are attached. Front and rear ports are retrieved
+        along with all other ports on their parent device.
+        """
+        self.load_devices(
+            ct._device_id for ct in cable_terminations
+            if ObjectType.objects.get_for_id(ct.termination_type_id).model_class() in (FrontPort, RearPort)
+        )
+        pks = defaultdict(set)
+        for ct in cable_terminations:
+            pks[ObjectType.objects.get_for_id(ct.termination_type_id).model_class()].add(ct.termination_id)
+        for model, model_pks in pks.items():
+            self.load_objects(model, model_pks)
+
+    def preload(self, origins):
+        """
+        Retrieve everything which may be traversed by paths originating from the given terminations. Each hop is
+        resolved for all origins together, so the number of queries depends on the length of the longest path rather
+        than on the number of origins.
+        """
+        terminations = list(origins)
+        seen = {(type(t), t.pk) for t in terminations}
+
+        while terminations:
+            self.load_links(terminations)
+
+            # Resolve the far end of each link
+            cable_terminations = [
+                ct for t in terminations if t.cable_id for ct in self.cable_terminations[t.cable_id]
+                if ct.cable_end != t.cable_end
+            ]
+            self.load_cable_terminations(cable_terminations)
+            far_ends = [self.get_termination(ct) for ct in cable_terminations]
+            wireless_peer_ids = {
+                self._get_wireless_peer_id(self.wireless_links[t.wireless_link_id], t)
+                for t in terminations if getattr(t, 'wireless_link_id', None) in self.wireless_links
+            }
+            self.load_objects(Interface, wireless_peer_ids)
+            far_ends.extend(self.objects[(Interface, pk)] for pk in wireless_peer_ids)
+
+            # Determine the next hop from each far-end termination
+            self.load_devices(t.device_id for t in far_ends if isinstance(t, (FrontPort, RearPort)))
+            self.load_circuits(t.circuit_id for t in far_ends if isinstance(t, CircuitTermination))
+            next_hops = []
+            for t in far_ends:
+                if isinstance(t, FrontPort):
+                    next_hops.append(self.objects.get((RearPort, t.rear_port_id)))
+                elif isinstance(t, RearPort):
+                    next_hops.extend(self.front_ports[t.pk])
+                elif isinstance(t, CircuitTermination):
+                    next_hops.append(self.get_circuit_peer(t))
+
+            terminations = []
+            for t in next_hops:
+                if t is not None and (type(t), t.pk) not in seen:
+                    seen.add((type(t), t.pk))
+                    terminations.append(t)
+
+    #
+    # Lookups
+    #
+
+    def get_link(self, termination):
+        """
+        Return the Cable or WirelessLink attached to a termination, if any.
+        """
+        if termination.cable_id:
+            self.load_links([termination])
+            return self.cables[termination.cable_id]
+        if wireless_link_id := getattr(termination, 'wireless_link_id', None):
+            self.load_links([termination])
+            return self.wireless_links[wireless_link_id]
+        return None
+
+    def get_termination(self, cable_termination):
+        """
+        Return the object to which a CableTermination is attached (or None if it no longer exists).
+        """
+        model = ObjectType.objects.get_for_id(cable_termination.termination_type_id).model_class()
+        if (model, cable_termination.termination_id) not in self.objects:
+            self.load_cable_terminations([cable_termination])
+        return self.objects[(model, cable_termination.termination_id)]
+
+    def get_far_end_terminations(self, terminations):
+        """
+        Return the objects attached to the opposite end(s) of the Cable(s) connected to the given terminations, in the
+        order of their CableTerminations. Returns None if none of the terminations has a CableTermination.
+        """
+        self.load_links(terminations)
+        termination_type = ObjectType.objects.get_for_model(terminations[0])
+        cable_ends = set()
+        for t in terminations:
+            if lct := self.cable_terminations_by_object.get((termination_type.pk, t.pk)):
+                cable_end = 'A' if lct.cable_end == 'B' else 'B'
+                cable_ends.add((lct.cable_id, cable_end))
+        if not cable_ends:
+            return None
+
+        remote_cable_terminations = [
+            ct for cable_id in sorted({cable_id for cable_id, _ in cable_ends})
+            for ct in self.cable_terminations[cable_id] if (cable_id, ct.cable_end) in cable_ends
+        ]
+        self.load_cable_terminations(remote_cable_terminations)
+
+        return [self.get_termination(ct) for ct in remote_cable_terminations]
+
+    @staticmethod
+    def _get_wireless_peer_id(link, termination):
+        return link.interface_b_id if link.interface_a_id == termination.pk else link.interface_a_id
+
+    def get_wireless_peer(self, link, termination):
+        """
+        Return the Interface at the opposite end of a WirelessLink from the given termination.
+        """
+        pk = self._get_wireless_peer_id(link, termination)
+        self.load_objects(Interface, [pk])
+        return self.objects[(Interface, pk)]
+
+    def get_rear_ports(self, front_ports):
+        """
+        Return the distinct RearPorts to which the given FrontPorts map.
+        """
+        self.load_devices(fp.device_id for fp in front_ports)
+        self.load_objects(RearPort, [fp.rear_port_id for fp in front_ports])
+        rear_ports = {
+            fp.rear_port_id: self.objects[(RearPort, fp.rear_port_id)] for fp in front_ports
+        }
+        return self._order_ports([rp for rp in rear_ports.values() if rp is not None])
+
+    def get_front_ports(self, rear_ports):
+        """
+        Return all FrontPorts which map to the given RearPorts.
+        """
+        self.load_devices(rp.device_id for rp in rear_ports)
+        return self._order_ports([fp for rp in rear_ports for fp in self.front_ports[rp.pk]])
+
+    def _order_ports(self, ports):
+        # Reproduce the database ordering of front/rear ports (by device, then name)
+        return sorted(ports, key=lambda p: (p.device_id, self.positions.get((type(p), p.pk), 0)))
+
+    def get_circuit_peer(self, termination):
+        """
+        Return the CircuitTermination on the opposite side of the given CircuitTermination's circuit, if any.
+        """
+        self.load_circuits([termination.circuit_id])
+        term_side = 'Z' if termination.term_side == 'A' else 'A'
+        return self.circuit_terminations.get((termination.circuit_id, term_side))
+
+    @staticmethod
+    def get_parent_id(termination):
+        """
+        Return the ID of a mid-span termination's parent object (device or circuit) without retrieving it.
+        """
+        if isinstance(termination, CircuitTermination):
+            return termination.circuit_id
+        return termination.device_id
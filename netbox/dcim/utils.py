@@ -1,3 +1,6 @@
+import itertools
+from collections import defaultdict
+
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.db import router, transaction
@@ -31,32 +34,122 @@ def path_node_to_object(repr):
     return ct.model_class().objects.filter(pk=object_id).first()
 
 
-def create_cablepath(terminations):
+def create_cablepath(terminations, graph=None):
     """
     Create CablePaths for all paths originating from the specified set of nodes.
 
     :param terminations: Iterable of CableTermination objects
+    :param graph: A CableGraph against which to trace the path (optional)
     """
     from dcim.models import CablePath
 
-    cp = CablePath.from_origin(terminations)
+    cp = CablePath.from_origin(terminations, graph=graph)
     if cp:
         cp.save()
 
 
+def _set_path_origins(cablepaths, batch_size=1000):
+    """
+    Record a reference to each of the given (saved) CablePaths on its originating object(s).
+    """
+    origin_paths = defaultdict(dict)
+    for cp in cablepaths:
+        for node in cp.path[0]:
+            ct_id, object_id = decompile_path_node(node)
+            origin_paths[ct_id][object_id] = cp.pk
+    for ct_id, paths in origin_paths.items():
+        model = ContentType.objects.get_for_id(ct_id).model_class()
+        model.objects.bulk_update(
+            [model(pk=pk, _path_id=path_id) for pk, path_id in paths.items()],
+            fields=['_path'],
+            batch_size=batch_size
+        )
+
+
+def bulk_create_cablepaths(cablepaths, batch_size=1000):
+    """
+    Save many new CablePaths at once, and record a reference to each on its originating object(s). This is equivalent
+    to calling save() on each CablePath, but requires only a handful of queries.
+
+    :param cablepaths: Iterable of unsaved CablePath instances
+    :param batch_size: Maximum number of rows to create or update per query
+    """
+    from dcim.models import CablePath
+
+    cablepaths = list(cablepaths)
+    for cp in cablepaths:
+        cp._nodes = list(itertools.chain(*cp.path))
+    CablePath.objects.bulk_create(cablepaths, batch_size=batch_size)
+    _set_path_origins(cablepaths, batch_size=batch_size)
+
+    return cablepaths
+
+
+def retrace_cablepaths(cablepaths, exclude_origins=None, batch_size=1000):
+    """
+    Retrace many existing CablePaths at once. This is equivalent to calling retrace() on each CablePath, but all
+    paths are traced against a single preloaded CableGraph, and the results are written in bulk: Paths which still
+    originate from at least one termination are updated, and the remainder are deleted.
+
+    :param cablepaths: Iterable of CablePath instances
+    :param exclude_origins: Path nodes (see object_to_path_node()) to be discarded from the originating terminations
+        of each path, e.g. a termination which has been detached from its cable
+    :param batch_size: Maximum number of rows to update per query
+    """
+    from dcim.models import CablePath
+    from dcim.tracing import CableGraph
+
+    cablepaths = list(cablepaths)
+    exclude_origins = set(exclude_origins or [])
+
+    # Retrieve the originating terminations of all paths, grouped by type
+    origin_ids = defaultdict(set)
+    for cp in cablepaths:
+        for node in cp.path[0] if cp.path else []:
+            if node not in exclude_origins:
+                ct_id, object_id = decompile_path_node(node)
+                origin_ids[ct_id].add(object_id)
+    origins = {}
+    for ct_id, pks in origin_ids.items():
+        model = ContentType.objects.get_for_id(ct_id).model_class()
+        for obj in model.objects.filter(pk__in=pks):
+            origins[compile_path_node(ct_id, obj.pk)] = obj
+
+    graph = CableGraph()
+    graph.preload(origins.values())
+
+    updated_paths = []
+    deleted_ids = []
+    for cp in cablepaths:
+        path_origins = [origins[node] for node in (cp.path[0] if cp.path else []) if node in origins]
+        if new_path := CablePath.from_origin(path_origins, graph=graph):
+            cp.path = new_path.path
+            cp._nodes = list(itertools.chain(*cp.path))
+            cp.is_complete = new_path.is_complete
+            cp.is_active = new_path.is_active
+            cp.is_split = new_path.is_split
+            updated_paths.append(cp)
+        else:
+            deleted_ids.append(cp.pk)
+
+    with transaction.atomic(using=router.db_for_write(CablePath)):
+        CablePath.objects.filter(pk__in=deleted_ids).delete()
+        CablePath.objects.bulk_update(
+            updated_paths,
+            fields=['path', '_nodes', 'is_complete', 'is_active', 'is_split'],
+            batch_size=batch_size
+        )
+        _set_path_origins(updated_paths, batch_size=batch_size)
+
+
 def rebuild_paths(terminations):
     """
     Rebuild all CablePaths which traverse the specified nodes.
     """
     from dcim.models import CablePath
 
-    for obj in terminations:
-        cable_paths = CablePath.objects.filter(_nodes__contains=obj)
-
-        with transaction.atomic(using=router.db_for_write(CablePath)):
-            for cp in cable_paths:
-                cp.delete()
-                create_cablepath(cp.origins)
+    if nodes := [object_to_path_node(obj) for obj in terminations]:
+        retrace_cablepaths(CablePath.objects.filter(_nodes__overlap=nodes))
 
 
 def update_interface_bridges(device, interface_templates, module=None):
@@ -1,3 +1,6 @@
+import json
+
+from django.http import StreamingHttpResponse
 from jinja2.exceptions import TemplateError
 from rest_framework.decorators import action
 from rest_framework.renderers import JSONRenderer
@@ -83,3 +86,53 @@ class RenderConfigMixin(ConfigTemplateRenderMixin):
         context_data.update({object_type: instance})
 
         return self.render_configtemplate(request, configtemplate, context_data)
+
+    @action(detail=False, methods=['post'], url_path='render-config', url_name='render-config-bulk')
+    def render_config_bulk(self, request):
+        """
+        Resolve and render the preferred ConfigTemplate for each object matching the specified filters. Results are
+        streamed as newline-delimited JSON, with one object per line.
+        """
+        if not isinstance(request.data, dict):
+            return Response({
+                'error': 'Additional context data must be provided as a JSON object.'
+            }, status=HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset()).select_related(
+            'config_template', 'role__config_template', 'platform__config_template'
+        )
+
+        return StreamingHttpResponse(
+            self._render_configs(queryset, request.data),
+            content_type='application/x-ndjson'
+        )
+
+    @staticmethod
+    def _render_configs(queryset, data, chunk_size=100):
+        object_type = queryset.model._meta.model_name
+        # Share a single instance of each ConfigTemplate (and thus its compiled template) among all objects
+        configtemplates = {}
+
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            result = {
+                'id': instance.pk,
+                'display': str(instance),
+            }
+            if configtemplate := instance.get_config_template():
+                configtemplate = configtemplates.setdefault(configtemplate.pk, configtemplate)
+                result['configtemplate'] = configtemplate.pk
+
+                # Compile context data
+                context_data = instance.get_config_context()
+                context_data.update(data)
+                context_data.update({object_type: instance})
+
+                try:
+                    result['content'] = configtemplate.render(context=context_data)
+                except TemplateError as e:
+                    result['error'] = f"An error occurred while rendering the template (line {e.lineno}): {e}"
+            else:
+                result['configtemplate'] = None
+                result['error'] = f'No config template found for this {object_type}.'
+
+            yield json.dumps(result) + '\n'
@@ -1,17 +1,28 @@
+import copy
 import functools
 import operator
 import re
+from collections import OrderedDict
+from threading import Lock
+
 from django.utils.translation import gettext as _
 
 __all__ = (
     'Condition',
     'ConditionSet',
     'InvalidCondition',
+    'get_condition_set',
 )
 
 AND = 'and'
 OR = 'or'
 
+# Maximum number of compiled ConditionSets retained by get_condition_set()
+CONDITION_SET_CACHE_SIZE = 1024
+
+_condition_sets = OrderedDict()
+_condition_sets_lock = Lock()
+
 
 def is_ruleset(data):
     """
@@ -70,17 +81,27 @@ class Condition:
         self.eval_func = getattr(self, f'eval_{op}')
         self.negate = negate
 
+        # Pre-split the attribute path and compile any regular expression, so that neither needs to be repeated for
+        # each evaluation
+        self.path = tuple(attr.split('.'))
+        if op == self.REGEX:
+            try:
+                self.regex = re.compile(value)
+            except re.error as e:
+                raise ValueError(_("Invalid regular expression: {value} ({error})").format(value=value, error=e))
+
+    @staticmethod
+    def _get(obj, key):
+        if isinstance(obj, list):
+            return [operator.getitem(item or {}, key) for item in obj]
+        return operator.getitem(obj or {}, key)
+
     def eval(self, data):
         """
         Evaluate the provided data to determine whether it matches the condition.
         """
-        def _get(obj, key):
-            if isinstance(obj, list):
-                return [operator.getitem(item or {}, key) for item in obj]
-            return operator.getitem(obj or {}, key)
-
         try:
-            value = functools.reduce(_get, self.attr.split('.'), data)
+            value = functools.reduce(self._get, self.path, data)
         except KeyError:
             raise InvalidCondition(f"Invalid key path: {self.attr}")
         try:
@@ -125,7 +146,7 @@ class Condition:
     # Regular expressions
 
     def eval_regex(self, value):
-        return re.match(self.value, value) is not None
+        return self.regex.match(value) is not None
 
 
 class ConditionSet:
@@ -166,3 +187,32 @@ class ConditionSet:
         """
         func = any if self.logic == 'or' else all
         return func(d.eval(data) for d in self.conditions)
+
+
+def get_condition_set(ruleset, key=None):
+    """
+    Return a ConditionSet compiled from the given ruleset. If a key is specified (for example, identifying the object
+    which defines the ruleset), the compiled ConditionSet is retained in memory and reused for all subsequent calls
+    with the same key, for as long as the ruleset remains unchanged. The least recently used ConditionSets are
+    discarded once CONDITION_SET_CACHE_SIZE has been reached.
+
+    :param ruleset: A dictionary mapping a logical operator to a list of conditional rules
+    :param key: A hashable value identifying the source of the ruleset
+    """
+    if key is None:
+        return ConditionSet(ruleset)
+
+    with _condition_sets_lock:
+        if (cached := _condition_sets.get(key)) is not None and cached[0] == ruleset:
+            _condition_sets.move_to_end(key)
+            return cached[1]
+
+    condition_set = ConditionSet(ruleset)
+
+    with _condition_sets_lock:
+        _condition_sets[key] = (copy.deepcopy(ruleset), condition_set)
+        _condition_sets.move_to_end(key)
+        while len(_condition_sets) > CONDITION_SET_CACHE_SIZE:
+            _condition_sets.popitem(last=False)
+
+    return condition_set
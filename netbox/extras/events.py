@@ -1,8 +1,10 @@
 import logging
+import threading
 from collections import defaultdict
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.utils import timezone
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext as _
@@ -21,6 +23,55 @@ from .models import EventRule
 
 logger = logging.getLogger('netbox.events_processor')
 
+EVENT_RULE_INDEX_CACHE_KEY = 'event_rule_index'
+EVENT_RULE_INDEX_CACHE_TIMEOUT = 3600
+
+# Events pipeline stages which act only upon events matched by an EventRule. If no other stages are configured, events
+# which cannot match any enabled rule need not be serialized and queued at all.
+EVENT_RULE_PIPELINE_STAGES = (
+    'extras.events.process_event_queue',
+    'extras.streams.publish_events',
+)
+
+_thread_locals = threading.local()
+
+
+def get_event_rule_index(request_id=None):
+    """
+    Return a mapping of (object type ID, event type) to the IDs of all enabled EventRules which apply to it. The index
+    is cached for up to one hour, and is invalidated whenever an EventRule is changed (see clear_event_rule_index()).
+
+    If a request ID is specified, the index is retained in memory and reused for all subsequent calls during the same
+    request.
+    """
+    if request_id is not None and getattr(_thread_locals, 'event_rule_index', (None, None))[0] == request_id:
+        return _thread_locals.event_rule_index[1]
+
+    index = cache.get(EVENT_RULE_INDEX_CACHE_KEY)
+    if index is None:
+        index = defaultdict(list)
+        event_rules = EventRule.objects.filter(enabled=True).values_list('pk', 'event_types', 'object_types')
+        for pk, event_types, object_type_id in event_rules:
+            for event_type in event_types:
+                index[(object_type_id, event_type)].append(pk)
+        index = dict(index)
+        cache.set(EVENT_RULE_INDEX_CACHE_KEY, index, EVENT_RULE_INDEX_CACHE_TIMEOUT)
+        logger.debug(f"Rebuilt event rule index ({len(index)} entries)")
+
+    if request_id is not None:
+        _thread_locals.event_rule_index = (request_id, index)
+
+    return index
+
+
+def clear_event_rule_index():
+    """
+    Invalidate the cached index of EventRules.
+    """
+    cache.delete(EVENT_RULE_INDEX_CACHE_KEY)
+    if hasattr(_thread_locals, 'event_rule_index'):
+        del _thread_locals.event_rule_index
+
 
 def serialize_for_event(instance):
     """
@@ -63,26 +114,60 @@ def enqueue_event(queue, instance, user, request_id, event_type):
 
     assert instance.pk is not None
     key = f'{app_label}.{model_name}:{instance.pk}'
-    if key in queue:
+
+    # If the events pipeline acts only upon event rules, skip serializing any event which no enabled rule could match.
+    # A placeholder is queued in its place, so that any subsequent events for the object are coalesced with it (e.g.
+    # an object created and then updated within the same request yields only a single "created" event).
+    skipped = queue[key] if key in queue and queue[key].get('skipped') else None
+    if skipped and event_type != OBJECT_DELETED:
+        event_type = skipped['event_type']
+    if (key not in queue or skipped) and set(settings.EVENTS_PIPELINE).issubset(EVENT_RULE_PIPELINE_STAGES):
+        object_type = ContentType.objects.get_for_model(instance)
+        if (object_type.pk, event_type) not in get_event_rule_index(request_id):
+            queue[key] = {
+                'event_type': event_type,
+                'prechange': skipped['prechange'] if skipped else getattr(instance, '_prechange_snapshot', None),
+                'skipped': True,
+            }
+            return
+
+    if key in queue and not skipped:
         queue[key]['data'] = serialize_for_event(instance)
         queue[key]['snapshots']['postchange'] = get_snapshots(instance, event_type)['postchange']
         # If the object is being deleted, update any prior "update" event to "delete"
         if event_type == OBJECT_DELETED:
             queue[key]['event_type'] = event_type
     else:
+        snapshots = get_snapshots(instance, event_type)
+        if skipped:
+            # Retain the pre-change snapshot of the skipped event
+            snapshots['prechange'] = skipped['prechange']
         queue[key] = {
             'object_type': ContentType.objects.get_for_model(instance),
             'object_id': instance.pk,
             'event_type': event_type,
             'data': serialize_for_event(instance),
-            'snapshots': get_snapshots(instance, event_type),
+            'snapshots': snapshots,
             'username': user.username,
             'request_id': request_id
         }
 
 
-def process_event_rules(event_rules, object_type, event_type, data, username=None, snapshots=None, request_id=None):
+# The maximum number of events delivered to a single webhook by each coalesced job
+WEBHOOK_COALESCING_MAX_EVENTS = 1000
+
+
+def process_event_rules(event_rules, object_type, event_type, data, username=None, snapshots=None, request_id=None,
+                        webhook_queue=None, timestamp=None):
+    """
+    Evaluate the given EventRules against an event, and carry out the action of each rule whose conditions are met.
+    The timestamp passed to webhooks defaults to the current time.
+
+    If a webhook queue (a mapping of Webhooks to lists) is passed, webhook deliveries are appended to it for coalescing
+    (see enqueue_webhooks()) rather than each being enqueued as a separate background job.
+    """
     user = User.objects.get(username=username) if username else None
+    timestamp = timestamp or timezone.now().isoformat()
 
     for event_rule in event_rules:
 
@@ -90,67 +175,117 @@ def process_event_rules(event_rules, object_type, event_type, data, username=Non
         if not event_rule.eval_conditions(data):
             continue
 
-        # Compile event data
-        event_data = event_rule.action_data or {}
-        event_data.update(data)
-
-        # Webhooks
-        if event_rule.action_type == EventRuleActionChoices.WEBHOOK:
-
-            # Select the appropriate RQ queue
-            queue_name = get_config().QUEUE_MAPPINGS.get('webhook', RQ_QUEUE_DEFAULT)
-            rq_queue = get_queue(queue_name)
-
-            # Compile the task parameters
-            params = {
-                "event_rule": event_rule,
-                "model_name": object_type.model,
-                "event_type": event_type,
-                "data": event_data,
-                "snapshots": snapshots,
-                "timestamp": timezone.now().isoformat(),
-                "username": username,
-                "retry": get_rq_retry()
-            }
-            if snapshots:
-                params["snapshots"] = snapshots
-            if request_id:
-                params["request_id"] = request_id
+        process_event_rule_action(
+            event_rule=event_rule,
+            object_type=object_type,
+            event_type=event_type,
+            data=data,
+            user=user,
+            username=username,
+            snapshots=snapshots,
+            request_id=request_id,
+            webhook_queue=webhook_queue,
+            timestamp=timestamp
+        )
 
-            # Enqueue the task
-            rq_queue.enqueue(
-                "extras.webhooks.send_webhook",
-                **params
-            )
 
-        # Scripts
-        elif event_rule.action_type == EventRuleActionChoices.SCRIPT:
-            # Resolve the script from action parameters
-            script = event_rule.action_object.python_class()
-
-            # Enqueue a Job to record the script's execution
-            from extras.jobs import ScriptJob
-            ScriptJob.enqueue(
-                instance=event_rule.action_object,
-                name=script.name,
-                user=user,
-                data=event_data
-            )
+def process_event_rule_action(event_rule, object_type, event_type, data, user=None, username=None, snapshots=None,
+                              request_id=None, webhook_queue=None, timestamp=None):
+    """
+    Carry out the action of an EventRule whose conditions have been met by an event (see process_event_rules()).
+    Scripts are run by the given user, if any.
+    """
+    # Compile event data
+    event_data = {**(event_rule.action_data or {}), **data}
+
+    # Webhooks
+    if event_rule.action_type == EventRuleActionChoices.WEBHOOK:
+
+        # Defer the delivery for coalescing with other events sent to the same webhook
+        if webhook_queue is not None:
+            webhook_queue[event_rule.action_object].append({
+                'model_name': object_type.model,
+                'event_type': event_type,
+                'data': event_data,
+                'timestamp': timestamp,
+                'username': username,
+                'request_id': request_id,
+                'snapshots': snapshots,
+            })
+            return
+
+        # Select the appropriate RQ queue
+        queue_name = get_config().QUEUE_MAPPINGS.get('webhook', RQ_QUEUE_DEFAULT)
+        rq_queue = get_queue(queue_name)
+
+        # Compile the task parameters
+        params = {
+            "event_rule": event_rule,
+            "model_name": object_type.model,
+            "event_type": event_type,
+            "data": event_data,
+            "snapshots": snapshots,
+            "timestamp": timestamp,
+            "username": username,
+            "retry": get_rq_retry()
+        }
+        if snapshots:
+            params["snapshots"] = snapshots
+        if request_id:
+            params["request_id"] = request_id
+
+        # Enqueue the task
+        rq_queue.enqueue(
+            "extras.webhooks.send_webhook",
+            **params
+        )
 
-        # Notification groups
-        elif event_rule.action_type == EventRuleActionChoices.NOTIFICATION:
-            # Bulk-create notifications for all members of the notification group
-            event_rule.action_object.notify(
-                object_type=object_type,
-                object_id=event_data['id'],
-                object_repr=event_data.get('display'),
-                event_type=event_type
-            )
+    # Scripts
+    elif event_rule.action_type == EventRuleActionChoices.SCRIPT:
+        # Resolve the script from action parameters
+        script = event_rule.action_object.python_class()
+
+        # Enqueue a Job to record the script's execution
+        from extras.jobs import ScriptJob
+        ScriptJob.enqueue(
+            instance=event_rule.action_object,
+            name=script.name,
+            user=user,
+            data=event_data
+        )
 
-        else:
-            raise ValueError(_("Unknown action type for an event rule: {action_type}").format(
-                action_type=event_rule.action_type
-            ))
+    # Notification groups
+    elif event_rule.action_type == EventRuleActionChoices.NOTIFICATION:
+        # Bulk-create notifications for all members of the notification group
+        event_rule.action_object.notify(
+            object_type=object_type,
+            object_id=event_data['id'],
+            object_repr=event_data.get('display'),
+            event_type=event_type
+        )
+
+    else:
+        raise ValueError(_("Unknown action type for an event rule: {action_type}").format(
+            action_type=event_rule.action_type
+        ))
+
+
+def enqueue_webhooks(webhook_queue):
+    """
+    Enqueue a background job for each Webhook in the given queue to deliver all of its coalesced events (see
+    extras.webhooks.send_webhooks()).
+    """
+    queue_name = get_config().QUEUE_MAPPINGS.get('webhook', RQ_QUEUE_DEFAULT)
+    rq_queue = get_queue(queue_name)
+
+    for webhook, webhook_events in webhook_queue.items():
+        for i in range(0, len(webhook_events), WEBHOOK_COALESCING_MAX_EVENTS):
+            rq_queue.enqueue(
+                "extras.webhooks.send_webhooks",
+                webhook=webhook,
+                events=webhook_events[i:i + WEBHOOK_COALESCING_MAX_EVENTS],
+                retry=get_rq_retry()
+            )
 
 
 def process_event_queue(events):
@@ -158,6 +293,7 @@ def process_event_queue(events):
     Flush a list of object representation to RQ for EventRule processing.
     """
     events_cache = defaultdict(dict)
+    webhook_queue = defaultdict(list) if settings.WEBHOOK_COALESCING else None
 
     for event in events:
         event_type = event['event_type']
@@ -165,11 +301,10 @@ def process_event_queue(events):
 
         # Cache applicable Event Rules
         if object_type not in events_cache[event_type]:
-            events_cache[event_type][object_type] = EventRule.objects.filter(
-                event_types__contains=[event['event_type']],
-                object_types=object_type,
-                enabled=True
-            )
+            if rule_ids := get_event_rule_index().get((object_type.pk, event_type)):
+                events_cache[event_type][object_type] = EventRule.objects.filter(pk__in=rule_ids)
+            else:
+                events_cache[event_type][object_type] = EventRule.objects.none()
         event_rules = events_cache[event_type][object_type]
 
         process_event_rules(
@@ -179,14 +314,21 @@ def process_event_queue(events):
             data=event['data'],
             username=event['username'],
             snapshots=event['snapshots'],
-            request_id=event['request_id']
+            request_id=event['request_id'],
+            webhook_queue=webhook_queue,
+            timestamp=event.get('timestamp')
         )
 
+    if webhook_queue:
+        enqueue_webhooks(webhook_queue)
+
 
 def flush_events(events):
     """
     Flush a list of object representations to RQ for event processing.
     """
+    # Discard placeholders for skipped events (see enqueue_event())
+    events = [event for event in events if not event.get('skipped')]
     if events:
         for name in settings.EVENTS_PIPELINE:
             try:
@@ -77,7 +77,7 @@ class WebhookFilterSet(NetBoxModelFilterSet):
         model = Webhook
         fields = (
             'id', 'name', 'payload_url', 'http_method', 'http_content_type', 'secret', 'ssl_verification',
-            'ca_file_path', 'description',
+            'ca_file_path', 'batch_size', 'description',
         )
 
     def search(self, queryset, name, value):
@@ -264,6 +264,11 @@ class WebhookBulkEditForm(NetBoxModelBulkEditForm):
         required=False,
         label=_('CA file path')
     )
+    batch_size = forms.IntegerField(
+        required=False,
+        min_value=1,
+        label=_('Batch size')
+    )
 
     nullable_fields = ('secret', 'ca_file_path')
 
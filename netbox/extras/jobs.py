@@ -1,17 +1,24 @@
 import logging
+import tempfile
 import traceback
 from contextlib import ExitStack
 
+from django.core.files import File
+from django.core.files.storage import storages
 from django.db import transaction
 from django.utils.translation import gettext as _
 
 from core.signals import clear_events
-from extras.models import Script as ScriptModel
+from dcim.models import Device
+from extras.models import ExportTemplate, Script as ScriptModel
 from netbox.jobs import JobRunner
 from netbox.registry import registry
 from utilities.exceptions import AbortScript, AbortTransaction
+from virtualization.models import VirtualMachine
 from .utils import is_report
 
+logger = logging.getLogger(__name__)
+
 
 class ScriptJob(JobRunner):
     """
@@ -110,3 +117,59 @@ class ScriptJob(JobRunner):
                 self.run_script(script, request, data, commit)
         else:
             self.run_script(script, request, data, commit)
+
+
+class ConfigContextRefreshJob(JobRunner):
+    """
+    Compute and store the config context data of all devices and virtual machines whose materialized data has been
+    invalidated (see CONFIG_CONTEXT_MATERIALIZATION).
+    """
+    class Meta:
+        name = 'Config Context Refresh'
+
+    def run(self, *args, **kwargs):
+        for model in (Device, VirtualMachine):
+            count = model.objects.filter(_config_context_data__isnull=True).refresh_config_context_data()
+            logger.info(f"Refreshed config context data for {count} {model._meta.verbose_name_plural}")
+
+
+class ExportTemplateJob(JobRunner):
+    """
+    Render an ExportTemplate for a queryset in the background, and save the output to the "exports" file storage.
+    """
+    class Meta:
+        name = 'Export Template'
+
+    @staticmethod
+    def get_output_path(job_id):
+        """
+        Return the storage path (directory) to which the output of the specified job is saved.
+        """
+        return f'{job_id}/'
+
+    def run(self, template_id, query, **kwargs):
+        """
+        Args:
+            template_id: The primary key of the ExportTemplate to render
+            query: The Query of the QuerySet for which the template is rendered
+        """
+        template = ExportTemplate.objects.get(pk=template_id)
+        queryset = query.model.objects.all()
+        queryset.query = query
+
+        # Render the output to a temporary file, then save it to storage
+        with tempfile.TemporaryFile() as f:
+            for chunk in template.render_stream(queryset=queryset):
+                f.write(chunk.encode())
+            size = f.tell()
+            f.seek(0)
+            filename = template.get_filename(queryset=queryset)
+            path = storages['exports'].save(
+                f'{self.get_output_path(self.job.job_id)}{filename}', File(f, name=filename)
+            )
+
+        self.job.data = {
+            'file': path,
+            'size': size,
+        }
+        logger.info(f"Rendered export template {template} ({size} bytes) to {path}")
@@ -1,21 +1,81 @@
+import time
+import uuid
 from datetime import timedelta
 from importlib import import_module
 
 import requests
 from django.conf import settings
 from django.core.cache import cache
+from django.core.files.storage import storages
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from packaging import version
 
 from core.models import Job, ObjectChange
+from extras.jobs import ExportTemplateJob
 from netbox.config import Config
+from utilities.parallel import iterate_pks
 from utilities.proxy import resolve_proxies
 
 
 class Command(BaseCommand):
     help = "Perform nightly housekeeping tasks. (This command can be run at any time.)"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help="Number of expired records to delete per transaction (default: 10000)"
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help="Seconds to pause between batches of deletions (default: 0)"
+        )
+
+    def delete_expired_records(self, queryset, expired_count, **options):
+        """
+        Delete the records in the given queryset in batches of the configured size, each in its own transaction.
+        Successive batches are retrieved by primary key, without rescanning the records already deleted.
+        """
+        deleted_count = 0
+        for pks in iterate_pks(queryset, chunk_size=options['batch_size']):
+            queryset.model.objects.filter(pk__in=pks).delete()
+            deleted_count += len(pks)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"\tDeleted {deleted_count}/{expired_count} records")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        return deleted_count
+
+    def delete_orphaned_export_files(self):
+        """
+        Delete any files saved by export template jobs which no longer exist. Returns the number of files deleted.
+        """
+        storage = storages['exports']
+        try:
+            dirs, _ = storage.listdir('')
+        except (FileNotFoundError, NotImplementedError):
+            return 0
+
+        job_ids = set()
+        for name in dirs:
+            try:
+                job_ids.add(uuid.UUID(name))
+            except ValueError:
+                continue
+        job_ids.difference_update(Job.objects.filter(job_id__in=job_ids).values_list('job_id', flat=True))
+
+        deleted_count = 0
+        for job_id in job_ids:
+            path = ExportTemplateJob.get_output_path(job_id)
+            for filename in storage.listdir(path)[1]:
+                storage.delete(f'{path}{filename}')
+                deleted_count += 1
+        return deleted_count
+
     def handle(self, *args, **options):
         config = Config()
 
@@ -44,16 +104,17 @@ class Command(BaseCommand):
             if options['verbosity'] >= 2:
                 self.stdout.write(f"\tRetention period: {config.CHANGELOG_RETENTION} days")
                 self.stdout.write(f"\tCut-off time: {cutoff}")
-            expired_records = ObjectChange.objects.filter(time__lt=cutoff).count()
-            if expired_records:
+            expired_records = ObjectChange.objects.filter(time__lt=cutoff)
+            expired_count = expired_records.count()
+            if expired_count:
                 if options['verbosity']:
                     self.stdout.write(
-                        f"\tDeleting {expired_records} expired records... ",
+                        f"\tDeleting {expired_count} expired records... ",
                         self.style.WARNING,
-                        ending=""
+                        ending="\n" if options['verbosity'] >= 2 else ""
                     )
                     self.stdout.flush()
-                ObjectChange.objects.filter(time__lt=cutoff).delete()
+                self.delete_expired_records(expired_records, expired_count, **options)
                 if options['verbosity']:
                     self.stdout.write("Done.", self.style.SUCCESS)
             elif options['verbosity']:
@@ -71,16 +132,17 @@ class Command(BaseCommand):
             if options['verbosity'] >= 2:
                 self.stdout.write(f"\tRetention period: {config.JOB_RETENTION} days")
                 self.stdout.write(f"\tCut-off time: {cutoff}")
-            expired_records = Job.objects.filter(created__lt=cutoff).count()
-            if expired_records:
+            expired_records = Job.objects.filter(created__lt=cutoff)
+            expired_count = expired_records.count()
+            if expired_count:
                 if options['verbosity']:
                     self.stdout.write(
-                        f"\tDeleting {expired_records} expired records... ",
+                        f"\tDeleting {expired_count} expired records... ",
                         self.style.WARNING,
-                        ending=""
+                        ending="\n" if options['verbosity'] >= 2 else ""
                     )
                     self.stdout.flush()
-                Job.objects.filter(created__lt=cutoff).delete()
+                self.delete_expired_records(expired_records, expired_count, **options)
                 if options['verbosity']:
                     self.stdout.write("Done.", self.style.SUCCESS)
             elif options['verbosity']:
@@ -90,6 +152,16 @@ class Command(BaseCommand):
                 f"\tSkipping: No retention period specified (JOB_RETENTION = {config.JOB_RETENTION})"
             )
 
+        # Delete export files of jobs which no longer exist
+        if options['verbosity']:
+            self.stdout.write("[*] Checking for orphaned export files")
+        deleted_count = self.delete_orphaned_export_files()
+        if options['verbosity']:
+            if deleted_count:
+                self.stdout.write(f"\tDeleted {deleted_count} files.", self.style.SUCCESS)
+            else:
+                self.stdout.write("\tNo orphaned files found.", self.style.SUCCESS)
+
         # Check for new releases (if enabled)
         if options['verbosity']:
             self.stdout.write("[*] Checking for latest release")
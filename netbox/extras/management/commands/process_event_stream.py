@@ -0,0 +1,58 @@
+import os
+import socket
+
+from django.core.management.base import BaseCommand
+
+from extras.streams import EVENT_STREAM_KEY, consume_events
+
+
+class Command(BaseCommand):
+    help = "Process events published to the Redis event stream (see the EVENTS_PIPELINE configuration parameter)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--consumer',
+            default=f'{socket.gethostname()}-{os.getpid()}',
+            help="Name of this consumer within the consumer group (default: hostname and process ID)"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help="Maximum number of events to read and process at a time (default: 100)"
+        )
+        parser.add_argument(
+            '--block',
+            type=int,
+            default=5000,
+            help="Milliseconds to wait for new events before checking for stale messages (default: 5000)"
+        )
+        parser.add_argument(
+            '--min-idle-time',
+            type=int,
+            default=60000,
+            help="Milliseconds after which events left unacknowledged by another consumer are claimed (default: 60000)"
+        )
+        parser.add_argument(
+            '--max-deliveries',
+            type=int,
+            default=5,
+            help="Number of delivery attempts after which an event is discarded (default: 5)"
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Exit once all available events have been processed"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Consuming events from {EVENT_STREAM_KEY} as {options['consumer']}...")
+        count = consume_events(
+            consumer=options['consumer'],
+            batch_size=options['batch_size'],
+            block=options['block'],
+            min_idle_time=options['min_idle_time'],
+            max_deliveries=options['max_deliveries'],
+            once=options['once']
+        )
+        self.stdout.write(self.style.SUCCESS(f"Processed {count} events."))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from dcim.models import Device
+from virtualization.models import VirtualMachine
+
+
+class Command(BaseCommand):
+    help = "Compute and store the config context data of devices and virtual machines"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--invalidated',
+            action='store_true',
+            help="Refresh only objects whose stored data has been invalidated"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help="Number of objects to refresh at a time (default: 1000)"
+        )
+
+    def handle(self, *args, **options):
+        for model in (Device, VirtualMachine):
+            queryset = model.objects.all()
+            if options['invalidated']:
+                queryset = queryset.filter(_config_context_data__isnull=True)
+            self.stdout.write(f"Refreshing config context data for {model._meta.verbose_name_plural}...")
+            count = queryset.refresh_config_context_data(chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f"  Refreshed {count} objects"))
+        self.stdout.write("Done.")
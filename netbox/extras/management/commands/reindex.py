@@ -1,9 +1,34 @@
+import time
+from collections import defaultdict
+
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
 from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
 from django.utils.translation import gettext as _
 
 from netbox.registry import registry
 from netbox.search.backends import search_backend
+from utilities.parallel import iterate_pks, run_parallel
+
+CHECKPOINT_CACHE_KEY = 'reindex_checkpoint'
+
+
+def reindex_range(label, start_pk, end_pk, chunk_size, remove_existing=True):
+    """
+    Cache all objects of the given model with a primary key within the specified range (inclusive), retrieving
+    objects in chunks. If remove_existing is False, existing cache entries for the objects are not deleted first.
+    Returns the number of objects processed and cache entries created.
+    """
+    model = registry['search'][label].model
+    queryset = model.objects.filter(pk__gte=start_pk, pk__lte=end_pk)
+    object_count = entry_count = 0
+
+    for pks in iterate_pks(queryset, chunk_size=chunk_size):
+        object_count += len(pks)
+        entry_count += search_backend.flush({model: set(pks)}, remove_existing=remove_existing)
+
+    return label, start_pk, end_pk, object_count, entry_count
 
 
 class Command(BaseCommand):
@@ -21,6 +46,29 @@ class Command(BaseCommand):
             action='store_true',
             help="For each model, reindex objects only if no cache entries already exist"
         )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Resume an interrupted reindexing operation from its last checkpoint"
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of worker processes to employ (default: 1)"
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help="Number of objects to retrieve and cache at a time (default: 1000)"
+        )
+        parser.add_argument(
+            '--range-size',
+            type=int,
+            default=100000,
+            help="Span of primary keys assigned to a worker as a single unit of work (default: 100000)"
+        )
 
     def _get_indexers(self, *model_names):
         indexers = {}
@@ -59,45 +107,111 @@ class Command(BaseCommand):
 
         return indexers
 
+    @staticmethod
+    def _get_ranges(model, range_size):
+        """
+        Divide the primary keys of a model into ranges of the specified size.
+        """
+        bounds = model.objects.aggregate(min_pk=Min('pk'), max_pk=Max('pk'))
+        if bounds['min_pk'] is None:
+            return []
+        return [
+            [start_pk, min(start_pk + range_size - 1, bounds['max_pk'])]
+            for start_pk in range(bounds['min_pk'], bounds['max_pk'] + 1, range_size)
+        ]
+
     def handle(self, *model_labels, **kwargs):
 
         # Determine which models to reindex
         indexers = self._get_indexers(*model_labels)
         if not indexers:
             raise CommandError(_("No indexers found!"))
-        self.stdout.write(f'Reindexing {len(indexers)} models.')
 
-        # Clear cached values for the specified models (if not being lazy)
-        if not kwargs['lazy']:
-            if model_labels:
-                content_types = [ContentType.objects.get_for_model(model) for model in indexers.keys()]
-            else:
-                content_types = None
+        # Load the checkpoint of an interrupted operation (if resuming)
+        checkpoint = cache.get(CHECKPOINT_CACHE_KEY) if kwargs['resume'] else None
+        if kwargs['resume'] and checkpoint is None:
+            self.stdout.write('No checkpoint found; starting from the beginning.')
+
+        # Objects need not have their existing cache entries removed if the cache has just been cleared. (Ranges
+        # being resumed may have been partially reindexed.)
+        cleared = False
+
+        if checkpoint is not None:
+            pending = {
+                label: ranges for label, ranges in checkpoint['pending'].items()
+                if registry['search'].get(label) in indexers.values()
+            }
+            self.stdout.write(f'Resuming reindexing of {len(pending)} models.')
 
-            self.stdout.write('Clearing cached values... ', ending='')
-            self.stdout.flush()
-            deleted_count = search_backend.clear(object_types=content_types)
-            self.stdout.write(f'{deleted_count} entries deleted.')
+        else:
+            self.stdout.write(f'Reindexing {len(indexers)} models.')
+
+            # Clear cached values for the specified models (if not being lazy)
+            if not kwargs['lazy']:
+                if model_labels:
+                    content_types = [ContentType.objects.get_for_model(model) for model in indexers.keys()]
+                else:
+                    content_types = None
+
+                self.stdout.write('Clearing cached values... ', ending='')
+                self.stdout.flush()
+                deleted_count = search_backend.clear(object_types=content_types)
+                cleared = True
+                self.stdout.write(f'{deleted_count} entries deleted.')
+
+            # Divide each model's objects into ranges of primary keys
+            pending = {}
+            for model, idx in indexers.items():
+                label = f'{model._meta.app_label}.{model._meta.model_name}'
+                if kwargs['lazy']:
+                    content_type = ContentType.objects.get_for_model(model)
+                    if cached_count := search_backend.count(object_types=[content_type]):
+                        self.stdout.write(f'  {label}: Skipping (found {cached_count} existing).')
+                        continue
+                if ranges := self._get_ranges(model, kwargs['range_size']):
+                    pending[label] = ranges
+                else:
+                    self.stdout.write(f'  {label}: No objects found.')
+
+        cache.set(CHECKPOINT_CACHE_KEY, {'pending': pending}, None)
 
         # Index models
-        self.stdout.write('Indexing models')
-        for model, idx in indexers.items():
-            app_label = model._meta.app_label
-            model_name = model._meta.model_name
-            self.stdout.write(f'  {app_label}.{model_name}... ', ending='')
-            self.stdout.flush()
-
-            if kwargs['lazy']:
-                content_type = ContentType.objects.get_for_model(model)
-                if cached_count := search_backend.count(object_types=[content_type]):
-                    self.stdout.write(f'Skipping (found {cached_count} existing).')
-                    continue
-
-            i = search_backend.cache(model.objects.iterator(), remove_existing=False)
-            if i:
-                self.stdout.write(f'{i} entries cached.')
-            else:
-                self.stdout.write('No objects found.')
+        self.stdout.write(f'Indexing models ({kwargs["workers"]} workers)')
+        tasks = [
+            (label, start_pk, end_pk, kwargs['chunk_size'], not cleared)
+            for label, ranges in pending.items()
+            for start_pk, end_pk in ranges
+        ]
+        object_counts = defaultdict(int)
+        entry_counts = defaultdict(int)
+        start_time = time.monotonic()
+
+        for label, start_pk, end_pk, object_count, entry_count in run_parallel(
+            reindex_range, tasks, workers=kwargs['workers']
+        ):
+            object_counts[label] += object_count
+            entry_counts[label] += entry_count
+
+            # Record the completed range in the checkpoint
+            pending[label].remove([start_pk, end_pk])
+            if not pending[label]:
+                del pending[label]
+                self.stdout.write(
+                    f'  {label}: {object_counts[label]} objects, {entry_counts[label]} entries cached.'
+                )
+            cache.set(CHECKPOINT_CACHE_KEY, {'pending': pending}, None)
+
+        # Reindexing has completed; discard the checkpoint
+        cache.delete(CHECKPOINT_CACHE_KEY)
+
+        elapsed = time.monotonic() - start_time
+        total_objects = sum(object_counts.values())
+        total_entries = sum(entry_counts.values())
+        self.stdout.write(
+            f'Cached {total_entries} entries for {total_objects} objects in {elapsed:.1f} seconds '
+            f'({total_objects / elapsed if elapsed else 0:.0f} objects/sec, '
+            f'{total_entries / elapsed if elapsed else 0:.0f} entries/sec).'
+        )
 
         msg = 'Completed.'
         if total_count := search_backend.size:
@@ -167,9 +167,33 @@ class ConfigContextModel(models.Model):
         )
     )
 
+    # Materialized config context data (see CONFIG_CONTEXT_MATERIALIZATION)
+    _config_context_data = models.JSONField(
+        blank=True,
+        null=True,
+        editable=False,
+        serialize=False
+    )
+
     class Meta:
         abstract = True
 
+    def save(self, *args, **kwargs):
+        # Never write the materialized config context data when saving an existing object, as the value held in
+        # memory may since have been invalidated (see refresh_config_context_data()).
+        if not self._state.adding and not kwargs.get('force_insert'):
+            if kwargs.get('update_fields') is None:
+                deferred_fields = self.get_deferred_fields()
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.attname not in deferred_fields
+                ]
+            kwargs['update_fields'] = [
+                name for name in kwargs['update_fields'] if name != '_config_context_data'
+            ]
+
+        super().save(*args, **kwargs)
+
     def get_config_context(self):
         """
         Compile all config data, overwriting lower-weight values with higher-weight values where a collision occurs.
@@ -178,8 +202,12 @@ class ConfigContextModel(models.Model):
         data = {}
 
         if not hasattr(self, 'config_context_data'):
-            # The annotation is not available, so we fall back to manually querying for the config context objects
-            config_context_data = ConfigContext.objects.get_for_object(self, aggregate_data=True) or []
+            if settings.CONFIG_CONTEXT_MATERIALIZATION and self._config_context_data is not None:
+                # Use the materialized config context data
+                config_context_data = self._config_context_data
+            else:
+                # The annotation is not available, so we fall back to manually querying for the config context objects
+                config_context_data = ConfigContext.objects.get_for_object(self, aggregate_data=True) or []
         else:
             # The attribute may exist, but the annotated value could be None if there is no config context data
             config_context_data = self.config_context_data or []
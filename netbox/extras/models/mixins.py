@@ -2,22 +2,27 @@ import importlib.abc
 import importlib.util
 import os
 import sys
+from itertools import chain
 
 from django.core.files.storage import storages
 from django.db import models
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.utils.module_loading import import_string
 from django.utils.translation import gettext_lazy as _
 
 from extras.constants import DEFAULT_MIME_TYPE, JINJA_ENV_PARAMS_WITH_PATH_IMPORT
 from extras.utils import filename_from_model, filename_from_object
-from utilities.jinja2 import render_jinja2
+from utilities.jinja2 import template_cache
+from utilities.querysets import ChunkedQuerySet
 
 __all__ = (
     'PythonModuleMixin',
     'RenderTemplateMixin',
 )
 
+# Approximate number of characters of rendered output yielded at a time by RenderTemplateMixin.render_stream()
+STREAM_BUFFER_SIZE = 65536
+
 
 class CustomStoragesLoader(importlib.abc.Loader):
     """
@@ -136,36 +141,90 @@ class RenderTemplateMixin(models.Model):
                 params[name] = import_string(value)
         return params
 
+    def get_template(self):
+        """
+        Return the compiled Jinja2 template. Compiled templates (along with their environments, and thus any templates
+        they include) are retrieved from the process-wide template cache where possible.
+        """
+        return template_cache.get(
+            self.template_code,
+            self.get_environment_params(),
+            getattr(self, 'data_file', None),
+            owner=self
+        )
+
     def render(self, context=None, queryset=None):
         """
         Render the template with the provided context. The context is passed to the Jinja2 environment as a dictionary.
         """
         context = self.get_context(context=context, queryset=queryset)
-        env_params = self.get_environment_params()
-        output = render_jinja2(self.template_code, context, env_params, getattr(self, 'data_file', None))
+        output = self.get_template().render(**context)
 
         # Replace CRLF-style line terminators
         output = output.replace('\r\n', '\n')
 
         return output
 
-    def render_to_response(self, context=None, queryset=None):
-        output = self.render(context=context, queryset=queryset)
+    def render_stream(self, context=None, queryset=None, chunk_size=1000):
+        """
+        Render the template incrementally, yielding its output in chunks of approximately STREAM_BUFFER_SIZE
+        characters. The queryset (if any) is iterated in chunks of the specified size without caching its objects, so
+        that memory consumption remains constant regardless of its size.
+        """
+        if queryset is not None:
+            queryset = ChunkedQuerySet(queryset, chunk_size=chunk_size)
+        context = self.get_context(context=context, queryset=queryset)
+
+        buffer = []
+        size = 0
+        for output in self.get_template().generate(**context):
+            buffer.append(output)
+            size += len(output)
+            if size >= STREAM_BUFFER_SIZE:
+                output = ''.join(buffer)
+                # Hold back a trailing carriage return, in case it is followed by a newline
+                buffer = ['\r'] if output.endswith('\r') else []
+                size = sum(map(len, buffer))
+                # Replace CRLF-style line terminators
+                yield output.removesuffix('\r').replace('\r\n', '\n')
+
+        if buffer:
+            yield ''.join(buffer).replace('\r\n', '\n')
+
+    def get_filename(self, context=None, queryset=None):
+        """
+        Return the name of the file (including its extension) to which the rendered template is to be saved.
+        """
+        extension = f'.{self.file_extension}' if self.file_extension else ''
+        if self.file_name:
+            filename = self.file_name
+        elif queryset is not None:
+            filename = filename_from_model(queryset.model)
+        elif context:
+            filename = filename_from_object(context)
+        else:
+            filename = "output"
+        return f'{filename}{extension}'
+
+    def render_to_response(self, context=None, queryset=None, stream=False):
+        """
+        Render the template and return an HTTP response. If stream is True, the output is streamed to the client as it
+        is rendered (see render_stream()). Any error raised before the first chunk of output has been rendered is
+        raised immediately.
+        """
         mime_type = self.mime_type or DEFAULT_MIME_TYPE
 
         # Build the response
-        response = HttpResponse(output, content_type=mime_type)
+        if stream:
+            output = self.render_stream(context=context, queryset=queryset)
+            first_chunk = next(output, '')
+            response = StreamingHttpResponse(chain([first_chunk], output), content_type=mime_type)
+        else:
+            output = self.render(context=context, queryset=queryset)
+            response = HttpResponse(output, content_type=mime_type)
 
         if self.as_attachment:
-            extension = f'.{self.file_extension}' if self.file_extension else ''
-            if self.file_name:
-                filename = self.file_name
-            elif queryset:
-                filename = filename_from_model(queryset.model)
-            elif context:
-                filename = filename_from_object(context)
-            else:
-                filename = "output"
-            response['Content-Disposition'] = f'attachment; filename="{filename}{extension}"'
+            filename = self.get_filename(context=context, queryset=queryset)
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
         return response
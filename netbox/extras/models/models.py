@@ -4,7 +4,7 @@ import urllib.parse
 from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.postgres.fields import ArrayField
-from django.core.validators import ValidationError
+from django.core.validators import MinValueValidator, ValidationError
 from django.db import models
 from django.urls import reverse
 from django.utils import timezone
@@ -13,7 +13,7 @@ from rest_framework.utils.encoders import JSONEncoder
 
 from core.models import ObjectType
 from extras.choices import *
-from extras.conditions import ConditionSet, InvalidCondition
+from extras.conditions import ConditionSet, InvalidCondition, get_condition_set
 from extras.constants import *
 from extras.utils import image_upload
 from extras.models.mixins import RenderTemplateMixin
@@ -145,10 +145,11 @@ class EventRule(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLogged
         logger = logging.getLogger('netbox.event_rules')
 
         try:
-            result = ConditionSet(self.conditions).eval(data)
+            key = ('extras.eventrule', self.pk) if self.pk else None
+            result = get_condition_set(self.conditions, key=key).eval(data)
             logger.debug(f'{self.name}: Evaluated as {result}')
             return result
-        except InvalidCondition as e:
+        except (InvalidCondition, ValueError) as e:
             logger.error(f"{self.name}: Evaluation failed. {e}")
             return False
 
@@ -233,6 +234,16 @@ class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedMo
             "The specific CA certificate file to use for SSL verification. Leave blank to use the system defaults."
         )
     )
+    batch_size = models.PositiveSmallIntegerField(
+        verbose_name=_('batch size'),
+        default=1,
+        validators=(MinValueValidator(1),),
+        help_text=_(
+            "The maximum number of events to deliver in a single request. When greater than one, coalesced events are "
+            "delivered together, and the URL, headers, and body are rendered with a list of individual event contexts "
+            "as <code>events</code>."
+        )
+    )
     events = GenericRelation(
         EventRule,
         content_type_field='action_object_type',
@@ -270,7 +281,7 @@ class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedMo
         if not self.additional_headers:
             return {}
         ret = {}
-        data = render_jinja2(self.additional_headers, context)
+        data = render_jinja2(self.additional_headers, context, owner=self)
         for line in data.splitlines():
             header, value = line.split(':', 1)
             ret[header.strip()] = value.strip()
@@ -281,7 +292,7 @@ class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedMo
         Render the body template, if defined. Otherwise, jump the context as a JSON object.
         """
         if self.body_template:
-            return render_jinja2(self.body_template, context)
+            return render_jinja2(self.body_template, context, owner=self)
         else:
             return json.dumps(context, cls=JSONEncoder)
 
@@ -289,7 +300,7 @@ class Webhook(CustomFieldsMixin, ExportTemplatesMixin, TagsMixin, ChangeLoggedMo
         """
         Render the payload URL.
         """
-        return render_jinja2(self.payload_url, context)
+        return render_jinja2(self.payload_url, context, owner=self)
 
 
 class CustomLink(CloningMixin, ExportTemplatesMixin, ChangeLoggedModel):
@@ -367,10 +378,10 @@ class CustomLink(CloningMixin, ExportTemplatesMixin, ChangeLoggedModel):
 
         :param context: The context passed to Jinja2
         """
-        text = render_jinja2(self.link_text, context).strip()
+        text = render_jinja2(self.link_text, context, owner=self).strip()
         if not text:
             return {}
-        link = render_jinja2(self.link_url, context).strip()
+        link = render_jinja2(self.link_url, context, owner=self).strip()
         link_target = ' target="_blank"' if self.new_window else ''
 
         # Sanitize link text
@@ -1,7 +1,10 @@
+from django.conf import settings
 from django.contrib.postgres.aggregates import JSONBAgg
-from django.db.models import OuterRef, Subquery, Q
+from django.db.models import F, JSONField, OuterRef, Subquery, Q
+from django.db.models.functions import Coalesce
 
 from extras.models.tags import TaggedItem
+from utilities.parallel import iterate_pks
 from utilities.query_functions import EmptyGroupByJSONBAgg
 from utilities.querysets import RestrictedQuerySet
 
@@ -78,22 +81,56 @@ class ConfigContextModelQuerySet(RestrictedQuerySet):
     implemented as a subquery which performs all the joins necessary to filter relevant config context objects.
     This offers a substantial performance gain over ConfigContextQuerySet.get_for_object() when dealing with
     multiple objects. This allows the annotation to be entirely optional.
+
+    If CONFIG_CONTEXT_MATERIALIZATION is enabled, the aggregated data for each object is stored in its
+    _config_context_data field, and the subquery is evaluated only for objects whose stored data has been invalidated.
     """
     def annotate_config_context_data(self):
         """
         Attach the subquery annotation to the base queryset
         """
-        from extras.models import ConfigContext
+        subquery = self._get_config_context_subquery()
+        if settings.CONFIG_CONTEXT_MATERIALIZATION:
+            return self.annotate(
+                config_context_data=Coalesce(F('_config_context_data'), subquery, output_field=JSONField())
+            ).distinct()
         return self.annotate(
-            config_context_data=Subquery(
-                ConfigContext.objects.filter(
-                    self._get_config_context_filters()
-                ).annotate(
-                    _data=EmptyGroupByJSONBAgg('data', ordering=['weight', 'name'])
-                ).values("_data").order_by()
-            )
+            config_context_data=subquery
         ).distinct()
 
+    def refresh_config_context_data(self, chunk_size=1000):
+        """
+        Compute and store the aggregated config context data for all objects in the queryset, in chunks of the
+        specified size. Returns the number of objects updated.
+        """
+        model = self.model
+        count = 0
+        for pks in iterate_pks(self, chunk_size):
+            objects = model.objects.filter(pk__in=pks).annotate(
+                _data=self._get_config_context_subquery()
+            ).only('pk')
+            for obj in objects:
+                obj._config_context_data = obj._data or []
+            count += model.objects.bulk_update(objects, ['_config_context_data'])
+        return count
+
+    def invalidate_config_context_data(self):
+        """
+        Clear the stored config context data for all objects in the queryset, so that it is computed on demand until
+        refreshed. Returns the number of objects invalidated.
+        """
+        return self.filter(_config_context_data__isnull=False).update(_config_context_data=None)
+
+    def _get_config_context_subquery(self):
+        from extras.models import ConfigContext
+        return Subquery(
+            ConfigContext.objects.filter(
+                self._get_config_context_filters()
+            ).annotate(
+                _data=EmptyGroupByJSONBAgg('data', ordering=['weight', 'name'])
+            ).values("_data").order_by()
+        )
+
     def _get_config_context_filters(self):
         # Construct the set of Q objects for the specific object types
         tag_query_filters = {
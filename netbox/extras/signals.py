@@ -1,16 +1,26 @@
+from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
-from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.core.files.storage import storages
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from core.events import *
-from core.models import ObjectType
+from core.models import Job, ObjectType
 from core.signals import job_end, job_start
-from extras.events import process_event_rules
-from extras.models import EventRule, Notification, Subscription
+from dcim.models import Device, DeviceRole, DeviceType, Location, Platform, Rack, Region, Site, SiteGroup
+from extras.events import clear_event_rule_index, process_event_rules
+from extras.jobs import ConfigContextRefreshJob, ExportTemplateJob
+from extras.models import (
+    ConfigContext, ConfigTemplate, CustomLink, EventRule, ExportTemplate, Notification, Subscription, Tag, Webhook,
+)
 from netbox.config import get_config
 from netbox.registry import registry
 from netbox.signals import post_clean
+from tenancy.models import Tenant, TenantGroup
 from utilities.exceptions import AbortRequest
+from utilities.jinja2 import template_cache
+from virtualization.models import Cluster, ClusterGroup, ClusterType, VirtualMachine
 from .models import CustomField, TaggedItem
 from .utils import run_validators
 
@@ -89,10 +99,203 @@ def validate_assigned_tags(sender, instance, action, model, pk_set, **kwargs):
             raise AbortRequest(f"Tag {tag} cannot be assigned to {ct.model} objects.")
 
 
+#
+# Config contexts
+#
+
+# Attributes of devices and virtual machines which determine the ConfigContexts applicable to them
+CONFIG_CONTEXT_ATTRS = ('site', 'location', 'device_type', 'role', 'platform', 'cluster', 'tenant')
+
+
+def has_changed(instance, fields):
+    """
+    Return True if any of the specified fields has changed since the instance's pre-change snapshot was taken (or if
+    no snapshot is available).
+    """
+    snapshot = getattr(instance, '_prechange_snapshot', None)
+    if not snapshot:
+        return True
+    return any(
+        snapshot.get(name) != instance._meta.get_field(name).value_from_object(instance)
+        for name in fields if hasattr(instance, name)
+    )
+
+
+def invalidate_config_context_data(models=(Device, VirtualMachine), **filters):
+    """
+    Invalidate the materialized config context data of all devices and/or virtual machines matching the specified
+    filters, and schedule it to be refreshed once the current transaction has been committed.
+    """
+    for model in models:
+        model.objects.filter(**filters).invalidate_config_context_data()
+    transaction.on_commit(ConfigContextRefreshJob.enqueue_once)
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_save, sender=VirtualMachine)
+def update_config_context_data(sender, instance, created, raw, **kwargs):
+    """
+    Refresh the materialized config context data of a device or virtual machine when it is created, or when any of the
+    attributes which determine its applicable ConfigContexts has changed.
+    """
+    if not settings.CONFIG_CONTEXT_MATERIALIZATION or raw:
+        return
+    if created or has_changed(instance, CONFIG_CONTEXT_ATTRS):
+        sender.objects.filter(pk=instance.pk).refresh_config_context_data()
+
+
+@receiver(m2m_changed, sender=TaggedItem)
+def handle_tags_changed(sender, instance, action, model, pk_set, **kwargs):
+    """
+    Refresh the materialized config context data of devices and virtual machines when their tags are changed.
+    """
+    if not settings.CONFIG_CONTEXT_MATERIALIZATION or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, (Device, VirtualMachine)):
+        queryset = type(instance).objects.filter(pk=instance.pk)
+    elif model in (Device, VirtualMachine):
+        queryset = model.objects.filter(pk__in=pk_set) if pk_set else model.objects.all()
+    else:
+        return
+    queryset.refresh_config_context_data()
+
+
+@receiver((post_save, post_delete), sender=ConfigContext)
+@receiver(m2m_changed, sender=ConfigContext.regions.through)
+@receiver(m2m_changed, sender=ConfigContext.site_groups.through)
+@receiver(m2m_changed, sender=ConfigContext.sites.through)
+@receiver(m2m_changed, sender=ConfigContext.locations.through)
+@receiver(m2m_changed, sender=ConfigContext.device_types.through)
+@receiver(m2m_changed, sender=ConfigContext.roles.through)
+@receiver(m2m_changed, sender=ConfigContext.platforms.through)
+@receiver(m2m_changed, sender=ConfigContext.cluster_types.through)
+@receiver(m2m_changed, sender=ConfigContext.cluster_groups.through)
+@receiver(m2m_changed, sender=ConfigContext.clusters.through)
+@receiver(m2m_changed, sender=ConfigContext.tenant_groups.through)
+@receiver(m2m_changed, sender=ConfigContext.tenants.through)
+@receiver(m2m_changed, sender=ConfigContext.tags.through)
+def handle_config_context_changed(action=None, **kwargs):
+    """
+    Invalidate all materialized config context data whenever a ConfigContext (or its assignment) is changed.
+    """
+    if not settings.CONFIG_CONTEXT_MATERIALIZATION:
+        return
+    if action in (None, 'post_add', 'post_remove', 'post_clear'):
+        invalidate_config_context_data()
+
+
+@receiver((post_save, post_delete), sender=Region)
+@receiver((post_save, post_delete), sender=SiteGroup)
+@receiver((post_save, post_delete), sender=DeviceRole)
+def handle_config_context_tree_changed(sender, instance, **kwargs):
+    """
+    Invalidate all materialized config context data when a Region, SiteGroup, or DeviceRole is moved within (or removed
+    from) its tree, as ConfigContexts assigned to its ancestors may no longer apply (or vice versa).
+    """
+    if not settings.CONFIG_CONTEXT_MATERIALIZATION or kwargs.get('created') or kwargs.get('raw'):
+        return
+    if 'created' not in kwargs or has_changed(instance, ('parent',)):
+        invalidate_config_context_data()
+
+
+@receiver(post_delete, sender=Site)
+@receiver(post_delete, sender=Location)
+@receiver(post_delete, sender=DeviceType)
+@receiver(post_delete, sender=Platform)
+@receiver(post_delete, sender=ClusterType)
+@receiver(post_delete, sender=ClusterGroup)
+@receiver(post_delete, sender=Cluster)
+@receiver(post_delete, sender=TenantGroup)
+@receiver(post_delete, sender=Tenant)
+@receiver(post_delete, sender=Tag)
+def handle_config_context_assignment_deleted(**kwargs):
+    """
+    Invalidate all materialized config context data when an object to which ConfigContexts may be assigned is deleted.
+    Its assignments to ConfigContexts, as well as any references to it from devices and virtual machines, are removed
+    in bulk (without sending signals).
+    """
+    if settings.CONFIG_CONTEXT_MATERIALIZATION:
+        invalidate_config_context_data()
+
+
+@receiver(post_save, sender=Site)
+@receiver(post_save, sender=Cluster)
+@receiver(post_save, sender=Tenant)
+def handle_config_context_parent_changed(sender, instance, created, raw, **kwargs):
+    """
+    Invalidate the materialized config context data of devices and virtual machines assigned to a Site, Cluster, or
+    Tenant when its region, group, or type is changed. The site of a Cluster's virtual machines is updated in bulk
+    (without sending signals) when the Cluster is moved to another site.
+    """
+    if not settings.CONFIG_CONTEXT_MATERIALIZATION or created or raw:
+        return
+    if has_changed(instance, ('region', 'group', 'type', '_site')):
+        invalidate_config_context_data(**{sender._meta.model_name: instance})
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Rack)
+def handle_config_context_device_parent_changed(sender, instance, created, raw, **kwargs):
+    """
+    Invalidate the materialized config context data of devices within a Location or Rack when it is moved to another
+    site (or location), as the site and location of its devices are then updated in bulk (without sending signals).
+    """
+    if not settings.CONFIG_CONTEXT_MATERIALIZATION or created or raw:
+        return
+    if sender is Location and has_changed(instance, ('site',)):
+        invalidate_config_context_data(
+            models=(Device,),
+            location__in=instance.get_descendants(include_self=True)
+        )
+    elif sender is Rack and has_changed(instance, ('site', 'location')):
+        invalidate_config_context_data(models=(Device,), rack=instance)
+
+
+#
+# Templates
+#
+
+@receiver((post_save, post_delete), sender=ConfigTemplate)
+@receiver((post_save, post_delete), sender=ExportTemplate)
+@receiver((post_save, post_delete), sender=Webhook)
+@receiver((post_save, post_delete), sender=CustomLink)
+def evict_compiled_templates(sender, instance, **kwargs):
+    """
+    Evict any compiled templates belonging to an object from the template cache when the object is modified or deleted.
+    """
+    template_cache.invalidate(instance)
+
+
+#
+# Export templates
+#
+
+@receiver(post_delete, sender=Job)
+def delete_export_file(instance, **kwargs):
+    """
+    Delete the file rendered by an export template job (if any) once its Job has been deleted.
+    """
+    path = instance.data.get('file') if isinstance(instance.data, dict) else None
+    if path and path.startswith(ExportTemplateJob.get_output_path(instance.job_id)):
+        transaction.on_commit(lambda: storages['exports'].delete(path))
+
+
 #
 # Event rules
 #
 
+@receiver((post_save, post_delete), sender=EventRule)
+@receiver(m2m_changed, sender=EventRule.object_types.through)
+def handle_event_rule_changed(**kwargs):
+    """
+    Invalidate the cached index of event rules whenever an EventRule (or its assignment to object types) is changed.
+    The index is invalidated again once the transaction has been committed, in case it was rebuilt in the meantime
+    (e.g. by a concurrent request) from the previously committed rules.
+    """
+    clear_event_rule_index()
+    transaction.on_commit(clear_event_rule_index)
+
+
 @receiver(job_start)
 def process_job_start_event_rules(sender, **kwargs):
     """
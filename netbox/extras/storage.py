@@ -12,3 +12,19 @@ class ScriptFileSystemStorage(FileSystemStorage):
     @cached_property
     def base_location(self):
         return settings.SCRIPTS_ROOT
+
+
+class ExportFileSystemStorage(FileSystemStorage):
+    """
+    Custom storage for the output of export template jobs. Files are kept outside the media root, as they may be
+    downloaded only by permitted users (see JobDownloadView).
+    """
+    @cached_property
+    def base_location(self):
+        return settings.EXPORT_FILES_ROOT
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == 'EXPORT_FILES_ROOT':
+            self.__dict__.pop('base_location', None)
+            self.__dict__.pop('location', None)
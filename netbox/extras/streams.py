@@ -0,0 +1,264 @@
+import json
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from django_rq.queues import get_connection
+from redis.exceptions import ResponseError
+from rest_framework.utils.encoders import JSONEncoder
+
+from netbox.constants import RQ_QUEUE_DEFAULT
+from users.models import User
+from .events import get_event_rule_index, process_event_queue, process_event_rule_action
+from .models import EventRule
+from .webhooks import deliver_webhook_events
+
+__all__ = (
+    'EVENT_STREAM_GROUP',
+    'EVENT_STREAM_KEY',
+    'consume_events',
+    'publish_events',
+)
+
+logger = logging.getLogger('netbox.events_processor')
+
+EVENT_STREAM_KEY = 'netbox:events'
+EVENT_STREAM_GROUP = 'netbox'
+
+
+def get_stream_connection():
+    """
+    Return the Redis connection on which the event stream is maintained (that of the default task queue).
+    """
+    return get_connection(RQ_QUEUE_DEFAULT)
+
+
+def serialize_event(event):
+    """
+    Return a compact representation of a queued event suitable for appending to the event stream.
+    """
+    return {
+        'object_type': event['object_type'].pk,
+        'object_id': event['object_id'],
+        'event_type': event['event_type'],
+        'data': json.dumps(event['data'], cls=JSONEncoder),
+        'snapshots': json.dumps(event['snapshots'], cls=JSONEncoder),
+        'username': event['username'] or '',
+        'request_id': str(event['request_id']) if event['request_id'] else '',
+        'timestamp': timezone.now().isoformat(),
+    }
+
+
+def deserialize_event(fields):
+    """
+    Reconstruct a queued event from a record read from the event stream.
+    """
+    fields = {k.decode(): v.decode() for k, v in fields.items()}
+    return {
+        'object_type': ContentType.objects.get_for_id(int(fields['object_type'])),
+        'object_id': int(fields['object_id']),
+        'event_type': fields['event_type'],
+        'data': json.loads(fields['data']),
+        'snapshots': json.loads(fields['snapshots']),
+        'username': fields['username'] or None,
+        'request_id': fields['request_id'] or None,
+        'timestamp': fields['timestamp'],
+    }
+
+
+def publish_events(events):
+    """
+    Events pipeline stage which appends a compact record of each event matched by an enabled EventRule to a Redis
+    stream, in a single pipelined call. Events are then processed out-of-band by consume_events() (see the
+    process_event_stream management command), which carries out the actions of each matching rule directly.
+
+    If the stream has reached EVENTS_STREAM_MAX_LENGTH (e.g. because no consumer is running), events are instead
+    processed immediately via process_event_queue().
+    """
+    index = get_event_rule_index()
+    records = [
+        serialize_event(event) for event in events
+        if (event['object_type'].pk, event['event_type']) in index
+    ]
+    if not records:
+        return
+
+    conn = get_stream_connection()
+    if conn.xlen(EVENT_STREAM_KEY) + len(records) > settings.EVENTS_STREAM_MAX_LENGTH:
+        logger.warning(
+            f"Event stream has reached its maximum length ({settings.EVENTS_STREAM_MAX_LENGTH}); processing "
+            f"{len(records)} events immediately"
+        )
+        process_event_queue(events)
+        return
+
+    with conn.pipeline(transaction=False) as pipe:
+        for record in records:
+            pipe.xadd(EVENT_STREAM_KEY, record)
+        pipe.execute()
+
+
+def create_consumer_group(conn):
+    """
+    Create the consumer group for the event stream (along with the stream itself), if it does not already exist.
+    """
+    try:
+        conn.xgroup_create(EVENT_STREAM_KEY, EVENT_STREAM_GROUP, id='0', mkstream=True)
+    except ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+def dispatch_events(events):
+    """
+    Carry out the actions of all enabled EventRules matched by the given events (a mapping of message IDs to events).
+    Webhooks are delivered directly (coalesced per webhook, if WEBHOOK_COALESCING is enabled) rather than via
+    background jobs; all other actions are carried out as by process_event_rules(). Returns the set of message IDs for
+    which any action failed.
+    """
+    event_rules = {}
+    users = {}
+    webhook_events = defaultdict(list)
+    failed = set()
+
+    for message_id, event in events.items():
+        object_type = event['object_type']
+        event_type = event['event_type']
+        webhook_queue = defaultdict(list)
+        try:
+            # Retrieve the applicable EventRules (once for each type of object and event)
+            key = (object_type.pk, event_type)
+            if key not in event_rules:
+                rule_ids = get_event_rule_index().get(key)
+                event_rules[key] = list(EventRule.objects.filter(pk__in=rule_ids)) if rule_ids else []
+
+            if (username := event['username']) and username not in users:
+                users[username] = User.objects.filter(username=username).first()
+
+            for event_rule in event_rules[key]:
+
+                # Evaluate event rule conditions (if any)
+                if not event_rule.eval_conditions(event['data']):
+                    continue
+
+                # Webhook deliveries are queued for delivery once all events have been evaluated
+                process_event_rule_action(
+                    event_rule=event_rule,
+                    object_type=object_type,
+                    event_type=event_type,
+                    data=event['data'],
+                    user=users.get(username),
+                    username=username,
+                    snapshots=event['snapshots'],
+                    request_id=event['request_id'],
+                    webhook_queue=webhook_queue,
+                    timestamp=event['timestamp']
+                )
+
+        except Exception:
+            logger.exception(f"Failed to process event stream message {message_id}")
+            failed.add(message_id)
+            continue
+
+        for webhook, deliveries in webhook_queue.items():
+            webhook_events[webhook].extend((message_id, delivery) for delivery in deliveries)
+
+    # Deliver the events for each webhook over a shared pool of connections
+    for webhook, deliveries in webhook_events.items():
+        batch_size = webhook.batch_size if settings.WEBHOOK_COALESCING else 1
+        try:
+            errors = deliver_webhook_events(webhook, [event for _, event in deliveries], batch_size=batch_size)
+        except Exception as e:
+            errors = [e] * len(deliveries)
+        for (message_id, _), error in zip(deliveries, errors):
+            if error is not None:
+                logger.error(f"Failed to deliver event stream message {message_id} to webhook {webhook}: {error}")
+                failed.add(message_id)
+
+    return failed
+
+
+def process_messages(conn, messages):
+    """
+    Process a set of messages read from the event stream (see dispatch_events()), and acknowledge (and delete) those
+    which were processed successfully. Returns the number of messages acknowledged.
+
+    A message is acknowledged only once all of the actions it triggers have been carried out. Any message for which
+    an action failed is left pending, to be claimed again later; note that this repeats all of its actions, including
+    those which succeeded.
+    """
+    events = {}
+    processed = []
+    for message_id, fields in messages:
+        try:
+            events[message_id] = deserialize_event(fields)
+        except (KeyError, ValueError, ContentType.DoesNotExist) as e:
+            logger.error(f"Discarding malformed event stream message {message_id}: {e}")
+            processed.append(message_id)
+
+    failed = dispatch_events(events)
+    processed.extend(message_id for message_id in events if message_id not in failed)
+
+    if processed:
+        with conn.pipeline(transaction=False) as pipe:
+            pipe.xack(EVENT_STREAM_KEY, EVENT_STREAM_GROUP, *processed)
+            pipe.xdel(EVENT_STREAM_KEY, *processed)
+            pipe.execute()
+
+    return len(processed)
+
+
+def claim_messages(conn, consumer, batch_size, min_idle_time, max_deliveries):
+    """
+    Claim messages which were delivered to a consumer but not acknowledged within min_idle_time milliseconds (e.g.
+    because the consumer exited). Messages which have already been delivered max_deliveries times are discarded.
+    """
+    messages = conn.xautoclaim(
+        EVENT_STREAM_KEY, EVENT_STREAM_GROUP, consumer, min_idle_time, start_id='0-0', count=batch_size
+    )[1]
+    if not messages:
+        return []
+
+    pending = conn.xpending_range(
+        EVENT_STREAM_KEY, EVENT_STREAM_GROUP, min=messages[0][0], max=messages[-1][0], count=len(messages),
+        consumername=consumer
+    )
+    exhausted = {p['message_id'] for p in pending if p['times_delivered'] > max_deliveries}
+    if exhausted:
+        logger.error(f"Discarding {len(exhausted)} event stream messages after {max_deliveries} delivery attempts")
+        with conn.pipeline(transaction=False) as pipe:
+            pipe.xack(EVENT_STREAM_KEY, EVENT_STREAM_GROUP, *exhausted)
+            pipe.xdel(EVENT_STREAM_KEY, *exhausted)
+            pipe.execute()
+
+    return [(message_id, fields) for message_id, fields in messages if message_id not in exhausted and fields]
+
+
+def consume_events(consumer, batch_size=100, block=5000, min_idle_time=60000, max_deliveries=5, once=False):
+    """
+    Read and process events from the event stream as a member of its consumer group. Messages are acknowledged only
+    once processed, providing at-least-once delivery: Messages left unacknowledged for min_idle_time milliseconds are
+    claimed and processed again. At most batch_size messages are read at a time, and a new batch is read only once the
+    previous batch has been processed.
+
+    If once is True, return after all available messages have been processed. Returns the number of messages
+    processed.
+    """
+    conn = get_stream_connection()
+    create_consumer_group(conn)
+    count = 0
+
+    while True:
+        messages = claim_messages(conn, consumer, batch_size, min_idle_time, max_deliveries)
+        if not messages:
+            response = conn.xreadgroup(
+                EVENT_STREAM_GROUP, consumer, {EVENT_STREAM_KEY: '>'}, count=batch_size, block=None if once else block
+            )
+            messages = response[0][1] if response else []
+
+        if messages:
+            count += process_messages(conn, messages)
+        elif once:
+            return count
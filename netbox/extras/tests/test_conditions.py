@@ -1,13 +1,16 @@
+import time
+
 from django.contrib.contenttypes.models import ContentType
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from core.events import *
 from dcim.choices import SiteStatusChoices
 from dcim.models import Site
-from extras.conditions import Condition, ConditionSet, InvalidCondition
+from extras.conditions import Condition, ConditionSet, InvalidCondition, get_condition_set
 from extras.events import serialize_for_event
 from extras.forms import EventRuleForm
 from extras.models import EventRule, Webhook
+from utilities.testing import benchmark, benchmark_logger
 
 
 class ConditionTestCase(TestCase):
@@ -128,6 +131,10 @@ class ConditionTestCase(TestCase):
         self.assertTrue(c.eval({'x': 'abc'}))
         self.assertFalse(c.eval({'x': '123'}))
 
+    def test_regex_invalid(self):
+        with self.assertRaises(ValueError):
+            Condition('x', '[a-z', 'regex')
+
     def test_regex_negated(self):
         c = Condition('x', '[a-z]+', 'regex', negate=True)
         self.assertFalse(c.eval({'x': 'abc'}))
@@ -321,3 +328,70 @@ class ConditionSetTest(TestCase):
         })
 
         self.assertFalse(form.is_valid())
+
+
+class ConditionSetCacheTestCase(SimpleTestCase):
+
+    def test_get_condition_set(self):
+        ruleset = {'and': [{'attr': 'a', 'value': 1}]}
+        cs = get_condition_set(ruleset, key=('test', 1))
+
+        # The compiled ConditionSet should be reused for as long as the ruleset is unchanged
+        self.assertIs(get_condition_set({'and': [{'attr': 'a', 'value': 1}]}, key=('test', 1)), cs)
+        ruleset['and'][0]['value'] = 2
+        cs2 = get_condition_set(ruleset, key=('test', 1))
+        self.assertIsNot(cs2, cs)
+        self.assertTrue(cs2.eval({'a': 2}))
+
+        # No caching without a key
+        self.assertIsNot(get_condition_set(ruleset), get_condition_set(ruleset))
+
+
+@benchmark
+class ConditionSetBenchmarkTestCase(SimpleTestCase):
+    """
+    Compare the rate at which EventRule conditions are evaluated when each ruleset is compiled for every evaluation
+    against that when compiled ConditionSets are reused.
+    """
+    RULE_COUNT = 200
+    EVENT_COUNT = 50
+
+    def test_eval_rate(self):
+        rulesets = [
+            {'and': [
+                {'attr': 'status.value', 'value': 'active'},
+                {'attr': 'name', 'value': f'^site-{i}', 'op': 'regex'},
+                {'or': [
+                    {'attr': 'tags.slug', 'value': 'foo', 'op': 'contains'},
+                    {'attr': 'custom_fields.rank', 'value': i, 'op': 'gte'},
+                ]},
+            ]}
+            for i in range(self.RULE_COUNT)
+        ]
+        events = [
+            {
+                'name': f'site-{i}',
+                'status': {'value': 'active'},
+                'tags': [{'slug': 'bar'}],
+                'custom_fields': {'rank': i},
+            }
+            for i in range(self.EVENT_COUNT)
+        ]
+        evaluations = self.RULE_COUNT * self.EVENT_COUNT
+
+        start = time.perf_counter()
+        expected = [ConditionSet(ruleset).eval(data) for data in events for ruleset in rulesets]
+        uncached_rate = evaluations / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        results = [
+            get_condition_set(ruleset, key=('benchmark', i)).eval(data)
+            for data in events for i, ruleset in enumerate(rulesets)
+        ]
+        cached_rate = evaluations / (time.perf_counter() - start)
+
+        self.assertEqual(results, expected)
+        benchmark_logger.info(
+            f"ConditionSet evaluation: {uncached_rate:.0f} rules/sec (compiled per evaluation), "
+            f"{cached_rate:.0f} rules/sec (cached)"
+        )
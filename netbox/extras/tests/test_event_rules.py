@@ -4,7 +4,7 @@ from unittest.mock import patch
 
 import django_rq
 from django.http import HttpResponse
-from django.test import RequestFactory
+from django.test import RequestFactory, override_settings
 from django.urls import reverse
 from requests import Session
 from rest_framework import status
@@ -14,9 +14,10 @@ from core.models import ObjectType
 from dcim.choices import SiteStatusChoices
 from dcim.models import Site
 from extras.choices import EventRuleActionChoices
-from extras.events import enqueue_event, flush_events, serialize_for_event
+from extras.events import clear_event_rule_index, enqueue_event, flush_events, serialize_for_event
 from extras.models import EventRule, Tag, Webhook
-from extras.webhooks import generate_signature, send_webhook
+from extras.streams import EVENT_STREAM_GROUP, EVENT_STREAM_KEY, consume_events, get_stream_connection
+from extras.webhooks import generate_signature, send_webhook, send_webhooks
 from netbox.context_managers import event_tracking
 from utilities.testing import APITestCase
 
@@ -390,6 +391,117 @@ class EventRuleTest(APITestCase):
         with patch.object(Session, 'send', dummy_send):
             send_webhook(**job.kwargs)
 
+    @override_settings(WEBHOOK_COALESCING=True)
+    def test_send_coalesced_webhooks(self):
+        request_id = uuid.uuid4()
+        webhook = Webhook.objects.get(name='Webhook 1')
+        webhook.batch_size = 2
+        webhook.save()
+        requests_sent = []
+
+        def dummy_send(_, request, **kwargs):
+            """
+            A dummy implementation of Session.send() which records each request. Always returns a 200 HTTP response.
+            """
+            requests_sent.append(request)
+            return HttpResponse()
+
+        # Enqueue events for three new sites
+        webhooks_queue = {}
+        sites = [Site.objects.create(name=f'Site {i}', slug=f'site-{i}') for i in range(1, 4)]
+        for site in sites:
+            enqueue_event(
+                webhooks_queue,
+                instance=site,
+                user=self.user,
+                request_id=request_id,
+                event_type=OBJECT_CREATED
+            )
+        flush_events(list(webhooks_queue.values()))
+
+        # All deliveries to the webhook should have been coalesced into a single job
+        self.assertEqual(self.queue.count, 1)
+        job = self.queue.jobs[0]
+        self.assertEqual(job.func_name, 'extras.webhooks.send_webhooks')
+        self.assertEqual(job.kwargs['webhook'], webhook)
+        self.assertEqual(len(job.kwargs['events']), 3)
+
+        # Process the job; events should be delivered in two batches
+        with patch.object(Session, 'send', dummy_send):
+            send_webhooks(**job.kwargs)
+        self.assertEqual(len(requests_sent), 2)
+        bodies = sorted((json.loads(request.body) for request in requests_sent), key=lambda b: len(b['events']))
+        self.assertEqual([len(body['events']) for body in bodies], [1, 2])
+        for request in requests_sent:
+            self.assertEqual(request.headers['X-Hook-Signature'], generate_signature(request.body, webhook.secret))
+        names = sorted(event['data']['name'] for body in bodies for event in body['events'])
+        self.assertEqual(names, ['Site 1', 'Site 2', 'Site 3'])
+
+    @override_settings(EVENTS_PIPELINE=['extras.streams.publish_events'])
+    def test_event_stream(self):
+        conn = get_stream_connection()
+        conn.delete(EVENT_STREAM_KEY)
+        request_id = uuid.uuid4()
+        requests_sent = []
+
+        def dummy_send(_, request, **kwargs):
+            """
+            A dummy implementation of Session.send() which records each request. Always returns a 200 HTTP response.
+            """
+            requests_sent.append(request)
+            return HttpResponse()
+
+        # Publish events for a new site (matched by Event Rule 1) and a tag (matched by no rules)
+        events_queue = {}
+        site = Site.objects.create(name='Site 1', slug='site-1')
+        enqueue_event(events_queue, instance=site, user=self.user, request_id=request_id, event_type=OBJECT_CREATED)
+        enqueue_event(
+            events_queue, instance=Tag.objects.first(), user=self.user, request_id=request_id,
+            event_type=OBJECT_UPDATED
+        )
+        flush_events(list(events_queue.values()))
+
+        # Only the site event should have been published, and no jobs enqueued
+        self.assertEqual(conn.xlen(EVENT_STREAM_KEY), 1)
+        self.assertEqual(self.queue.count, 0)
+
+        # Consume the stream; the webhook should be delivered directly, and the message removed from the stream
+        with patch.object(Session, 'send', dummy_send):
+            self.assertEqual(consume_events('test', once=True), 1)
+        self.assertEqual(conn.xlen(EVENT_STREAM_KEY), 0)
+        self.assertEqual(self.queue.count, 0)
+        self.assertEqual(len(requests_sent), 1)
+        body = json.loads(requests_sent[0].body)
+        self.assertEqual(body['event'], 'created')
+        self.assertEqual(body['model'], 'site')
+        self.assertEqual(body['data']['id'], site.pk)
+        self.assertEqual(body['data']['foo'], 1)
+        self.assertEqual(body['request_id'], str(request_id))
+        conn.delete(EVENT_STREAM_KEY)
+
+    @override_settings(EVENTS_PIPELINE=['extras.streams.publish_events'])
+    def test_event_stream_delivery_failure(self):
+        conn = get_stream_connection()
+        conn.delete(EVENT_STREAM_KEY)
+
+        def dummy_send(_, request, **kwargs):
+            """
+            A dummy implementation of Session.send() which always returns a 500 HTTP response.
+            """
+            return HttpResponse(status=500)
+
+        events_queue = {}
+        site = Site.objects.create(name='Site 1', slug='site-1')
+        enqueue_event(events_queue, instance=site, user=self.user, request_id=uuid.uuid4(), event_type=OBJECT_CREATED)
+        flush_events(list(events_queue.values()))
+
+        # The message should not be acknowledged, and should remain pending for redelivery
+        with patch.object(Session, 'send', dummy_send):
+            self.assertEqual(consume_events('test', once=True), 0)
+        self.assertEqual(conn.xlen(EVENT_STREAM_KEY), 1)
+        self.assertEqual(conn.xpending(EVENT_STREAM_KEY, EVENT_STREAM_GROUP)['pending'], 1)
+        conn.delete(EVENT_STREAM_KEY)
+
     def test_duplicate_triggers(self):
         """
         Test for erroneous duplicate event triggers resulting from saving an object multiple times
@@ -433,3 +545,50 @@ class EventRuleTest(APITestCase):
         job = self.queue.get_jobs()[0]
         self.assertEqual(job.kwargs['event_type'], OBJECT_DELETED)
         self.queue.empty()
+
+    @override_settings(EVENTS_PIPELINE=['extras.events.process_event_queue'])
+    def test_skip_events_without_rules(self):
+        """
+        Check that events which cannot match any enabled EventRule are not queued, and that changes to EventRules are
+        reflected immediately.
+        """
+        request_id = uuid.uuid4()
+        queue = {}
+
+        # No rules apply to tags; only a placeholder should be queued
+        tag = Tag.objects.first()
+        tag_key = f'extras.tag:{tag.pk}'
+        enqueue_event(queue, instance=tag, user=self.user, request_id=request_id, event_type=OBJECT_UPDATED)
+        self.assertEqual(queue, {tag_key: {'event_type': OBJECT_UPDATED, 'prechange': None, 'skipped': True}})
+
+        # Event Rule 1 applies to newly created sites
+        site = Site.objects.create(name='Site 1', slug='site-1')
+        enqueue_event(queue, instance=site, user=self.user, request_id=request_id, event_type=OBJECT_CREATED)
+        self.assertEqual(len(queue), 2)
+        self.assertNotIn('skipped', queue[f'dcim.site:{site.pk}'])
+
+        # Assign Event Rule 2 to tags
+        EventRule.objects.get(name='Event Rule 2').object_types.add(ObjectType.objects.get_for_model(Tag))
+        enqueue_event(queue, instance=tag, user=self.user, request_id=uuid.uuid4(), event_type=OBJECT_UPDATED)
+        self.assertEqual(len(queue), 2)
+        self.assertNotIn('skipped', queue[tag_key])
+        self.assertEqual(queue[tag_key]['event_type'], OBJECT_UPDATED)
+
+    @override_settings(EVENTS_PIPELINE=['extras.events.process_event_queue'])
+    def test_skip_events_without_rules_coalesced(self):
+        """
+        Check that an event which is skipped for lack of any matching EventRule is still coalesced with subsequent
+        events for the same object.
+        """
+        EventRule.objects.filter(name='Event Rule 1').update(enabled=False)
+        clear_event_rule_index()
+        request = RequestFactory().get(reverse('dcim:site_add'))
+        request.id = uuid.uuid4()
+        request.user = self.user
+
+        # Create a site and assign tags to it. The resulting "created" event matches no enabled rule, and must not
+        # be reported as an update (matched by Event Rule 2).
+        with event_tracking(request):
+            site = Site.objects.create(name='Site 1', slug='site-1')
+            site.tags.set(Tag.objects.all())
+        self.assertEqual(self.queue.count, 0)
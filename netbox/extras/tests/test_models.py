@@ -1,12 +1,17 @@
 import tempfile
+import uuid
 from pathlib import Path
 
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
 from django.forms import ValidationError
-from django.test import tag, TestCase
+from django.test import override_settings, tag, TestCase
 
-from core.models import DataSource, ObjectType
+from core.models import DataSource, Job, ObjectType
 from dcim.models import Device, DeviceRole, DeviceType, Location, Manufacturer, Platform, Region, Site, SiteGroup
-from extras.models import ConfigContext, ConfigTemplate, Tag
+from extras.jobs import ExportTemplateJob
+from extras.models import ConfigContext, ConfigTemplate, ExportTemplate, Tag
+from extras.models.mixins import STREAM_BUFFER_SIZE
 from tenancy.models import Tenant, TenantGroup
 from utilities.exceptions import AbortRequest
 from virtualization.models import Cluster, ClusterGroup, ClusterType, VirtualMachine
@@ -517,6 +522,89 @@ class ConfigContextTest(TestCase):
         self.assertEqual(ConfigContext.objects.get_for_object(device).count(), 2)
         self.assertEqual(device.get_config_context(), annotated_queryset[0].get_config_context())
 
+    @override_settings(CONFIG_CONTEXT_MATERIALIZATION=True)
+    def test_materialized_config_context_data(self):
+        device = Device.objects.first()
+        Device.objects.filter(pk=device.pk).refresh_config_context_data()
+        device.refresh_from_db()
+        self.assertEqual(device._config_context_data, [])
+
+        # Assigning a ConfigContext invalidates the stored data, which is then computed on demand
+        context = ConfigContext.objects.create(name='context 1', weight=100, data={'a': 123})
+        context.sites.add(Site.objects.first())
+        device.refresh_from_db()
+        self.assertIsNone(device._config_context_data)
+        annotated_device = Device.objects.annotate_config_context_data().get(pk=device.pk)
+        self.assertEqual(annotated_device.get_config_context(), {'a': 123})
+
+        Device.objects.refresh_config_context_data()
+        device.refresh_from_db()
+        self.assertEqual(device._config_context_data, [{'a': 123}])
+        self.assertEqual(device.get_config_context(), {'a': 123})
+
+        # Tagging the device refreshes its stored data
+        tag = Tag.objects.first()
+        context = ConfigContext.objects.create(name='context 2', weight=200, data={'b': 456})
+        context.tags.add(tag)
+        Device.objects.refresh_config_context_data()
+        device.tags.add(tag)
+        device.refresh_from_db()
+        self.assertEqual(device._config_context_data, [{'a': 123}, {'b': 456}])
+        self.assertEqual(device.get_config_context(), {'a': 123, 'b': 456})
+
+    @override_settings(CONFIG_CONTEXT_MATERIALIZATION=True)
+    def test_materialized_config_context_data_not_saved(self):
+        device = Device.objects.first()
+        Device.objects.filter(pk=device.pk).refresh_config_context_data()
+        device.refresh_from_db()
+        self.assertEqual(device._config_context_data, [])
+
+        # Saving the device must not restore stored data which has since been invalidated
+        context = ConfigContext.objects.create(name='context 1', weight=100, data={'a': 123})
+        context.sites.add(device.site)
+        device.description = 'foo'
+        device.save()
+        device.refresh_from_db()
+        self.assertEqual(device.description, 'foo')
+        self.assertIsNone(device._config_context_data)
+        self.assertEqual(device.get_config_context(), {'a': 123})
+
+    @override_settings(CONFIG_CONTEXT_MATERIALIZATION=True)
+    def test_materialized_config_context_data_platform_deleted(self):
+        device = Device.objects.first()
+        platform = Platform.objects.create(name='Platform 2', slug='platform-2')
+        context = ConfigContext.objects.create(name='context 1', weight=100, data={'a': 123})
+        context.platforms.add(platform)
+        Device.objects.refresh_config_context_data()
+        device.refresh_from_db()
+        self.assertEqual(device.get_config_context(), {})
+
+        # Deleting the platform removes its assignment to the ConfigContext (without sending signals), which then
+        # applies to all devices
+        platform.delete()
+        device.refresh_from_db()
+        self.assertIsNone(device._config_context_data)
+        self.assertEqual(device.get_config_context(), {'a': 123})
+
+    @override_settings(CONFIG_CONTEXT_MATERIALIZATION=True)
+    def test_materialized_config_context_data_location_moved(self):
+        device = Device.objects.first()
+        site = Site.objects.create(name='Site 2', slug='site-2')
+        context = ConfigContext.objects.create(name='context 1', weight=100, data={'a': 123})
+        context.sites.add(site)
+        Device.objects.refresh_config_context_data()
+        self.assertEqual(device.get_config_context(), {})
+
+        # Moving the device's location to another site updates the device in bulk, invalidating its stored data
+        location = Location.objects.get(pk=device.location_id)
+        location.snapshot()
+        location.site = site
+        location.save()
+        device.refresh_from_db()
+        self.assertEqual(device.site, site)
+        self.assertIsNone(device._config_context_data)
+        self.assertEqual(device.get_config_context(), {'a': 123})
+
     def test_valid_local_context_data(self):
         device = Device.objects.first()
         device.local_context_data = None
@@ -606,3 +694,74 @@ class ConfigTemplateTest(TestCase):
     @tag('regression')
     def test_config_template_with_data_source_nested_templates(self):
         self.assertEqual(self.BASE_TEMPLATE, self.main_config_template.render({}))
+
+
+class ExportTemplateTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Site.objects.bulk_create([
+            Site(name=f'Site {i}', slug=f'site-{i}') for i in range(1, 101)
+        ])
+
+    def test_render_stream(self):
+        export_template = ExportTemplate.objects.create(
+            name='Export Template 1',
+            template_code='{% for site in queryset %}{{ site.name }},{{ site.slug }}\r\n{% endfor %}'
+        )
+        queryset = Site.objects.order_by('pk')
+
+        output = ''.join(export_template.render_stream(queryset=queryset, chunk_size=10))
+        self.assertEqual(output, export_template.render(queryset=queryset))
+        self.assertEqual(output.count('\n'), 100)
+        self.assertNotIn('\r', output)
+
+    def test_render_stream_chunked_output(self):
+        # Render output which spans several chunks, split between a carriage return and a newline
+        export_template = ExportTemplate.objects.create(
+            name='Export Template 1',
+            template_code=(
+                '{% for site in queryset %}{{ "x" * ' + str(STREAM_BUFFER_SIZE - 1) + ' }}{{ "\\r" }}'
+                '{% if site %}\n{% endif %}{% endfor %}'
+            )
+        )
+        queryset = Site.objects.all()
+
+        chunks = list(export_template.render_stream(queryset=queryset))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunks), export_template.render(queryset=queryset))
+
+    def test_render_to_response_stream(self):
+        export_template = ExportTemplate.objects.create(
+            name='Export Template 1',
+            template_code='{% for site in queryset %}{{ site.name }}\n{% endfor %}',
+            file_extension='txt'
+        )
+        response = export_template.render_to_response(queryset=Site.objects.order_by('pk'), stream=True)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="netbox_sites.txt"')
+        output = b''.join(response.streaming_content).decode()
+        self.assertEqual(output.splitlines(), [f'Site {i}' for i in range(1, 101)])
+
+    def test_render_stream_subscript(self):
+        # The queryset may be indexed and sliced by the template
+        export_template = ExportTemplate.objects.create(
+            name='Export Template 1',
+            template_code='{{ queryset[0].name }}|{% for site in queryset[1:3] %}{{ site.name }};{% endfor %}'
+        )
+        output = ''.join(export_template.render_stream(queryset=Site.objects.order_by('pk')))
+        self.assertEqual(output, 'Site 1|Site 2;Site 3;')
+
+    def test_delete_export_file(self):
+        with tempfile.TemporaryDirectory() as export_root, override_settings(EXPORT_FILES_ROOT=export_root):
+            job_id = uuid.uuid4()
+            path = storages['exports'].save(
+                f'{ExportTemplateJob.get_output_path(job_id)}sites.txt', ContentFile(b'Site 1')
+            )
+            job = Job.objects.create(name='Export Template 1', job_id=job_id, data={'file': path})
+
+            # Deleting the job deletes its file
+            with self.captureOnCommitCallbacks(execute=True):
+                job.delete()
+            self.assertFalse(storages['exports'].exists(path))
@@ -1,10 +1,13 @@
 import hashlib
 import hmac
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from django.conf import settings
 from django_rq import job
 from jinja2.exceptions import TemplateError
+from requests.adapters import HTTPAdapter
 
 from utilities.proxy import resolve_proxies
 from .constants import WEBHOOK_EVENT_TYPES
@@ -24,14 +27,10 @@ def generate_signature(request_body, secret):
     return hmac_prep.hexdigest()
 
 
-@job('default')
-def send_webhook(event_rule, model_name, event_type, data, timestamp, username, request_id=None, snapshots=None):
+def get_webhook_context(model_name, event_type, data, timestamp, username, request_id=None, snapshots=None):
     """
-    Make a POST request to the defined Webhook
+    Return the context data for rendering a webhook's URL, headers, and body for a single event.
     """
-    webhook = event_rule.action_object
-
-    # Prepare context data for headers & body templates
     context = {
         'event': WEBHOOK_EVENT_TYPES.get(event_type, event_type),
         'timestamp': timestamp,
@@ -44,7 +43,13 @@ def send_webhook(event_rule, model_name, event_type, data, timestamp, username,
         context.update({
             'snapshots': snapshots
         })
+    return context
+
 
+def prepare_webhook_request(webhook, context):
+    """
+    Render the URL, headers, and body of a Webhook using the given context, and return a signed PreparedRequest.
+    """
     # Build the headers for the HTTP request
     headers = {
         'Content-Type': webhook.http_content_type,
@@ -63,16 +68,12 @@ def send_webhook(event_rule, model_name, event_type, data, timestamp, username,
         raise e
 
     # Prepare the HTTP request
-    url = webhook.render_payload_url(context)
     params = {
         'method': webhook.http_method,
-        'url': url,
+        'url': webhook.render_payload_url(context),
         'headers': headers,
         'data': body.encode('utf8'),
     }
-    logger.info(
-        f"Sending {params['method']} request to {params['url']} ({context['model']} {context['event']})"
-    )
     logger.debug(params)
     try:
         prepared_request = requests.Request(**params).prepare()
@@ -84,13 +85,31 @@ def send_webhook(event_rule, model_name, event_type, data, timestamp, username,
     if webhook.secret != '':
         prepared_request.headers['X-Hook-Signature'] = generate_signature(prepared_request.body, webhook.secret)
 
-    # Send the request
-    with requests.Session() as session:
-        session.verify = webhook.ssl_verification
-        if webhook.ca_file_path:
-            session.verify = webhook.ca_file_path
-        proxies = resolve_proxies(url=url, context={'client': webhook})
-        response = session.send(prepared_request, proxies=proxies)
+    return prepared_request
+
+
+def get_webhook_session(webhook, pool_size=None):
+    """
+    Return a requests Session configured for sending requests to the given Webhook. If a pool size is specified, up to
+    that many persistent connections to each host are retained for reuse among successive (or concurrent) requests.
+    """
+    session = requests.Session()
+    session.verify = webhook.ssl_verification
+    if webhook.ca_file_path:
+        session.verify = webhook.ca_file_path
+    if pool_size:
+        adapter = HTTPAdapter(pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+    return session
+
+
+def deliver_webhook(session, webhook, prepared_request):
+    """
+    Send a prepared request to a Webhook and validate the response status.
+    """
+    proxies = resolve_proxies(url=prepared_request.url, context={'client': webhook})
+    response = session.send(prepared_request, proxies=proxies)
 
     if 200 <= response.status_code <= 299:
         logger.info(f"Request succeeded; response status {response.status_code}")
@@ -100,3 +119,79 @@ def send_webhook(event_rule, model_name, event_type, data, timestamp, username,
         raise requests.exceptions.RequestException(
             f"Status {response.status_code} returned with content '{response.content}', webhook FAILED to process."
         )
+
+
+@job('default')
+def send_webhook(event_rule, model_name, event_type, data, timestamp, username, request_id=None, snapshots=None):
+    """
+    Make a POST request to the defined Webhook
+    """
+    webhook = event_rule.action_object
+    context = get_webhook_context(model_name, event_type, data, timestamp, username, request_id, snapshots)
+    prepared_request = prepare_webhook_request(webhook, context)
+    logger.info(
+        f"Sending {prepared_request.method} request to {prepared_request.url} ({context['model']} {context['event']})"
+    )
+
+    # Send the request
+    with get_webhook_session(webhook) as session:
+        return deliver_webhook(session, webhook, prepared_request)
+
+
+def deliver_webhook_events(webhook, events, batch_size=1):
+    """
+    Deliver a set of events to a Webhook. Each event is a dictionary of the keyword arguments accepted by
+    get_webhook_context(). Returns a list of the exceptions raised in delivering each event (None for each event
+    delivered successfully).
+
+    Requests are sent concurrently (up to WEBHOOK_CONCURRENCY at a time) over a pool of persistent connections. If the
+    batch size is greater than one, events are delivered in batches of up to that many per request, rendered with the
+    context {'events': [...]}.
+    """
+    batch_size = max(batch_size, 1)
+    contexts = [get_webhook_context(**event) for event in events]
+    if batch_size > 1:
+        contexts = [
+            {'events': contexts[i:i + batch_size]} for i in range(0, len(contexts), batch_size)
+        ]
+    prepared_requests = [prepare_webhook_request(webhook, context) for context in contexts]
+    concurrency = max(min(settings.WEBHOOK_CONCURRENCY, len(prepared_requests)), 1)
+    logger.info(
+        f"Sending {len(events)} events to webhook {webhook} in {len(prepared_requests)} requests "
+        f"(concurrency: {concurrency})"
+    )
+
+    errors = [None] * len(events)
+    with get_webhook_session(webhook, pool_size=concurrency) as session:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(deliver_webhook, session, webhook, prepared_request)
+                for prepared_request in prepared_requests
+            ]
+            for i, future in enumerate(futures):
+                try:
+                    future.result()
+                except requests.exceptions.RequestException as e:
+                    # Attribute the failure to every event in the request
+                    for j in range(i * batch_size, min((i + 1) * batch_size, len(events))):
+                        errors[j] = e
+
+    return errors
+
+
+@job('default')
+def send_webhooks(webhook, events):
+    """
+    Deliver a set of coalesced events to a Webhook (see deliver_webhook_events()), in batches of up to the webhook's
+    batch size.
+
+    All requests are attempted even if some fail; an exception is then raised so that the job may be retried. Note
+    that a retry repeats the delivery of all events, including those which succeeded.
+    """
+    errors = deliver_webhook_events(webhook, events, batch_size=webhook.batch_size)
+
+    if failures := [e for e in errors if e is not None]:
+        raise requests.exceptions.RequestException(
+            f"{len(failures)} of {len(events)} events could not be delivered to webhook {webhook}: {failures[0]}"
+        )
+    return f"Delivered {len(events)} events, webhook successfully processed."
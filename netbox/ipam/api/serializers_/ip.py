@@ -21,6 +21,7 @@ __all__ = (
     'AggregateSerializer',
     'AvailableIPSerializer',
     'AvailablePrefixSerializer',
+    'BulkAvailableIPSerializer',
     'IPAddressSerializer',
     'IPRangeSerializer',
     'PrefixLengthSerializer',
@@ -209,3 +210,10 @@ class AvailableIPSerializer(serializers.Serializer):
             'address': f"{instance}/{self.context['parent'].mask_length}",
             'vrf': vrf,
         }
+
+
+class BulkAvailableIPSerializer(serializers.Serializer):
+    """
+    Designates the parent prefix from which an available IP address is to be allocated.
+    """
+    prefix = serializers.IntegerField(min_value=1)
@@ -34,6 +34,11 @@ urlpatterns = [
         views.AvailableASNsView.as_view(),
         name='asnrange-available-asns'
     ),
+    path(
+        'available-ips/',
+        views.BulkAvailableIPAddressesView.as_view(),
+        name='available-ips'
+    ),
     path(
         'ip-ranges/<int:pk>/available-ips/',
         views.IPRangeAvailableIPAddressesView.as_view(),
@@ -1,4 +1,5 @@
 from copy import deepcopy
+from itertools import islice
 
 from django.contrib.contenttypes.prefetch import GenericPrefetch
 from django.core.exceptions import ObjectDoesNotExist, PermissionDenied
@@ -7,7 +8,7 @@ from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext as _
 from django_pglocks import advisory_lock
 from drf_spectacular.utils import extend_schema
-from netaddr import IPSet
+from netaddr import AddrFormatError, IPNetwork, IPSet
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
@@ -17,7 +18,7 @@ from rest_framework.views import APIView
 from dcim.models import Interface
 from ipam import filtersets
 from ipam.models import *
-from ipam.utils import get_next_available_prefix
+from ipam.utils import defer_prefix_hierarchy, get_next_available_prefix, ip_space_lock, lock_addresses, lock_parent
 from netbox.api.viewsets import NetBoxModelViewSet
 from netbox.api.viewsets.mixins import ObjectValidationMixin
 from netbox.config import get_config
@@ -93,6 +94,23 @@ class PrefixViewSet(NetBoxModelViewSet):
             return serializers.PrefixLengthSerializer
         return super().get_serializer_class()
 
+    # Rebuild the hierarchy of each affected VRF once when operating on many prefixes, rather than updating it for
+    # each prefix (as in the UI bulk views)
+
+    def perform_create(self, serializer):
+        if not getattr(serializer, 'many', False):
+            return super().perform_create(serializer)
+        with defer_prefix_hierarchy():
+            return super().perform_create(serializer)
+
+    def perform_bulk_update(self, objects, update_data, partial):
+        with defer_prefix_hierarchy():
+            return super().perform_bulk_update(objects, update_data, partial)
+
+    def perform_bulk_destroy(self, objects):
+        with defer_prefix_hierarchy():
+            return super().perform_bulk_destroy(objects)
+
 
 class IPRangeViewSet(NetBoxModelViewSet):
     queryset = IPRange.objects.all()
@@ -117,17 +135,38 @@ class IPAddressViewSet(NetBoxModelViewSet):
     serializer_class = serializers.IPAddressSerializer
     filterset_class = filtersets.IPAddressFilterSet
 
-    @advisory_lock(ADVISORY_LOCK_KEYS['available-ips'])
+    # Lock the prefixes and IP ranges containing affected IP addresses (prior to validation) to prevent conflicts with
+    # the concurrent allocation of available IPs
+
+    @staticmethod
+    def _get_addresses(data, pk=None):
+        """
+        Return the IP addresses affected by a request: Those specified in the request data, plus the current address
+        of the object being modified (if any).
+        """
+        addresses = []
+        for item in (data if type(data) is list else [data]):
+            if isinstance(item, dict) and item.get('address'):
+                try:
+                    addresses.append(IPNetwork(item['address']))
+                except (AddrFormatError, TypeError, ValueError):
+                    # Invalid addresses will be rejected by the serializer
+                    pass
+        if pk is not None:
+            addresses.extend(IPAddress.objects.filter(pk=pk).values_list('address', flat=True))
+        return addresses
+
     def create(self, request, *args, **kwargs):
-        return super().create(request, *args, **kwargs)
+        with lock_addresses(self._get_addresses(request.data)):
+            return super().create(request, *args, **kwargs)
 
-    @advisory_lock(ADVISORY_LOCK_KEYS['available-ips'])
     def update(self, request, *args, **kwargs):
-        return super().update(request, *args, **kwargs)
+        with lock_addresses(self._get_addresses(request.data, pk=kwargs.get('pk'))):
+            return super().update(request, *args, **kwargs)
 
-    @advisory_lock(ADVISORY_LOCK_KEYS['available-ips'])
     def destroy(self, request, *args, **kwargs):
-        return super().destroy(request, *args, **kwargs)
+        with lock_addresses(self._get_addresses({}, pk=kwargs.get('pk'))):
+            return super().destroy(request, *args, **kwargs)
 
 
 class FHRPGroupViewSet(NetBoxModelViewSet):
@@ -225,6 +264,12 @@ class AvailableObjectsView(ObjectValidationMixin, APIView):
         """
         return {}
 
+    def get_lock(self, parent):
+        """
+        Return a context manager which locks the parent object while available objects are allocated.
+        """
+        return advisory_lock(ADVISORY_LOCK_KEYS[self.advisory_lock_key])
+
     def check_sufficient_available(self, requested_objects, available_objects):
         """
         Check if there exist a sufficient number of available objects to satisfy the request.
@@ -269,7 +314,7 @@ class AvailableObjectsView(ObjectValidationMixin, APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        with advisory_lock(ADVISORY_LOCK_KEYS[self.advisory_lock_key]):
+        with self.get_lock(parent):
             available_objects = self.get_available_objects(parent, limit)
 
             # Determine if the requested number of objects is available
@@ -350,6 +395,9 @@ class AvailablePrefixesView(AvailableObjectsView):
     write_serializer_class = serializers.PrefixLengthSerializer
     advisory_lock_key = 'available-prefixes'
 
+    def get_lock(self, parent):
+        return lock_parent(self.advisory_lock_key, parent)
+
     def get_parent(self, request, pk):
         return get_object_or_404(Prefix.objects.restrict(request.user), pk=pk)
 
@@ -403,14 +451,12 @@ class AvailableIPAddressesView(AvailableObjectsView):
     write_serializer_class = serializers.AvailableIPSerializer
     advisory_lock_key = 'available-ips'
 
+    def get_lock(self, parent):
+        return lock_parent(self.advisory_lock_key, parent)
+
     def get_available_objects(self, parent, limit=None):
-        # Calculate available IPs within the parent
-        ip_list = []
-        for index, ip in enumerate(parent.get_available_ips(), start=1):
-            ip_list.append(ip)
-            if index == limit:
-                break
-        return ip_list
+        # Calculate available IPs within the parent, stopping once the limit has been reached
+        return list(islice(parent.iter_available_ips(), limit))
 
     def get_extra_context(self, parent):
         return {
@@ -453,6 +499,82 @@ class IPRangeAvailableIPAddressesView(AvailableIPAddressesView):
         return get_object_or_404(IPRange.objects.restrict(request.user), pk=pk)
 
 
+class BulkAvailableIPAddressesView(ObjectValidationMixin, APIView):
+    """
+    Allocate available IP addresses within any number of parent prefixes in a single transaction. Each requested
+    object must designate the ID of its parent prefix.
+    """
+    queryset = IPAddress.objects.all()
+
+    @extend_schema(
+        methods=["post"],
+        responses={201: serializers.IPAddressSerializer(many=True)},
+        request=serializers.BulkAvailableIPSerializer(many=True),
+    )
+    def post(self, request):
+        self.queryset = self.queryset.restrict(request.user, 'add')
+
+        # Normalize request data to a list of objects
+        requested_objects = request.data if isinstance(request.data, list) else [request.data]
+
+        # Validate the parent prefix designated by each object
+        serializer = serializers.BulkAvailableIPSerializer(data=requested_objects, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        parent_ids = [data['prefix'] for data in serializer.validated_data]
+        parents = Prefix.objects.restrict(request.user).in_bulk(parent_ids)
+        if missing_ids := set(parent_ids) - set(parents):
+            return Response(
+                {"detail": f"Prefixes not found: {', '.join(str(pk) for pk in sorted(missing_ids))}"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        # Lock all parents (and their containing prefixes) for the duration of the allocation
+        containers = Prefix.objects.none()
+        for parent in parents.values():
+            containers |= parent.get_parents(include_self=True)
+
+        with ip_space_lock('available-ips', exclusive=parents.values(), shared=containers):
+
+            # Assign the next available IP within its parent to each requested object. Addresses are drawn lazily
+            # from each parent, skipping any already assigned (in case parents overlap).
+            available_ips = {pk: parent.iter_available_ips() for pk, parent in parents.items()}
+            assigned_ips = set()
+            requested_objects = deepcopy(requested_objects)
+            for request_data, parent_id in zip(requested_objects, parent_ids):
+                parent = parents[parent_id]
+                ip = next((ip for ip in available_ips[parent_id] if (ip, parent.vrf_id) not in assigned_ips), None)
+                if ip is None:
+                    return Response(
+                        {"detail": f"Insufficient IP addresses are available within prefix {parent}"},
+                        status=status.HTTP_409_CONFLICT
+                    )
+                assigned_ips.add((ip, parent.vrf_id))
+                del request_data['prefix']
+                request_data.update({
+                    'address': f'{ip}/{parent.mask_length}',
+                    'vrf': parent.vrf_id,
+                })
+
+            serializer = serializers.IPAddressSerializer(
+                data=requested_objects,
+                many=True,
+                context={'request': request}
+            )
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            # Create the new IP addresses
+            try:
+                with transaction.atomic(using=router.db_for_write(self.queryset.model)):
+                    created = serializer.save()
+                    self._validate_objects(created)
+            except ObjectDoesNotExist:
+                raise PermissionDenied()
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class AvailableVLANsView(AvailableObjectsView):
     queryset = VLAN.objects.all()
     read_serializer_class = serializers.AvailableVLANSerializer
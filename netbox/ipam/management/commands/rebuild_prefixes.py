@@ -1,27 +1,43 @@
+import time
+
 from django.core.management.base import BaseCommand
+from django.db.models import Count
 
-from ipam.models import Prefix, VRF
+from ipam.models import Prefix
 from ipam.utils import rebuild_prefixes
+from utilities.parallel import run_parallel
 
 
 class Command(BaseCommand):
     help = "Rebuild the prefix hierarchy (depth and children counts)"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help="Number of worker processes among which VRFs are divided (default: 1)"
+        )
+
     def handle(self, *model_names, **options):
+        workers = options['workers']
         self.stdout.write(f'Rebuilding {Prefix.objects.count()} prefixes...')
-
-        # Reset existing counts
-        Prefix.objects.update(_depth=0, _children=0)
-
-        # Rebuild the global table
-        global_count = Prefix.objects.filter(vrf__isnull=True).count()
-        self.stdout.write(f'Global: {global_count} prefixes...')
-        rebuild_prefixes(None)
-
-        # Rebuild each VRF
-        for vrf in VRF.objects.all():
-            vrf_count = Prefix.objects.filter(vrf=vrf).count()
-            self.stdout.write(f'VRF {vrf}: {vrf_count} prefixes...')
-            rebuild_prefixes(vrf.pk)
-
+        start_time = time.monotonic()
+
+        if workers > 1:
+            # Divide VRFs (including the global table) among workers, balancing the number of prefixes assigned to
+            # each
+            vrf_sizes = Prefix.objects.order_by().values_list('vrf').annotate(count=Count('pk'))
+            groups = [[[], 0] for _ in range(workers)]
+            for vrf_id, count in sorted(vrf_sizes, key=lambda x: x[1], reverse=True):
+                group = min(groups, key=lambda g: g[1])
+                group[0].append(vrf_id)
+                group[1] += count
+            tasks = [vrfs for vrfs, count in groups if vrfs]
+            updated_count = sum(run_parallel(rebuild_prefixes, tasks, workers=workers))
+        else:
+            updated_count = rebuild_prefixes()
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(f'Updated {updated_count} prefixes in {elapsed:.1f} seconds.')
         self.stdout.write(self.style.SUCCESS('Finished.'))
@@ -1,3 +1,5 @@
+import heapq
+
 import netaddr
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.core.exceptions import ValidationError
@@ -414,46 +416,90 @@ class Prefix(ContactsMixin, GetAvailablePrefixesMixin, CachedScopeMixin, Primary
         else:
             return IPAddress.objects.filter(address__net_host_contained=str(self.prefix), vrf=self.vrf)
 
-    def get_available_ips(self):
+    def get_occupied_ranges(self, **range_filter):
         """
-        Return all available IPs within this prefix as an IPSet.
+        Yield the space occupied by all child IP addresses and those child IP ranges matching the given filter, as
+        (first, last) integer tuples ordered by first address. Overlapping and adjacent ranges are not merged. Child
+        IP addresses are streamed from the database in address order, so only as many are retrieved as are consumed.
         """
-        prefix = netaddr.IPSet(self.prefix)
-        child_ips = netaddr.IPSet([
-            ip.address.ip for ip in self.get_child_ips()
-        ])
-        child_ranges = netaddr.IPSet([
-            iprange.range for iprange in self.get_child_ranges().filter(mark_populated=True)
-        ])
-        available_ips = prefix - child_ips - child_ranges
+        host = Cast(Host('address'), output_field=IPAddressField())
+        ip_addresses = self.get_child_ips().annotate(
+            host=Host('address', output_field=models.CharField())
+        ).order_by(host).values_list('host', flat=True)
+        ip_ranges = self.get_child_ranges(**range_filter).order_by(
+            Cast(Host('start_address'), output_field=IPAddressField())
+        ).values_list(
+            'start_address', 'end_address'
+        )
+
+        return heapq.merge(
+            ((int(ip), int(ip)) for ip in map(netaddr.IPAddress, ip_addresses.iterator(chunk_size=1000))),
+            ((start.ip.value, end.ip.value) for start, end in ip_ranges)
+        )
+
+    def get_usable_bounds(self):
+        """
+        Return the first and last usable IP addresses within the prefix as integers.
+        """
+        first, last = self.prefix.first, self.prefix.last
 
         # IPv6 /127's, pool, or IPv4 /31-/32 sets are fully usable
         if (self.family == 6 and self.prefix.prefixlen >= 127) or self.is_pool or (
                 self.family == 4 and self.prefix.prefixlen >= 31
         ):
-            return available_ips
+            return first, last
 
         if self.family == 4:
             # For "normal" IPv4 prefixes, omit first and last addresses
-            available_ips -= netaddr.IPSet([
-                netaddr.IPAddress(self.prefix.first),
-                netaddr.IPAddress(self.prefix.last),
-            ])
-        else:
-            # For IPv6 prefixes, omit the Subnet-Router anycast address
-            # per RFC 4291
-            available_ips -= netaddr.IPSet([netaddr.IPAddress(self.prefix.first)])
+            return first + 1, last - 1
+
+        # For IPv6 prefixes, omit the Subnet-Router anycast address per RFC 4291
+        return first + 1, last
+
+    def iter_available_ranges(self):
+        """
+        Yield each contiguous range of available IPs within this prefix as a (first, last) tuple of integers, in
+        order. Child objects are consumed only as far as is necessary to find the next available range.
+        """
+        cursor, last = self.get_usable_bounds()
 
-        return available_ips
+        for start, end in self.get_occupied_ranges(mark_populated=True):
+            if start > last:
+                break
+            if start > cursor:
+                yield cursor, start - 1
+            cursor = max(cursor, end + 1)
+            if cursor > last:
+                return
+
+        if cursor <= last:
+            yield cursor, last
+
+    def iter_available_ips(self):
+        """
+        Yield each available IP within this prefix (as an IPAddress), in order.
+        """
+        version = self.family
+        for first, last in self.iter_available_ranges():
+            for value in range(first, last + 1):
+                yield netaddr.IPAddress(value, version=version)
+
+    def get_available_ips(self):
+        """
+        Return all available IPs within this prefix as an IPSet.
+        """
+        return netaddr.IPSet([
+            netaddr.IPRange(netaddr.IPAddress(first, self.family), netaddr.IPAddress(last, self.family))
+            for first, last in self.iter_available_ranges()
+        ])
 
     def get_first_available_ip(self):
         """
         Return the first available IP within the prefix (or None).
         """
-        available_ips = self.get_available_ips()
-        if not available_ips:
-            return None
-        return '{}/{}'.format(next(available_ips.__iter__()), self.prefix.prefixlen)
+        for first, last in self.iter_available_ranges():
+            return '{}/{}'.format(netaddr.IPAddress(first, self.family), self.prefix.prefixlen)
+        return None
 
     def get_utilization(self):
         """
@@ -471,17 +517,19 @@ class Prefix(ContactsMixin, GetAvailablePrefixesMixin, CachedScopeMixin, Primary
             child_prefixes = netaddr.IPSet([p.prefix for p in queryset])
             utilization = float(child_prefixes.size) / self.prefix.size * 100
         else:
-            # Compile an IPSet to avoid counting duplicate IPs
-            child_ips = netaddr.IPSet()
-            for iprange in self.get_child_ranges().filter(mark_utilized=True):
-                child_ips.add(iprange.range)
-            for ip in self.get_child_ips():
-                child_ips.add(ip.address.ip)
+            # Sum the occupied space, counting duplicate and overlapping IPs only once
+            child_count = 0
+            cursor = self.prefix.first
+            for start, end in self.get_occupied_ranges(mark_utilized=True):
+                start = max(start, cursor)
+                if end >= start:
+                    child_count += end - start + 1
+                    cursor = end + 1
 
             prefix_size = self.prefix.size
             if self.prefix.version == 4 and self.prefix.prefixlen < 31 and not self.is_pool:
                 prefix_size -= 2
-            utilization = float(child_ips.size) / prefix_size * 100
+            utilization = float(child_count) / prefix_size * 100
 
         return min(utilization, 100)
 
@@ -689,6 +737,12 @@ class IPRange(ContactsMixin, PrimaryModel):
 
         return netaddr.IPSet(range) - child_ips
 
+    def iter_available_ips(self):
+        """
+        Yield each available IP within this range (as an IPAddress), in order.
+        """
+        yield from self.get_available_ips()
+
     @cached_property
     def first_available_ip(self):
         """
@@ -1,29 +1,43 @@
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 
 from dcim.models import Device
 from virtualization.models import VirtualMachine
 from .models import IPAddress, Prefix
+from .utils import prefix_hierarchy_queue
 
 
-def update_parents_children(prefix):
+def add_to_hierarchy(prefix):
     """
-    Update depth on prefix & containing prefixes
+    Account for the addition of a prefix to its VRF: Increment the children count of all containing prefixes and,
+    if the prefix is not a duplicate, the depth of all contained prefixes. The depth and children count of the prefix
+    itself are then calculated.
     """
-    parents = prefix.get_parents(include_self=True).annotate_hierarchy()
-    for parent in parents:
-        parent._children = parent.hierarchy_children
-    Prefix.objects.bulk_update(parents, ['_children'], batch_size=100)
+    vrf_id, value = prefix.vrf_id, str(prefix.prefix)
+    others = Prefix.objects.filter(vrf_id=vrf_id).exclude(pk=prefix.pk)
 
+    others.filter(prefix__net_contains=value).update(_children=F('_children') + 1)
+    if not others.filter(prefix=value).exists():
+        others.filter(prefix__net_contained=value).update(_depth=F('_depth') + 1)
 
-def update_children_depth(prefix):
+    Prefix.objects.filter(pk=prefix.pk).update(
+        _depth=others.filter(prefix__net_contains=value).order_by().values('prefix').distinct().count(),
+        _children=others.filter(prefix__net_contained=value).count()
+    )
+
+
+def remove_from_hierarchy(vrf_id, value):
     """
-    Update children count on prefix & contained prefixes
+    Account for the removal of a prefix from its VRF: Decrement the children count of all containing prefixes and,
+    if no duplicates of the prefix remain, the depth of all contained prefixes.
     """
-    children = prefix.get_children(include_self=True).annotate_hierarchy()
-    for child in children:
-        child._depth = child.hierarchy_depth
-    Prefix.objects.bulk_update(children, ['_depth'], batch_size=100)
+    others = Prefix.objects.filter(vrf_id=vrf_id)
+
+    others.filter(prefix__net_contains=value).update(_children=Greatest(F('_children') - 1, 0))
+    if not others.filter(prefix=value).exists():
+        others.filter(prefix__net_contained=value).update(_depth=Greatest(F('_depth') - 1, 0))
 
 
 @receiver(post_save, sender=Prefix)
@@ -32,21 +46,30 @@ def handle_prefix_saved(instance, created, **kwargs):
     # Prefix has changed (or new instance has been created)
     if created or instance.vrf_id != instance._vrf_id or instance.prefix != instance._prefix:
 
-        update_parents_children(instance)
-        update_children_depth(instance)
+        # Defer updates to the hierarchy (if applicable)
+        if (vrfs := prefix_hierarchy_queue.get()) is not None:
+            vrfs.add(instance.vrf_id)
+            if not created:
+                vrfs.add(instance._vrf_id)
+
+        else:
+            # If this is not a new prefix, clean up parent/children of previous prefix
+            if not created:
+                remove_from_hierarchy(instance._vrf_id, str(instance._prefix))
+            add_to_hierarchy(instance)
 
-        # If this is not a new prefix, clean up parent/children of previous prefix
-        if not created:
-            old_prefix = Prefix(vrf_id=instance._vrf_id, prefix=instance._prefix)
-            update_parents_children(old_prefix)
-            update_children_depth(old_prefix)
+        # Record the current prefix and VRF to guard against repeated updates if the instance is saved again
+        instance._prefix = instance.prefix
+        instance._vrf_id = instance.vrf_id
 
 
 @receiver(post_delete, sender=Prefix)
 def handle_prefix_deleted(instance, **kwargs):
 
-    update_parents_children(instance)
-    update_children_depth(instance)
+    if (vrfs := prefix_hierarchy_queue.get()) is not None:
+        vrfs.add(instance.vrf_id)
+    else:
+        remove_from_hierarchy(instance.vrf_id, str(instance.prefix))
 
 
 @receiver(pre_delete, sender=IPAddress)
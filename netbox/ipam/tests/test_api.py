@@ -396,6 +396,33 @@ class PrefixTest(APIViewTestCases.APIViewTestCase):
         response = self.client.patch(url, data, format='json', **self.header)
         self.assertHttpStatus(response, status.HTTP_200_OK)
 
+    def test_bulk_create_prefix_hierarchy(self):
+        """
+        Test that the hierarchy of prefixes created in bulk is rebuilt.
+        """
+        vrf = VRF.objects.create(name='VRF 1')
+        data = [
+            {'prefix': '10.0.0.0/8', 'vrf': vrf.pk},
+            {'prefix': '10.1.0.0/16', 'vrf': vrf.pk},
+            {'prefix': '10.1.1.0/24', 'vrf': vrf.pk},
+        ]
+        url = reverse('ipam-api:prefix-list')
+        self.add_permissions('ipam.add_prefix')
+
+        response = self.client.post(url, data, format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        prefixes = Prefix.objects.filter(vrf=vrf).order_by('prefix')
+        self.assertEqual([p._depth for p in prefixes], [0, 1, 2])
+        self.assertEqual([p._children for p in prefixes], [2, 1, 0])
+
+        # Deleting the intermediate prefix should update the remaining prefixes
+        self.add_permissions('ipam.delete_prefix')
+        response = self.client.delete(url, [{'id': prefixes[1].pk}], format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_204_NO_CONTENT)
+        prefixes = Prefix.objects.filter(vrf=vrf).order_by('prefix')
+        self.assertEqual([p._depth for p in prefixes], [0, 1])
+        self.assertEqual([p._children for p in prefixes], [1, 0])
+
     def test_list_available_prefixes(self):
         """
         Test retrieval of all available prefixes within a parent prefix.
@@ -546,6 +573,38 @@ class PrefixTest(APIViewTestCases.APIViewTestCase):
         self.assertHttpStatus(response, status.HTTP_201_CREATED)
         self.assertEqual(len(response.data), 8)
 
+    def test_create_available_ips_bulk(self):
+        """
+        Test the creation of available IP addresses within multiple parent prefixes in a single request.
+        """
+        vrf = VRF.objects.create(name='VRF 1')
+        prefixes = (
+            Prefix.objects.create(prefix=IPNetwork('192.0.2.0/30'), vrf=vrf, is_pool=True),
+            Prefix.objects.create(prefix=IPNetwork('198.51.100.0/30'), is_pool=True),
+        )
+        url = reverse('ipam-api:available-ips')
+        self.add_permissions('ipam.view_prefix', 'ipam.add_ipaddress')
+
+        # Try to create five IPs in the first prefix (only four are available)
+        data = [{'prefix': prefixes[0].pk} for _ in range(5)]
+        response = self.client.post(url, data, format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_409_CONFLICT)
+        self.assertIn('detail', response.data)
+        self.assertFalse(prefixes[0].get_child_ips().exists())
+
+        # Create IPs within both prefixes in a single request
+        data = [
+            {'prefix': prefixes[0].pk, 'description': 'Test IP 1'},
+            {'prefix': prefixes[1].pk, 'description': 'Test IP 2'},
+            {'prefix': prefixes[0].pk, 'description': 'Test IP 3'},
+        ]
+        response = self.client.post(url, data, format='json', **self.header)
+        self.assertHttpStatus(response, status.HTTP_201_CREATED)
+        self.assertEqual(
+            [(ip['address'], ip['vrf']['id'] if ip['vrf'] else None) for ip in response.data],
+            [('192.0.2.0/30', vrf.pk), ('198.51.100.0/30', None), ('192.0.2.1/30', vrf.pk)]
+        )
+
 
 class IPRangeTest(APIViewTestCases.APIViewTestCase):
     model = IPRange
@@ -1,5 +1,6 @@
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
+from django.db import connection, transaction
 from django.test import TestCase, override_settings
 from netaddr import IPNetwork, IPSet
 from utilities.data import string_to_ranges
@@ -7,6 +8,7 @@ from utilities.data import string_to_ranges
 from dcim.models import Site, SiteGroup
 from ipam.choices import *
 from ipam.models import *
+from ipam.utils import defer_prefix_hierarchy, get_lock_id, lock_parent, rebuild_prefixes
 
 
 class TestAggregate(TestCase):
@@ -100,6 +102,29 @@ class TestPrefix(TestCase):
 
         self.assertSetEqual(set(duplicate_prefix_pks), {prefixes[1].pk, prefixes[2].pk})
 
+    def test_lock_parent_duplicates(self):
+        """
+        Allocation within a prefix must be serialized with allocation within any duplicate of the prefix.
+        """
+        prefixes = Prefix.objects.bulk_create((
+            Prefix(prefix=IPNetwork('192.0.2.0/24')),
+            Prefix(prefix=IPNetwork('192.0.2.0/24')),
+        ))
+
+        def get_locks():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT classid, objid, mode FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()"
+                )
+                return {(classid, objid): mode for classid, objid, mode in cursor.fetchall()}
+
+        with lock_parent('available-ips', prefixes[0]):
+            locks = get_locks()
+        self.assertEqual(locks, {
+            get_lock_id('available-ips', prefixes[0]): 'ExclusiveLock',
+            get_lock_id('available-ips', prefixes[1]): 'ShareLock',
+        })
+
     def test_get_child_prefixes(self):
         vrfs = VRF.objects.bulk_create((
             VRF(name='VRF 1'),
@@ -238,6 +263,49 @@ class TestPrefix(TestCase):
 
         self.assertEqual(available_ips, missing_ips)
 
+    def test_iter_available_ranges(self):
+
+        parent_prefix = Prefix.objects.create(prefix=IPNetwork('10.0.0.0/28'))
+        IPAddress.objects.bulk_create((
+            IPAddress(address=IPNetwork('10.0.0.1/28')),
+            IPAddress(address=IPNetwork('10.0.0.1/24')),  # Duplicate host
+            IPAddress(address=IPNetwork('10.0.0.5/28')),
+        ))
+        IPRange.objects.create(
+            start_address=IPNetwork('10.0.0.5/28'),
+            end_address=IPNetwork('10.0.0.8/28'),
+            mark_populated=True
+        )
+        available_ranges = list(parent_prefix.iter_available_ranges())
+
+        self.assertEqual(available_ranges, [
+            (IPNetwork('10.0.0.2/32').first, IPNetwork('10.0.0.4/32').first),
+            (IPNetwork('10.0.0.9/32').first, IPNetwork('10.0.0.14/32').first),
+        ])
+        self.assertEqual(str(next(parent_prefix.iter_available_ips())), '10.0.0.2')
+
+    def test_iter_available_ranges_mixed_masks(self):
+
+        parent_prefix = Prefix.objects.create(prefix=IPNetwork('10.0.0.0/28'))
+        # Ranges with differing mask lengths must be ordered by host address
+        IPRange.objects.create(
+            start_address=IPNetwork('10.0.0.9/24'),
+            end_address=IPNetwork('10.0.0.10/24'),
+            mark_populated=True
+        )
+        IPRange.objects.create(
+            start_address=IPNetwork('10.0.0.2/28'),
+            end_address=IPNetwork('10.0.0.3/28'),
+            mark_populated=True
+        )
+        available_ranges = list(parent_prefix.iter_available_ranges())
+
+        self.assertEqual(available_ranges, [
+            (IPNetwork('10.0.0.1/32').first, IPNetwork('10.0.0.1/32').first),
+            (IPNetwork('10.0.0.4/32').first, IPNetwork('10.0.0.8/32').first),
+            (IPNetwork('10.0.0.11/32').first, IPNetwork('10.0.0.14/32').first),
+        ])
+
     def test_get_first_available_prefix(self):
 
         prefixes = Prefix.objects.bulk_create((
@@ -530,6 +598,58 @@ class TestPrefixHierarchy(TestCase):
         self.assertEqual(prefixes[3]._depth, 2)
         self.assertEqual(prefixes[3]._children, 0)
 
+    def test_deferred_hierarchy4(self):
+        # Create 10.0.0.0/12 and delete 10.0.0.0/24 with hierarchy updates deferred
+        with defer_prefix_hierarchy():
+            Prefix(prefix='10.0.0.0/12').save()
+            Prefix.objects.filter(prefix='10.0.0.0/24').delete()
+
+            # Hierarchy has not yet been updated
+            prefix = Prefix.objects.get(prefix='10.0.0.0/16')
+            self.assertEqual(prefix._depth, 1)
+            self.assertEqual(prefix._children, 1)
+
+        prefixes = Prefix.objects.filter(prefix__family=4)
+        self.assertEqual(prefixes[0].prefix, IPNetwork('10.0.0.0/8'))
+        self.assertEqual(prefixes[0]._depth, 0)
+        self.assertEqual(prefixes[0]._children, 2)
+        self.assertEqual(prefixes[1].prefix, IPNetwork('10.0.0.0/12'))
+        self.assertEqual(prefixes[1]._depth, 1)
+        self.assertEqual(prefixes[1]._children, 1)
+        self.assertEqual(prefixes[2].prefix, IPNetwork('10.0.0.0/16'))
+        self.assertEqual(prefixes[2]._depth, 2)
+        self.assertEqual(prefixes[2]._children, 0)
+
+    def test_rebuild_prefixes(self):
+        vrf = VRF.objects.create(name='VRF A')
+        Prefix.objects.bulk_create((
+            Prefix(vrf=vrf, prefix='10.0.0.0/8'),
+            Prefix(vrf=vrf, prefix='10.0.0.0/16'),
+            Prefix(vrf=vrf, prefix='10.0.0.0/16'),
+        ))
+        Prefix.objects.update(_depth=0, _children=0)
+
+        rebuild_prefixes()
+
+        prefixes = Prefix.objects.filter(vrf__isnull=True, prefix__family=4)
+        self.assertEqual([(p._depth, p._children) for p in prefixes], [(0, 2), (1, 1), (2, 0)])
+        prefixes = Prefix.objects.filter(vrf__isnull=True, prefix__family=6)
+        self.assertEqual([(p._depth, p._children) for p in prefixes], [(0, 2), (1, 1), (2, 0)])
+        prefixes = Prefix.objects.filter(vrf=vrf)
+        self.assertEqual([(p._depth, p._children) for p in prefixes], [(0, 2), (1, 0), (1, 0)])
+
+    def test_rebuild_prefixes_repeated(self):
+        # The hierarchy may be rebuilt more than once within a single transaction
+        with transaction.atomic():
+            Prefix.objects.update(_depth=0, _children=0)
+            rebuild_prefixes()
+            Prefix(prefix='10.0.0.0/12').save()
+            Prefix.objects.update(_depth=0, _children=0)
+            rebuild_prefixes()
+
+        prefixes = Prefix.objects.filter(prefix__family=4)
+        self.assertEqual([(p._depth, p._children) for p in prefixes], [(0, 3), (1, 2), (2, 1), (3, 0)])
+
 
 class TestIPAddress(TestCase):
 
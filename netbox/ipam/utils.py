@@ -1,20 +1,41 @@
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
+from itertools import groupby, islice
+from operator import itemgetter
 import netaddr
 
+from django.db import connections, router, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Cast
 from django.utils.translation import gettext_lazy as _
+from django_pglocks import advisory_lock
 
+from netbox.constants import ADVISORY_LOCK_KEYS
 from .constants import *
-from .models import Prefix, VLAN
+from .fields import IPAddressField
+from .lookups import Host
+from .models import IPRange, Prefix, VLAN
 
 __all__ = (
     'AvailableIPSpace',
     'add_available_vlans',
     'add_requested_prefixes',
     'annotate_ip_space',
+    'defer_prefix_hierarchy',
     'get_next_available_prefix',
+    'get_prefix_hierarchy',
+    'ip_space_lock',
+    'lock_addresses',
+    'lock_parent',
+    'prefix_hierarchy_queue',
     'rebuild_prefixes',
+    'write_prefix_hierarchy',
 )
 
+# The set of VRF IDs (None for the global table) for which the prefix hierarchy must be rebuilt, if deferred
+prefix_hierarchy_queue = ContextVar('prefix_hierarchy_queue', default=None)
+
 
 @dataclass
 class AvailableIPSpace:
@@ -188,64 +209,128 @@ def add_available_vlans(vlans, vlan_group):
     return vlans
 
 
-def rebuild_prefixes(vrf):
+def get_prefix_hierarchy(prefixes):
     """
-    Rebuild the prefix hierarchy for all prefixes in the specified VRF (or global table).
+    Calculate the depth and children count of each prefix within a single VRF (or the global table). Prefixes must be
+    provided as an iterable of (pk, prefix) tuples, ordered by prefix. Yields a (pk, depth, children) tuple for each
+    prefix.
+
+    Because prefixes are ordered, each prefix's containing prefixes will always be found on the stack (in effect,
+    the current branch of a prefix tree), so the entire VRF is processed in a single pass.
     """
     def contains(parent, child):
         return child in parent and child != parent
 
-    def push_to_stack(prefix):
-        # Increment child count on parent nodes
-        for n in stack:
-            n['children'] += 1
-        stack.append({
-            'pk': [prefix['pk']],
-            'prefix': prefix['prefix'],
-            'children': 0,
-        })
+    def pop_from_stack():
+        node = stack.pop()
+        for pk in node['pk']:
+            yield pk, len(stack), node['children']
 
     stack = []
-    update_queue = []
-    prefixes = Prefix.objects.filter(vrf=vrf).values('pk', 'prefix')
 
     # Iterate through all Prefixes in the VRF, growing and shrinking the stack as we go
-    for i, p in enumerate(prefixes):
-
-        # Grow the stack if this is a child of the most recent prefix
-        if not stack or contains(stack[-1]['prefix'], p['prefix']):
-            push_to_stack(p)
+    for pk, prefix in prefixes:
 
         # Handle duplicate prefixes
-        elif stack[-1]['prefix'] == p['prefix']:
-            stack[-1]['pk'].append(p['pk'])
+        if stack and stack[-1]['prefix'] == prefix:
+            stack[-1]['pk'].append(pk)
+            continue
 
         # If this is a sibling or parent of the most recent prefix, pop nodes from the
         # stack until we reach a parent prefix (or the root)
-        else:
-            while stack and not contains(stack[-1]['prefix'], p['prefix']):
-                node = stack.pop()
-                for pk in node['pk']:
-                    update_queue.append(
-                        Prefix(pk=pk, _depth=len(stack), _children=node['children'])
-                    )
-            push_to_stack(p)
-
-        # Flush the update queue once it reaches 100 Prefixes
-        if len(update_queue) >= 100:
-            Prefix.objects.bulk_update(update_queue, ['_depth', '_children'])
-            update_queue = []
+        while stack and not contains(stack[-1]['prefix'], prefix):
+            yield from pop_from_stack()
+
+        # Increment child count on parent nodes
+        for node in stack:
+            node['children'] += 1
+        stack.append({
+            'pk': [pk],
+            'prefix': prefix,
+            'children': 0,
+        })
 
     # Clear out any prefixes remaining in the stack
     while stack:
-        node = stack.pop()
-        for pk in node['pk']:
-            update_queue.append(
-                Prefix(pk=pk, _depth=len(stack), _children=node['children'])
+        yield from pop_from_stack()
+
+
+def write_prefix_hierarchy(values, batch_size=10000):
+    """
+    Save the depth and children count of many prefixes, provided as an iterable of (pk, depth, children) tuples.
+    Values are copied to a temporary table in batches, and only those prefixes whose values have changed are then
+    updated by a single query. Returns the number of prefixes updated.
+    """
+    using = router.db_for_write(Prefix)
+    table = Prefix._meta.db_table
+    values = iter(values)
+
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            # The table persists until the outermost transaction is committed, so it may remain from a previous call.
+            # The schema is qualified to ensure a permanent table of the same name is never dropped.
+            cursor.execute('DROP TABLE IF EXISTS pg_temp."ipam_prefix_hierarchy"')
+            cursor.execute(
+                'CREATE TEMPORARY TABLE "ipam_prefix_hierarchy" ("id" bigint, "depth" smallint, "children" bigint) '
+                'ON COMMIT DROP'
+            )
+            # Values are gathered before starting each COPY, as they may be streamed from the same connection
+            while batch := list(islice(values, batch_size)):
+                with cursor.copy('COPY "ipam_prefix_hierarchy" ("id", "depth", "children") FROM STDIN') as copy:
+                    for row in batch:
+                        copy.write_row(row)
+            cursor.execute(
+                f'UPDATE "{table}" SET "_depth" = h."depth", "_children" = h."children" '
+                f'FROM "ipam_prefix_hierarchy" h '
+                f'WHERE "{table}"."id" = h."id" '
+                f'AND ("{table}"."_depth", "{table}"."_children") IS DISTINCT FROM (h."depth", h."children")'
             )
+            return cursor.rowcount
+
 
-    # Final flush of any remaining Prefixes
-    Prefix.objects.bulk_update(update_queue, ['_depth', '_children'])
+def rebuild_prefixes(*vrfs):
+    """
+    Rebuild the prefix hierarchy for all prefixes in the specified VRFs (None designates the global table). If no
+    VRFs are specified, the hierarchy is rebuilt for all prefixes. Returns the number of prefixes updated.
+    """
+    prefixes = Prefix.objects.all()
+    if vrfs:
+        query = Q(vrf__in=[vrf for vrf in vrfs if vrf is not None])
+        if None in vrfs:
+            query |= Q(vrf__isnull=True)
+        prefixes = prefixes.filter(query)
+
+    def get_values():
+        # Stream all prefixes (ordered by VRF and prefix) and calculate the hierarchy for each VRF in turn
+        queryset = prefixes.order_by(F('vrf').asc(nulls_first=True), 'prefix', 'pk').values_list(
+            'vrf_id', 'pk', 'prefix'
+        )
+        for vrf_id, vrf_prefixes in groupby(queryset.iterator(chunk_size=10000), key=itemgetter(0)):
+            yield from get_prefix_hierarchy((pk, prefix) for _, pk, prefix in vrf_prefixes)
+
+    return write_prefix_hierarchy(get_values())
+
+
+@contextmanager
+def defer_prefix_hierarchy():
+    """
+    Defer the maintenance of the prefix hierarchy (depth and children counts) for prefixes created, modified, or
+    deleted within the context. Upon exit, the hierarchy of each affected VRF is rebuilt once, which is far cheaper
+    than incremental updates when operating on many prefixes at once. May be nested; only the outermost context
+    rebuilds the hierarchy.
+    """
+    if prefix_hierarchy_queue.get() is not None:
+        yield
+        return
+
+    token = prefix_hierarchy_queue.set(set())
+    try:
+        yield
+    finally:
+        vrfs = prefix_hierarchy_queue.get()
+        prefix_hierarchy_queue.reset(token)
+        if vrfs:
+            rebuild_prefixes(*vrfs)
 
 
 def get_next_available_prefix(ipset, prefix_size):
@@ -258,3 +343,71 @@ def get_next_available_prefix(ipset, prefix_size):
             ipset.remove(allocated_prefix)
             return allocated_prefix
     return None
+
+
+def get_lock_id(namespace, obj):
+    """
+    Return a two-part advisory lock ID identifying the given namespace (e.g. "available-ips") and object.
+    """
+    return ADVISORY_LOCK_KEYS[f'{namespace}-{obj._meta.model_name}'], obj.pk % 2**31
+
+
+@contextmanager
+def ip_space_lock(namespace, exclusive=(), shared=()):
+    """
+    Acquire PostgreSQL advisory locks on the given Prefixes and/or IPRanges. Exclusive locks are held on objects within
+    which space is being allocated; shared locks on other objects whose space is affected. Locks are acquired in a
+    consistent order to avoid deadlocks.
+    """
+    locks = {get_lock_id(namespace, obj): True for obj in shared}
+    locks.update({get_lock_id(namespace, obj): False for obj in exclusive})
+
+    with ExitStack() as stack:
+        for lock_id in sorted(locks):
+            stack.enter_context(advisory_lock(lock_id, shared=locks[lock_id]))
+        yield
+
+
+def lock_parent(namespace, parent):
+    """
+    Lock the space within a Prefix or IPRange for allocation. The parent is locked exclusively, and all Prefixes which
+    contain (or duplicate) it are locked in shared mode. Allocations within unrelated parents may thus proceed
+    concurrently, whereas allocations within a parent and any of its children or duplicates are serialized.
+    """
+    if isinstance(parent, Prefix):
+        containers = parent.get_parents(include_self=True)
+    else:
+        containers = Prefix.objects.filter(
+            vrf=parent.vrf,
+            prefix__net_contains_or_equals=str(parent.start_address.ip)
+        ).filter(
+            prefix__net_contains_or_equals=str(parent.end_address.ip)
+        )
+
+    return ip_space_lock(namespace, exclusive=[parent], shared=containers)
+
+
+def lock_addresses(addresses):
+    """
+    Lock (in shared mode) all Prefixes and IPRanges which contain any of the given IP addresses, in any VRF, to
+    prevent concurrent allocation of available IPs within them.
+    """
+    prefixes = Q()
+    ranges = Q()
+    for address in addresses:
+        prefixes |= Q(prefix__net_contains_or_equals=str(address.ip))
+        ranges |= Q(start_host__lte=str(address.ip), end_host__gte=str(address.ip))
+
+    if not prefixes:
+        return ip_space_lock('available-ips')
+
+    # Compare host addresses only (inet comparison takes mask length into account)
+    ip_ranges = IPRange.objects.annotate(
+        start_host=Cast(Host('start_address'), output_field=IPAddressField()),
+        end_host=Cast(Host('end_address'), output_field=IPAddressField()),
+    ).filter(ranges)
+
+    return ip_space_lock(
+        'available-ips',
+        shared=[*Prefix.objects.filter(prefixes), *ip_ranges]
+    )
@@ -21,7 +21,7 @@ from . import filtersets, forms, tables
 from .choices import PrefixStatusChoices
 from .constants import *
 from .models import *
-from .utils import add_requested_prefixes, add_available_vlans, annotate_ip_space
+from .utils import add_requested_prefixes, add_available_vlans, annotate_ip_space, defer_prefix_hierarchy
 
 
 #
@@ -667,6 +667,11 @@ class PrefixBulkImportView(generic.BulkImportView):
     queryset = Prefix.objects.all()
     model_form = forms.PrefixImportForm
 
+    def post(self, request, *args, **kwargs):
+        # Rebuild the hierarchy of each affected VRF once, rather than updating it for each prefix
+        with defer_prefix_hierarchy():
+            return super().post(request, *args, **kwargs)
+
 
 @register_model_view(Prefix, 'bulk_edit', path='edit', detail=False)
 class PrefixBulkEditView(generic.BulkEditView):
@@ -675,6 +680,10 @@ class PrefixBulkEditView(generic.BulkEditView):
     table = tables.PrefixTable
     form = forms.PrefixBulkEditForm
 
+    def post(self, request, *args, **kwargs):
+        with defer_prefix_hierarchy():
+            return super().post(request, *args, **kwargs)
+
 
 @register_model_view(Prefix, 'bulk_delete', path='delete', detail=False)
 class PrefixBulkDeleteView(generic.BulkDeleteView):
@@ -682,6 +691,10 @@ class PrefixBulkDeleteView(generic.BulkDeleteView):
     filterset = filtersets.PrefixFilterSet
     table = tables.PrefixTable
 
+    def post(self, request, *args, **kwargs):
+        with defer_prefix_hierarchy():
+            return super().post(request, *args, **kwargs)
+
 
 #
 # IP Ranges
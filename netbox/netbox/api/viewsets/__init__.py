@@ -6,6 +6,7 @@ from django.db import router, transaction
 from django.db.models import ProtectedError, RestrictedError
 from django_pglocks import advisory_lock
 from netbox.constants import ADVISORY_LOCK_KEYS
+from netbox.context_managers import deferred_change_logging
 from rest_framework import mixins as drf_mixins
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
@@ -170,7 +171,7 @@ class NetBoxModelViewSet(
 
         # Enforce object-level permissions on save()
         try:
-            with transaction.atomic(using=router.db_for_write(model)):
+            with transaction.atomic(using=router.db_for_write(model)), deferred_change_logging():
                 instance = serializer.save()
                 self._validate_objects(instance)
         except ObjectDoesNotExist:
@@ -7,6 +7,8 @@ from rest_framework.response import Response
 from core.models import ObjectType
 from extras.models import ExportTemplate
 from netbox.api.serializers import BulkOperationSerializer
+from netbox.context_managers import deferred_change_logging
+from netbox.denormalized import deferred_denormalized_updates
 
 __all__ = (
     'BulkDestroyModelMixin',
@@ -45,7 +47,7 @@ class ExportTemplatesMixin:
             if et is None:
                 raise Http404
             queryset = self.filter_queryset(self.get_queryset())
-            return et.render_to_response(queryset=queryset)
+            return et.render_to_response(queryset=queryset, stream=True)
 
         return super().list(request, *args, **kwargs)
 
@@ -113,16 +115,17 @@ class BulkUpdateModelMixin:
         return Response(data, status=status.HTTP_200_OK)
 
     def perform_bulk_update(self, objects, update_data, partial):
-        with transaction.atomic(using=router.db_for_write(self.queryset.model)):
-            data_list = []
-            for obj in objects:
-                data = update_data.get(obj.id)
-                if hasattr(obj, 'snapshot'):
-                    obj.snapshot()
-                serializer = self.get_serializer(obj, data=data, partial=partial)
-                serializer.is_valid(raise_exception=True)
-                self.perform_update(serializer)
-                data_list.append(serializer.data)
+        with transaction.atomic(using=router.db_for_write(self.queryset.model)), deferred_denormalized_updates():
+            with deferred_change_logging():
+                data_list = []
+                for obj in objects:
+                    data = update_data.get(obj.id)
+                    if hasattr(obj, 'snapshot'):
+                        obj.snapshot()
+                    serializer = self.get_serializer(obj, data=data, partial=partial)
+                    serializer.is_valid(raise_exception=True)
+                    self.perform_update(serializer)
+                    data_list.append(serializer.data)
 
             return data_list
 
@@ -157,7 +160,7 @@ class BulkDestroyModelMixin:
         return Response(status=status.HTTP_204_NO_CONTENT)
 
     def perform_bulk_destroy(self, objects):
-        with transaction.atomic(using=router.db_for_write(self.queryset.model)):
+        with transaction.atomic(using=router.db_for_write(self.queryset.model)), deferred_change_logging():
             for obj in objects:
                 if hasattr(obj, 'snapshot'):
                     obj.snapshot()
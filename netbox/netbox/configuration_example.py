@@ -141,6 +141,10 @@ EXEMPT_VIEW_PERMISSIONS = [
     # 'ipam.prefix',
 ]
 
+# The file path where the output of export templates rendered in the background will be stored. A trailing slash is
+# not needed. Note that the default value of this setting is derived from the installed location.
+# EXPORT_FILES_ROOT = '/opt/netbox/netbox/exports'
+
 # HTTP proxies NetBox should use when sending outbound HTTP requests (e.g. for webhooks).
 # HTTP_PROXIES = {
 #     'http': 'http://10.10.1.10:3128',
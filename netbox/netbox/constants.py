@@ -14,6 +14,11 @@ ADVISORY_LOCK_KEYS = {
     'available-vlans': 100300,
     'available-asns': 100400,
 
+    # Per-object available object locks (paired with the object's primary key)
+    'available-prefixes-prefix': 100110,
+    'available-ips-prefix': 100210,
+    'available-ips-iprange': 100220,
+
     # MPTT locks
     'region': 105100,
     'sitegroup': 105200,
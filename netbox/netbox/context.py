@@ -1,10 +1,41 @@
+from contextlib import contextmanager
 from contextvars import ContextVar
 
 __all__ = (
+    'changelog_queue',
+    'counters_queue',
     'current_request',
+    'deferred_queue',
+    'denormalized_queue',
     'events_queue',
+    'search_queue',
 )
 
 
+changelog_queue = ContextVar('changelog_queue', default=None)
+counters_queue = ContextVar('counters_queue', default=None)
 current_request = ContextVar('current_request', default=None)
+denormalized_queue = ContextVar('denormalized_queue', default=None)
 events_queue = ContextVar('events_queue', default=dict())
+search_queue = ContextVar('search_queue', default=None)
+
+
+@contextmanager
+def deferred_queue(var, factory, flush):
+    """
+    Set the given ContextVar to a new queue (created by calling factory) within the context, and pass the queue to
+    flush() upon exit, provided that no exception was raised. May be nested; only the outermost context flushes the
+    queue.
+    """
+    if var.get() is not None:
+        yield
+        return
+
+    queue = factory()
+    token = var.set(queue)
+    try:
+        yield
+    finally:
+        var.reset(token)
+
+    flush(queue)
@@ -1,6 +1,11 @@
+from collections import defaultdict
 from contextlib import contextmanager
 
-from netbox.context import current_request, events_queue
+from django.conf import settings
+
+from core.changelog import ObjectChangeQueue
+from netbox.context import changelog_queue, current_request, deferred_queue, events_queue, search_queue
+from netbox.search.backends import search_backend
 from netbox.utils import register_request_processor
 from extras.events import flush_events
 
@@ -26,3 +31,52 @@ def event_tracking(request):
     # Clear context vars
     current_request.set(None)
     events_queue.set({})
+
+
+@contextmanager
+def deferred_search_caching():
+    """
+    Record objects which are created, updated, or deleted within the context, and update their cached search
+    representations in bulk upon exit (rather than each time an object is saved). May be nested; only the outermost
+    context flushes the queue.
+    """
+    if search_queue.get() is not None:
+        yield
+        return
+
+    token = search_queue.set(defaultdict(set))
+    try:
+        yield
+    finally:
+        queue = search_queue.get()
+        search_queue.reset(token)
+        if queue:
+            search_backend.flush(queue)
+
+
+@register_request_processor
+@contextmanager
+def search_caching(request):
+    """
+    Defer updates to the search cache until the request has been processed, if SEARCH_CACHE_DEFERRED is enabled.
+
+    :param request: WSGIRequest object with a unique `id` set
+    """
+    if not settings.SEARCH_CACHE_DEFERRED:
+        yield
+        return
+
+    with deferred_search_caching():
+        yield
+
+
+@contextmanager
+def deferred_change_logging():
+    """
+    Queue the ObjectChange records created within the context, and write them in bulk upon exit (rather than each time
+    an object is saved). Intended for use within the transaction of a bulk operation, so that the records are written
+    as part of the same transaction: If an exception is raised within the context, the queued records are discarded.
+    May be nested; only the outermost context writes the records.
+    """
+    with deferred_queue(changelog_queue, ObjectChangeQueue, ObjectChangeQueue.flush):
+        yield
@@ -1,10 +1,20 @@
 import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import reduce
+from operator import or_
 
+from django.db.models import Q
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
+from netbox.context import deferred_queue, denormalized_queue
 from netbox.registry import registry
 
+__all__ = (
+    'deferred_denormalized_updates',
+    'register',
+)
 
 logger = logging.getLogger('netbox.denormalized')
 
@@ -28,6 +38,50 @@ def register(model, field_name, mappings):
     )
 
 
+def _get_stale_filter(update_params):
+    """
+    Return a Q object matching rows for which any of the denormalized fields differs from the specified value.
+    """
+    return reduce(or_, [
+        Q(**{f'{denorm}__isnull': False}) if value is None else ~Q(**{denorm: value})
+        for denorm, value in update_params.items()
+    ])
+
+
+def update_denormalized_values(model, field_name, pks, update_params):
+    """
+    Update the denormalized fields of all instances of the model related to any of the specified objects, skipping
+    rows which are already up-to-date. Returns the number of rows updated.
+    """
+    return model.objects.filter(**{f'{field_name}__in': pks}).filter(
+        _get_stale_filter(update_params)
+    ).update(**update_params)
+
+
+@contextmanager
+def deferred_denormalized_updates():
+    """
+    Defer the propagation of denormalized values while saving many objects (e.g. during a bulk edit). Rather than
+    updating dependent rows on each save, the most recent values of all modified objects are collected and applied
+    upon exit, using a single query for each set of objects sharing the same values. May be nested; only the outermost
+    context applies the updates.
+
+    Updates are not applied if an exception is raised within the context.
+    """
+    def flush(queue):
+        for (model, field_name), values in queue.items():
+            # Group objects by their values so that each distinct set of values requires only one query
+            groups = defaultdict(list)
+            for pk, update_params in values.items():
+                groups[tuple(update_params.items())].append(pk)
+            for update_params, pks in groups.items():
+                count = update_denormalized_values(model, field_name, pks, dict(update_params))
+                logger.debug(f'Updated {count} rows for {model}.{field_name}')
+
+    with deferred_queue(denormalized_queue, lambda: defaultdict(dict), flush):
+        yield
+
+
 @receiver(post_save)
 def update_denormalized_fields(sender, instance, created, raw, **kwargs):
     """
@@ -42,17 +96,41 @@ def update_denormalized_fields(sender, instance, created, raw, **kwargs):
         return
 
     # Look up any denormalized fields referencing this model from the application registry
-    for model, field_name, mappings in registry['denormalized_fields'].get(sender, []):
-        logger.debug(f'Updating denormalized values for {model}.{field_name}')
-        filter_params = {
-            field_name: instance.pk,
-        }
+    denormalized_fields = registry['denormalized_fields'].get(sender, [])
+    if not denormalized_fields:
+        return
+
+    # Determine the values last propagated for the instance: those recorded by a prior save, or else those captured
+    # by its pre-change snapshot (if any)
+    prior_values = getattr(instance, '_denormalized_values', None)
+    if prior_values is None:
+        prior_values = getattr(instance, '_prechange_snapshot', None)
+    current_values = {}
+
+    for model, field_name, mappings in denormalized_fields:
         update_params = {
             # Map the denormalized field names to the instance's values
             denorm: _get_field_value(instance, origin) for denorm, origin in mappings.items()
         }
+        current_values.update({
+            origin: update_params[denorm] for denorm, origin in mappings.items()
+        })
+
+        # Skip propagation if none of the mapped fields has changed
+        if prior_values is not None and all(
+            origin in prior_values and prior_values[origin] == update_params[denorm]
+            for denorm, origin in mappings.items()
+        ):
+            logger.debug(f'Skipping denormalized values for {model}.{field_name} (no change)')
+            continue
+
+        # Queue the update if propagation is being deferred
+        if (queue := denormalized_queue.get()) is not None:
+            queue[(model, field_name)][instance.pk] = update_params
+            continue
 
-        # TODO: Improve efficiency here by placing conditions on the query?
-        # Update all the denormalized fields with the triggering object's new values
-        count = model.objects.filter(**filter_params).update(**update_params)
+        logger.debug(f'Updating denormalized values for {model}.{field_name}')
+        count = update_denormalized_values(model, field_name, [instance.pk], update_params)
         logger.debug(f'Updated {count} rows')
+
+    instance._denormalized_values = current_values
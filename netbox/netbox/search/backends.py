@@ -1,7 +1,9 @@
+import re
 from collections import defaultdict
 
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramSimilarity
 from django.core.exceptions import ImproperlyConfigured
 from django.db.models import F, Window, Q, prefetch_related_objects
 from django.db.models.fields.related import ForeignKey
@@ -14,6 +16,7 @@ from netaddr.core import AddrFormatError
 
 from core.models import ObjectType
 from extras.models import CachedValue, CustomField
+from netbox.context import search_queue
 from netbox.registry import registry
 from utilities.object_types import object_type_identifier
 from utilities.querysets import RestrictedPrefetch
@@ -22,6 +25,8 @@ from . import FieldTypes, LookupTypes, get_indexer
 
 DEFAULT_LOOKUP_TYPE = LookupTypes.PARTIAL
 MAX_RESULTS = 1000
+FLUSH_CHUNK_SIZE = 10000
+FULLTEXT_SEARCH_CONFIG = 'simple'
 
 
 class SearchBackend:
@@ -62,14 +67,38 @@ class SearchBackend:
         """
         Receiver for the post_save signal, responsible for caching object creation/changes.
         """
+        if (queue := search_queue.get()) is not None:
+            return self.enqueue(queue, instance)
         self.cache(instance, remove_existing=not created)
 
     def removal_handler(self, sender, instance, **kwargs):
         """
         Receiver for the post_delete signal, responsible for caching object deletion.
         """
+        if (queue := search_queue.get()) is not None:
+            return self.enqueue(queue, instance)
         self.remove(instance)
 
+    @staticmethod
+    def enqueue(queue, instance):
+        """
+        Record an instance as needing to be re-cached when the queue is next flushed. Each object is recorded only
+        once, regardless of how many times it has been saved or whether it has since been deleted.
+        """
+        try:
+            get_indexer(instance)
+        except KeyError:
+            return
+        queue[type(instance)].add(instance.pk)
+
+    def flush(self, queue, remove_existing=True):
+        """
+        Re-cache all objects recorded in the given queue (a mapping of models to sets of primary keys). Any
+        recorded object which no longer exists will have its cached representation removed. If remove_existing is
+        False, the objects are assumed to have no cached representation (e.g. because the cache has been cleared).
+        """
+        raise NotImplementedError
+
     def cache(self, instances, indexer=None, remove_existing=True):
         """
         Create or update the cached representation of an instance.
@@ -105,9 +134,10 @@ class SearchBackend:
 
 class CachedValueSearchBackend(SearchBackend):
 
-    def search(self, value, user=None, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
-
-        # Build the filter used to find relevant CachedValue records
+    def get_query_filter(self, value, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+        """
+        Return a Q object used to find the CachedValue records matching the given value.
+        """
         query_filter = Q(**{f'value__{lookup}': value})
         if object_types:
             # Limit results by object type
@@ -125,15 +155,28 @@ class CachedValueSearchBackend(SearchBackend):
             except (AddrFormatError, ValueError):
                 pass
 
-        # Construct the base queryset to retrieve matching results
-        queryset = CachedValue.objects.filter(query_filter).annotate(
+        return query_filter
+
+    def get_queryset(self, value, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+        """
+        Return the base CachedValue queryset for the given search, annotated with the rank of each result for its
+        object (`row_number`).
+        """
+        query_filter = self.get_query_filter(value, object_types=object_types, lookup=lookup)
+
+        return CachedValue.objects.filter(query_filter).annotate(
             # Annotate the rank of each result for its object according to its weight
             row_number=Window(
                 expression=window.RowNumber(),
                 partition_by=[F('object_type'), F('object_id')],
                 order_by=[F('weight').asc()],
             )
-        )[:MAX_RESULTS]
+        )
+
+    def search(self, value, user=None, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+
+        # Construct the base queryset to retrieve matching results
+        queryset = self.get_queryset(value, object_types=object_types, lookup=lookup)[:MAX_RESULTS]
 
         # Gather all ObjectTypes present in the search results (used for prefetching related
         # objects). This must be done before generating the final results list, which returns
@@ -253,6 +296,31 @@ class CachedValueSearchBackend(SearchBackend):
         # Call _raw_delete() on the queryset to avoid first loading instances into memory
         return qs._raw_delete(using=qs.db)
 
+    def flush(self, queue, remove_existing=True):
+        counter = 0
+
+        for model, pks in queue.items():
+            indexer = get_indexer(model)
+            object_type = ObjectType.objects.get_for_model(model)
+            pks = sorted(pks)
+
+            for i in range(0, len(pks), FLUSH_CHUNK_SIZE):
+                chunk = pks[i:i + FLUSH_CHUNK_SIZE]
+
+                # Wipe out any previously cached values for the objects in a single query
+                if remove_existing:
+                    qs = CachedValue.objects.filter(object_type=object_type, object_id__in=chunk)
+                    qs._raw_delete(using=qs.db)
+
+                # Cache the objects which still exist
+                counter += self.cache(
+                    model.objects.filter(pk__in=chunk).iterator(),
+                    indexer=indexer,
+                    remove_existing=False
+                )
+
+        return counter
+
     def clear(self, object_types=None):
         qs = CachedValue.objects.all()
         if object_types:
@@ -272,6 +340,65 @@ class CachedValueSearchBackend(SearchBackend):
         return CachedValue.objects.count()
 
 
+class PostgreSQLSearchBackend(CachedValueSearchBackend):
+    """
+    A variant of CachedValueSearchBackend which leverages PostgreSQL's full text search and trigram (pg_trgm)
+    capabilities. Cached values are matched using the GIN indexes defined on CachedValue, and results are ranked
+    by their relevance to the search term within each weight.
+    """
+    @staticmethod
+    def get_search_vector():
+        # Must match the expression of the extras_cachedvalue_value_fts index
+        return SearchVector('value', config=FULLTEXT_SEARCH_CONFIG)
+
+    @staticmethod
+    def get_prefix_query(value):
+        """
+        Return a SearchQuery matching each word in the given value as a prefix, or None if the value contains no
+        searchable words.
+        """
+        if words := re.findall(r'\w+', value.lower()):
+            return SearchQuery(
+                ' & '.join(f'{word}:*' for word in words),
+                config=FULLTEXT_SEARCH_CONFIG,
+                search_type='raw'
+            )
+
+    def get_query_filter(self, value, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+        query_filter = super().get_query_filter(value, object_types=object_types, lookup=lookup)
+
+        # Extend partial and "starts with" lookups to match word prefixes anywhere within the value
+        if lookup in (LookupTypes.PARTIAL, LookupTypes.STARTSWITH) and (query := self.get_prefix_query(value)):
+            fulltext_filter = Q(search_vector=query)
+            if object_types:
+                fulltext_filter &= Q(object_type__in=object_types)
+            if lookup == LookupTypes.STARTSWITH:
+                fulltext_filter &= Q(type=FieldTypes.STRING)
+            query_filter |= fulltext_filter
+
+        return query_filter
+
+    def get_queryset(self, value, object_types=None, lookup=DEFAULT_LOOKUP_TYPE):
+        query_filter = self.get_query_filter(value, object_types=object_types, lookup=lookup)
+
+        # Rank each result by its full text relevance and its trigram similarity to the search term
+        rank = TrigramSimilarity('value', value)
+        if query := self.get_prefix_query(value):
+            rank += SearchRank(self.get_search_vector(), query)
+
+        return CachedValue.objects.alias(
+            search_vector=self.get_search_vector()
+        ).filter(query_filter).annotate(
+            rank=rank,
+            # Annotate the rank of each result for its object according to its weight and relevance
+            row_number=Window(
+                expression=window.RowNumber(),
+                partition_by=[F('object_type'), F('object_id')],
+                order_by=[F('weight').asc(), rank.desc()],
+            )
+        ).order_by('weight', '-rank', 'object_type', 'object_id')
+
+
 def get_backend():
     """
     Initializes and returns the configured search backend.
@@ -1,3 +1,4 @@
+import csv
 from copy import deepcopy
 from functools import cached_property
 from urllib.parse import urlencode
@@ -22,6 +23,7 @@ from netbox.registry import registry
 from netbox.tables import columns
 from utilities.html import highlight
 from utilities.paginator import EnhancedPaginator, get_paginate_count
+from utilities.querysets import ChunkedQuerySet
 from utilities.string import title
 from utilities.views import get_viewname
 from .template_code import *
@@ -87,6 +89,34 @@ class BaseTable(tables.Table):
                         prefetch_fields.append('__'.join(prefetch_path))
             self.data.data = self.data.data.prefetch_related(*prefetch_fields)
 
+    def as_csv(self, exclude_columns=None, chunk_size=1000):
+        """
+        Render the table's data (as returned by as_values()) in CSV format, yielding the output incrementally. If the
+        table is populated from a QuerySet, its objects are retrieved in chunks of the specified size without being
+        cached, so that memory consumption remains constant regardless of the number of rows.
+        """
+        class Echo:
+            # Pseudo-buffer which returns each line written to it by the CSV writer
+            def write(self, value):
+                return value
+
+        writer = csv.writer(Echo())
+        data = self.data.data
+        if isinstance(self.data, TableQuerysetData):
+            self.data.data = ChunkedQuerySet(data, chunk_size=chunk_size)
+
+        try:
+            lines = []
+            for row in self.as_values(exclude_columns):
+                lines.append(writer.writerow(row))
+                if len(lines) >= chunk_size:
+                    yield ''.join(lines)
+                    lines = []
+            if lines:
+                yield ''.join(lines)
+        finally:
+            self.data.data = data
+
     def _get_columns(self, visible=True):
         columns = []
         for name, column in self.columns.items():
@@ -0,0 +1,60 @@
+from django.test import TestCase
+
+from dcim.models import Region, Site
+from ipam.models import Prefix
+from netbox.denormalized import deferred_denormalized_updates
+
+
+class DenormalizedFieldsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        regions = (
+            Region(name='Region 1', slug='region-1'),
+            Region(name='Region 2', slug='region-2'),
+        )
+        for region in regions:
+            region.save()
+        sites = Site.objects.bulk_create((
+            Site(name='Site 1', slug='site-1', region=regions[0]),
+            Site(name='Site 2', slug='site-2', region=regions[0]),
+        ))
+        for i, site in enumerate(sites, start=1):
+            Prefix.objects.create(prefix=f'192.0.{i}.0/24', scope=site)
+
+    def test_propagate_changed_values(self):
+        region = Region.objects.get(slug='region-2')
+        site = Site.objects.get(slug='site-1')
+        site.snapshot()
+        site.region = region
+        site.save()
+
+        self.assertEqual(Prefix.objects.get(_site=site)._region, region)
+        self.assertNotEqual(Prefix.objects.get(_site__slug='site-2')._region, region)
+
+    def test_skip_unchanged_values(self):
+        region = Region.objects.get(slug='region-2')
+        site = Site.objects.get(slug='site-1')
+
+        # Alter the denormalized value directly, so we can tell whether it has been overwritten
+        Prefix.objects.filter(_site=site).update(_region=region)
+
+        site.snapshot()
+        site.description = 'New description'
+        site.save()
+
+        self.assertEqual(Prefix.objects.get(_site=site)._region, region)
+
+    def test_deferred_updates(self):
+        region = Region.objects.get(slug='region-2')
+
+        with deferred_denormalized_updates():
+            for site in Site.objects.all():
+                site.snapshot()
+                site.region = region
+                site.save()
+
+            # Propagation is deferred until the context exits
+            self.assertFalse(Prefix.objects.filter(_region=region).exists())
+
+        self.assertEqual(Prefix.objects.filter(_region=region).count(), 2)
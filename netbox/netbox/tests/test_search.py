@@ -1,10 +1,17 @@
+from io import StringIO
+
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
 from dcim.models import Site
 from dcim.search import SiteIndex
+from extras.management.commands.reindex import CHECKPOINT_CACHE_KEY
 from extras.models import CachedValue
-from netbox.search.backends import search_backend
+from netbox.context_managers import deferred_search_caching
+from netbox.search import LookupTypes
+from netbox.search.backends import PostgreSQLSearchBackend, search_backend
 
 
 class SearchBackendTestCase(TestCase):
@@ -111,6 +118,50 @@ class SearchBackendTestCase(TestCase):
             len(SiteIndex.fields)
         )
 
+    def test_deferred_cache_on_save(self):
+        """
+        Test that caching is deferred until exiting the deferred_search_caching() context.
+        """
+        content_type = ContentType.objects.get_for_model(Site)
+        site = Site(name='Site 4', slug='site-4', description='Fourth test site')
+
+        with deferred_search_caching():
+            site.save()
+            site.description = 'Fourth test site (updated)'
+            site.save()
+            self.assertFalse(
+                CachedValue.objects.filter(object_type=content_type, object_id=site.pk).exists()
+            )
+
+        self.assertEqual(
+            CachedValue.objects.filter(object_type=content_type, object_id=site.pk).count(),
+            len(SiteIndex.fields)
+        )
+        self.assertTrue(
+            CachedValue.objects.filter(
+                object_type=content_type,
+                object_id=site.pk,
+                field='description',
+                value='Fourth test site (updated)'
+            ).exists()
+        )
+
+    def test_deferred_remove_on_delete(self):
+        """
+        Test that the cached values of an object deleted within the deferred_search_caching() context are removed.
+        """
+        content_type = ContentType.objects.get_for_model(Site)
+        site = Site.objects.first()
+        site_id = site.pk
+        search_backend.cache(site)
+
+        with deferred_search_caching():
+            site.delete()
+
+        self.assertFalse(
+            CachedValue.objects.filter(object_type=content_type, object_id=site_id).exists()
+        )
+
     def test_remove_on_delete(self):
         """
         Test that any cached value for an object are automatically removed on delete().
@@ -151,3 +202,95 @@ class SearchBackendTestCase(TestCase):
         self.assertEqual(len(results), 1)
         results = search_backend.search('xxxxx')
         self.assertEqual(len(results), 0)
+
+
+class PostgreSQLSearchBackendTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sites = (
+            Site(name='Site 1', slug='site-1', description='First test site'),
+            Site(name='Site 2', slug='site-2', description='Second test site'),
+            Site(name='Site 3', slug='site-3', description='Third test site'),
+        )
+        Site.objects.bulk_create(sites)
+        search_backend.cache(sites)
+
+    def test_search(self):
+        """
+        Test various searches.
+        """
+        backend = PostgreSQLSearchBackend()
+
+        results = backend.search('site')
+        self.assertEqual(len(results), 3)
+        results = backend.search('first')
+        self.assertEqual(len(results), 1)
+        results = backend.search('xxxxx')
+        self.assertEqual(len(results), 0)
+
+    def test_search_word_prefix(self):
+        """
+        Test that "starts with" lookups match the beginning of any word within a value.
+        """
+        backend = PostgreSQLSearchBackend()
+
+        results = backend.search('sec', lookup=LookupTypes.STARTSWITH)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].object.name, 'Site 2')
+        results = backend.search('tes', lookup=LookupTypes.STARTSWITH)
+        self.assertEqual(len(results), 3)
+        results = backend.search('est', lookup=LookupTypes.STARTSWITH)
+        self.assertEqual(len(results), 0)
+
+    def test_search_ranking(self):
+        """
+        Test that the closest match for a given weight is returned first.
+        """
+        backend = PostgreSQLSearchBackend()
+
+        results = backend.search('site 3')
+        self.assertEqual(results[0].object.name, 'Site 3')
+
+
+class ReindexTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Site.objects.bulk_create([
+            Site(name=f'Site {i}', slug=f'site-{i}', description=f'Test site {i}') for i in range(1, 6)
+        ])
+
+    def tearDown(self):
+        cache.delete(CHECKPOINT_CACHE_KEY)
+
+    def get_entry_counts(self):
+        return {
+            site.pk: CachedValue.objects.filter(object_id=site.pk).count()
+            for site in Site.objects.all()
+        }
+
+    def test_reindex(self):
+        search_backend.cache(Site.objects.all())
+        expected = self.get_entry_counts()
+
+        call_command('reindex', 'dcim.site', chunk_size=2, range_size=3, stdout=StringIO())
+
+        self.assertEqual(self.get_entry_counts(), expected)
+        self.assertIsNone(cache.get(CHECKPOINT_CACHE_KEY))
+
+    def test_reindex_resume(self):
+        search_backend.cache(Site.objects.all())
+        expected = self.get_entry_counts()
+
+        # Simulate an interrupted reindexing operation: The range of sites 1-2 has been completed, and the range of
+        # sites 3-5 has been partially reindexed (only site 3 is cached)
+        sites = list(Site.objects.order_by('pk'))
+        search_backend.clear()
+        search_backend.cache(sites[:3])
+        cache.set(CHECKPOINT_CACHE_KEY, {'pending': {'dcim.site': [[sites[2].pk, sites[4].pk]]}}, None)
+
+        call_command('reindex', 'dcim.site', resume=True, chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(self.get_entry_counts(), expected)
+        self.assertIsNone(cache.get(CHECKPOINT_CACHE_KEY))
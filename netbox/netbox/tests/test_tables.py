@@ -1,5 +1,6 @@
 from django.template import Context, Template
 from django.test import TestCase
+from django_tables2.export import TableExport
 
 from dcim.models import Site
 from netbox.tables import NetBoxTable, columns
@@ -35,3 +36,45 @@ class TagColumnTest(TestCase):
             'table': table
         })
         template.render(context)
+
+
+class CSVExportTable(NetBoxTable):
+    tags = columns.TagColumn(url_name='dcim:site_list')
+
+    class Meta(NetBoxTable.Meta):
+        model = Site
+        fields = ('pk', 'name', 'description', 'tags',)
+        default_columns = fields
+
+
+class CSVExportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = create_tags('Alpha', 'Bravo')
+
+        sites = [
+            Site(name=f'Site {i}', slug=f'site-{i}', description=f'Comma, "quotes" {i}') for i in range(1, 6)
+        ]
+        Site.objects.bulk_create(sites)
+        for site in sites:
+            site.tags.add(*tags)
+
+    def test_as_csv(self):
+        """
+        Check that the streamed CSV output matches that of django-tables2's TableExport.
+        """
+        exclude_columns = {'pk', 'actions'}
+        table = CSVExportTable(Site.objects.prefetch_related('tags').order_by('pk'), orderable=False)
+        expected = TableExport(
+            export_format=TableExport.CSV,
+            table=table,
+            exclude_columns=exclude_columns
+        ).export()
+
+        table = CSVExportTable(Site.objects.prefetch_related('tags').order_by('pk'), orderable=False)
+        chunks = list(table.as_csv(exclude_columns=exclude_columns, chunk_size=2))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(''.join(chunks), expected)
+        self.assertIn('Site 1,"Comma, ""quotes"" 1",', expected)
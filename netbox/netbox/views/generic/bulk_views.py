@@ -2,6 +2,7 @@ import logging
 import re
 from copy import deepcopy
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRel
 from django.contrib.contenttypes.models import ContentType
@@ -10,18 +11,20 @@ from django.db import IntegrityError, router, transaction
 from django.db.models import ManyToManyField, ProtectedError, RestrictedError
 from django.db.models.fields.reverse_related import ManyToManyRel
 from django.forms import ModelMultipleChoiceField, MultipleHiddenInput
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext as _
-from django_tables2.export import TableExport
 from mptt.models import MPTTModel
 
 from core.models import ObjectType
 from core.signals import clear_events
 from extras.choices import CustomFieldUIEditableChoices
+from extras.jobs import ExportTemplateJob
 from extras.models import CustomField, ExportTemplate
+from netbox.context_managers import deferred_change_logging
+from netbox.denormalized import deferred_denormalized_updates
 from utilities.error_handlers import handle_protectederror
 from utilities.exceptions import AbortRequest, AbortTransaction, PermissionsViolation
 from utilities.forms import BulkRenameForm, ConfirmationForm, restrict_form_fields
@@ -78,7 +81,7 @@ class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
 
     def export_table(self, table, columns=None, filename=None):
         """
-        Export all table data in CSV format.
+        Export all table data in CSV format. The output is streamed to the client as it is rendered.
 
         Args:
             table: The Table instance to export
@@ -92,14 +95,15 @@ class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
             exclude_columns.update({
                 col for col in all_columns if col not in columns
             })
-        exporter = TableExport(
-            export_format=TableExport.CSV,
-            table=table,
-            exclude_columns=exclude_columns
-        )
-        return exporter.response(
-            filename=filename or f'netbox_{self.queryset.model._meta.verbose_name_plural}.csv'
+        filename = filename or f'netbox_{self.queryset.model._meta.verbose_name_plural}.csv'
+
+        response = StreamingHttpResponse(
+            table.as_csv(exclude_columns=exclude_columns),
+            content_type='text/csv; charset=utf-8'
         )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+
+        return response
 
     def export_template(self, template, request):
         """
@@ -109,8 +113,23 @@ class ObjectListView(BaseMultiObjectView, ActionsMixin, TableMixin):
             template: ExportTemplate instance
             request: The current request
         """
+        # Render very large exports in the background
+        threshold = settings.EXPORT_TEMPLATE_JOB_THRESHOLD
+        if threshold is not None and self.queryset.count() > threshold:
+            job = ExportTemplateJob.enqueue(
+                name=f'Export {template.name}',
+                user=request.user,
+                template_id=template.pk,
+                query=self.queryset.query
+            )
+            messages.info(
+                request,
+                _("The export is being rendered in the background. It can be downloaded once the job has completed.")
+            )
+            return redirect(job.get_absolute_url())
+
         try:
-            return template.render_to_response(queryset=self.queryset)
+            return template.render_to_response(queryset=self.queryset, stream=True)
         except Exception as e:
             messages.error(
                 request,
@@ -279,11 +298,12 @@ class BulkCreateView(GetReturnURLMixin, BaseMultiObjectView):
 
             try:
                 with transaction.atomic(using=router.db_for_write(model)):
-                    new_objs = self._create_objects(form, request)
+                    with deferred_change_logging():
+                        new_objs = self._create_objects(form, request)
 
-                    # Enforce object-level permissions
-                    if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
-                        raise PermissionsViolation
+                        # Enforce object-level permissions
+                        if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
+                            raise PermissionsViolation
 
                 # If we make it to this point, validation has succeeded on all new objects.
                 msg = f"Added {len(new_objs)} {model._meta.verbose_name_plural}"
@@ -501,12 +521,13 @@ class BulkImportView(GetReturnURLMixin, BaseMultiObjectView):
 
             try:
                 # Iterate through data and bind each record to a new model form instance.
-                with transaction.atomic(using=router.db_for_write(model)):
-                    new_objs = self.create_and_update_objects(form, request)
+                with transaction.atomic(using=router.db_for_write(model)), deferred_denormalized_updates():
+                    with deferred_change_logging():
+                        new_objs = self.create_and_update_objects(form, request)
 
-                    # Enforce object-level permissions
-                    if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
-                        raise PermissionsViolation
+                        # Enforce object-level permissions
+                        if self.queryset.filter(pk__in=[obj.pk for obj in new_objs]).count() != len(new_objs):
+                            raise PermissionsViolation
 
                 if new_objs:
                     msg = f"Imported {len(new_objs)} {model._meta.verbose_name_plural}"
@@ -681,13 +702,14 @@ class BulkEditView(GetReturnURLMixin, BaseMultiObjectView):
             if form.is_valid():
                 logger.debug("Form validation was successful")
                 try:
-                    with transaction.atomic(using=router.db_for_write(model)):
-                        updated_objects = self._update_objects(form, request)
+                    with transaction.atomic(using=router.db_for_write(model)), deferred_denormalized_updates():
+                        with deferred_change_logging():
+                            updated_objects = self._update_objects(form, request)
 
-                        # Enforce object-level permissions
-                        object_count = self.queryset.filter(pk__in=[obj.pk for obj in updated_objects]).count()
-                        if object_count != len(updated_objects):
-                            raise PermissionsViolation
+                            # Enforce object-level permissions
+                            object_count = self.queryset.filter(pk__in=[obj.pk for obj in updated_objects]).count()
+                            if object_count != len(updated_objects):
+                                raise PermissionsViolation
 
                     if updated_objects:
                         msg = f'Updated {len(updated_objects)} {model._meta.verbose_name_plural}'
@@ -779,25 +801,26 @@ class BulkRenameView(GetReturnURLMixin, BaseMultiObjectView):
             if form.is_valid():
                 try:
                     with transaction.atomic(using=router.db_for_write(self.queryset.model)):
-                        renamed_pks = self._rename_objects(form, selected_objects)
-
-                        if '_apply' in request.POST:
-                            for obj in selected_objects:
-                                obj.name = obj.new_name
-                                obj.save()
-
-                            # Enforce constrained permissions
-                            if self.queryset.filter(pk__in=renamed_pks).count() != len(selected_objects):
-                                raise PermissionsViolation
-
-                            messages.success(
-                                request,
-                                _("Renamed {count} {object_type}").format(
-                                    count=len(selected_objects),
-                                    object_type=self.queryset.model._meta.verbose_name_plural
+                        with deferred_change_logging():
+                            renamed_pks = self._rename_objects(form, selected_objects)
+
+                            if '_apply' in request.POST:
+                                for obj in selected_objects:
+                                    obj.name = obj.new_name
+                                    obj.save()
+
+                                # Enforce constrained permissions
+                                if self.queryset.filter(pk__in=renamed_pks).count() != len(selected_objects):
+                                    raise PermissionsViolation
+
+                                messages.success(
+                                    request,
+                                    _("Renamed {count} {object_type}").format(
+                                        count=len(selected_objects),
+                                        object_type=self.queryset.model._meta.verbose_name_plural
+                                    )
                                 )
-                            )
-                            return redirect(self.get_return_url(request))
+                                return redirect(self.get_return_url(request))
 
                 except IntegrityError as e:
                     messages.error(self.request, ", ".join(e.args))
@@ -876,11 +899,12 @@ class BulkDeleteView(GetReturnURLMixin, BaseMultiObjectView):
                 deleted_count = queryset.count()
                 try:
                     with transaction.atomic(using=router.db_for_write(model)):
-                        for obj in queryset:
-                            # Take a snapshot of change-logged models
-                            if hasattr(obj, 'snapshot'):
-                                obj.snapshot()
-                            obj.delete()
+                        with deferred_change_logging():
+                            for obj in queryset:
+                                # Take a snapshot of change-logged models
+                                if hasattr(obj, 'snapshot'):
+                                    obj.snapshot()
+                                obj.delete()
 
                 except (ProtectedError, RestrictedError) as e:
                     logger.info(f"Caught {type(e)} while attempting to delete objects")
@@ -981,33 +1005,34 @@ class BulkComponentCreateView(GetReturnURLMixin, BaseMultiObjectView):
 
                 try:
                     with transaction.atomic(using=router.db_for_write(self.queryset.model)):
-
-                        for obj in data['pk']:
-
-                            pattern_count = len(replication_data[form.replication_fields[0]])
-                            for i in range(pattern_count):
-                                component_data = {
-                                    self.parent_field: obj.pk
-                                }
-                                component_data.update(data)
-                                for field, values in replication_data.items():
-                                    if values:
-                                        component_data[field] = values[i]
-
-                                component_form = self.model_form(component_data)
-                                if component_form.is_valid():
-                                    instance = component_form.save()
-                                    logger.debug(f"Created {instance} on {instance.parent_object}")
-                                    new_components.append(instance)
-                                else:
-                                    for field, errors in component_form.errors.as_data().items():
-                                        for e in errors:
-                                            form.add_error(field, '{}: {}'.format(obj, ', '.join(e)))
-
-                        # Enforce object-level permissions
-                        component_ids = [obj.pk for obj in new_components]
-                        if self.queryset.filter(pk__in=component_ids).count() != len(new_components):
-                            raise PermissionsViolation
+                        with deferred_change_logging():
+
+                            for obj in data['pk']:
+
+                                pattern_count = len(replication_data[form.replication_fields[0]])
+                                for i in range(pattern_count):
+                                    component_data = {
+                                        self.parent_field: obj.pk
+                                    }
+                                    component_data.update(data)
+                                    for field, values in replication_data.items():
+                                        if values:
+                                            component_data[field] = values[i]
+
+                                    component_form = self.model_form(component_data)
+                                    if component_form.is_valid():
+                                        instance = component_form.save()
+                                        logger.debug(f"Created {instance} on {instance.parent_object}")
+                                        new_components.append(instance)
+                                    else:
+                                        for field, errors in component_form.errors.as_data().items():
+                                            for e in errors:
+                                                form.add_error(field, '{}: {}'.format(obj, ', '.join(e)))
+
+                            # Enforce object-level permissions
+                            component_ids = [obj.pk for obj in new_components]
+                            if self.queryset.filter(pk__in=component_ids).count() != len(new_components):
+                                raise PermissionsViolation
 
                 except IntegrityError:
                     clear_events.send(sender=self)
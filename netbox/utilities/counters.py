@@ -1,7 +1,11 @@
+from collections import defaultdict
+from contextlib import contextmanager
+
 from django.apps import apps
 from django.db.models import F, Count, OuterRef, Subquery
 from django.db.models.signals import post_delete, post_save, pre_delete
 
+from netbox.context import counters_queue, deferred_queue
 from netbox.registry import registry
 from .fields import CounterCacheField
 
@@ -13,17 +17,38 @@ def get_counters_for_model(model):
     return registry['counter_fields'][model].items()
 
 
+def get_counter_mappings():
+    """
+    Return a mapping of each model which has one or more counter fields to the related query name for each of its
+    counters. For example, {Device: {'interface_count': 'interfaces', ...}, ...}
+    """
+    mappings = defaultdict(dict)
+
+    for model, field_mappings in registry['counter_fields'].items():
+        for field_name, counter_name in field_mappings.items():
+            fk_field = model._meta.get_field(field_name)        # Interface.device
+            parent_model = fk_field.related_model               # Device
+            related_query_name = fk_field.related_query_name()  # 'interfaces'
+            mappings[parent_model][counter_name] = related_query_name
+
+    return mappings
+
+
 def update_counter(model, pk, counter_name, value):
     """
     Increment or decrement a counter field on an object identified by its model and primary key (PK). Positive values
-    will increment; negative values will decrement.
+    will increment; negative values will decrement. If counter updates are being deferred (see
+    deferred_counter_updates()), the object is instead queued for its counters to be recalculated.
     """
+    if (queue := counters_queue.get()) is not None:
+        queue[model].add(pk)
+        return
     model.objects.filter(pk=pk).update(
         **{counter_name: F(counter_name) + value}
     )
 
 
-def update_counts(model, field_name, related_query):
+def update_counts(model, field_name, related_query, pks=None):
     """
     Perform a bulk update for the given model and counter field. For example,
 
@@ -32,15 +57,46 @@ def update_counts(model, field_name, related_query):
     will effectively set
 
         Device.objects.update(_interface_count=Count('interfaces'))
+
+    Optionally, the update may be limited to the objects with the specified primary keys.
     """
-    subquery = Subquery(
-        model.objects.filter(pk=OuterRef('pk')).annotate(_count=Count(related_query)).values('_count')
-    )
-    return model.objects.update(**{
-        field_name: subquery
+    return update_all_counts(model, {field_name: related_query}, pks=pks)
+
+
+def update_all_counts(model, counters, pks=None):
+    """
+    Recalculate several counter fields for the given model in a single query. Counters are specified as a mapping of
+    counter field names to related query names (see get_counter_mappings()). Optionally, the update may be limited to
+    the objects with the specified primary keys.
+    """
+    queryset = model.objects.all() if pks is None else model.objects.filter(pk__in=pks)
+    return queryset.update(**{
+        field_name: Subquery(
+            model.objects.filter(pk=OuterRef('pk')).annotate(_count=Count(related_query)).values('_count')
+        )
+        for field_name, related_query in counters.items()
     })
 
 
+@contextmanager
+def deferred_counter_updates():
+    """
+    Defer the updating of counter fields while creating, modifying, or deleting many tracked objects. Rather than
+    incrementing or decrementing a counter for each change, the counters of all affected parent objects are
+    recalculated upon exit, using a single query per parent model. May be nested; only the outermost context applies
+    the updates.
+
+    Updates are not applied if an exception is raised within the context.
+    """
+    def flush(queue):
+        mappings = get_counter_mappings()
+        for model, pks in queue.items():
+            update_all_counts(model, mappings[model], pks=pks)
+
+    with deferred_queue(counters_queue, lambda: defaultdict(set), flush):
+        yield
+
+
 #
 # Signal handlers
 #
@@ -63,6 +119,9 @@ def post_save_receiver(sender, instance, created, **kwargs):
 
 
 def pre_delete_receiver(sender, instance, origin, **kwargs):
+    # Deferred counter updates recalculate counts from scratch, so there's no need to check for prior removal
+    if counters_queue.get() is not None:
+        return
     model = instance._meta.model
     if not model.objects.filter(pk=instance.pk).exists():
         instance._previously_removed = True
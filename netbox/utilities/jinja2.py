@@ -1,13 +1,32 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
 from django.apps import apps
+from django.conf import settings
 from jinja2 import BaseLoader, TemplateNotFound
 from jinja2.meta import find_referenced_templates
 from jinja2.sandbox import SandboxedEnvironment
+from prometheus_client import Counter
 
 from netbox.config import get_config
 
 __all__ = (
     'DataFileLoader',
+    'TemplateCache',
+    'compile_jinja2',
     'render_jinja2',
+    'template_cache',
+)
+
+template_cache_hits = Counter(
+    'netbox_jinja2_template_cache_hits',
+    'Number of compiled Jinja2 templates retrieved from the template cache'
+)
+template_cache_misses = Counter(
+    'netbox_jinja2_template_cache_misses',
+    'Number of Jinja2 templates compiled due to their absence from the template cache'
 )
 
 
@@ -45,13 +64,112 @@ class DataFileLoader(BaseLoader):
         self._template_cache.update(templates)
 
 
+class TemplateCache:
+    """
+    A bounded, thread-safe LRU cache of compiled Jinja2 templates. Templates are keyed by a hash of their source code
+    and their environment parameters (along with the revision of the DataFile from which they are sourced, if any), so
+    a modified template is never served from the cache. Entries may also be associated with the object to which the
+    template belongs, so that they can be evicted promptly once the object is modified or deleted.
+    """
+    def __init__(self, maxsize=None):
+        self._maxsize = maxsize
+        self._templates = OrderedDict()
+        self._owners = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return settings.JINJA2_TEMPLATE_CACHE_SIZE if self._maxsize is None else self._maxsize
+
+    @staticmethod
+    def get_key(template_code, environment_params=None, data_file=None):
+        # Environment parameters may include imported callables; represent these by name
+        params = json.dumps(environment_params or {}, sort_keys=True, default=repr)
+        if data_file:
+            data_file = (data_file.pk, data_file.hash, data_file.source.last_synced)
+        return (
+            hashlib.sha256(template_code.encode()).hexdigest(),
+            hashlib.sha256(params.encode()).hexdigest(),
+            data_file,
+        )
+
+    @staticmethod
+    def get_owner_key(owner):
+        return owner._meta.label, owner.pk
+
+    def get(self, template_code, environment_params=None, data_file=None, owner=None):
+        """
+        Return the compiled template for the given source code and environment parameters, compiling it if necessary.
+
+        Args:
+            template_code: The template's source code
+            environment_params: Any parameters to pass when constructing the Jinja2 environment
+            data_file: The DataFile from which the template is sourced (if any)
+            owner: The object to which the template belongs (if any)
+        """
+        if not self.maxsize or (environment_params and 'loader' in environment_params):
+            return compile_jinja2(template_code, environment_params, data_file)
+
+        key = self.get_key(template_code, environment_params, data_file)
+        with self._lock:
+            template = self._templates.get(key)
+            if template is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+        if template is not None:
+            template_cache_hits.inc()
+            return template
+
+        template = compile_jinja2(template_code, dict(environment_params or {}), data_file)
+        template_cache_misses.inc()
+
+        with self._lock:
+            self.misses += 1
+            self._templates[key] = template
+            if owner is not None and owner.pk is not None:
+                self._owners.setdefault(self.get_owner_key(owner), set()).add(key)
+            while len(self._templates) > self.maxsize:
+                self._templates.popitem(last=False)
+
+        return template
+
+    def invalidate(self, owner):
+        """
+        Evict all templates belonging to the specified object. Note that this affects only the current process.
+        """
+        with self._lock:
+            for key in self._owners.pop(self.get_owner_key(owner), ()):
+                self._templates.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._owners.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        """
+        Return the cache's statistics.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._templates),
+                'maxsize': self.maxsize,
+            }
+
+
 #
 # Utility functions
 #
 
-def render_jinja2(template_code, context, environment_params=None, data_file=None):
+def compile_jinja2(template_code, environment_params=None, data_file=None):
     """
-    Render a Jinja2 template with the provided context. Return the rendered content.
+    Compile a Jinja2 template within a new sandboxed environment. Return the compiled Template, which may be rendered
+    any number of times.
     """
     environment_params = environment_params or {}
 
@@ -69,7 +187,18 @@ def render_jinja2(template_code, context, environment_params=None, data_file=Non
     environment.filters.update(get_config().JINJA2_FILTERS)
 
     if data_file:
-        template = environment.get_template(data_file.path)
-    else:
-        template = environment.from_string(source=template_code)
+        return environment.get_template(data_file.path)
+    return environment.from_string(source=template_code)
+
+
+def render_jinja2(template_code, context, environment_params=None, data_file=None, owner=None):
+    """
+    Render a Jinja2 template with the provided context. Return the rendered content. Compiled templates are retrieved
+    from the process-wide template cache where possible.
+    """
+    template = template_cache.get(template_code, environment_params, data_file, owner=owner)
     return template.render(**context)
+
+
+# Process-wide cache of compiled templates
+template_cache = TemplateCache()
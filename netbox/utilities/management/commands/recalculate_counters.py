@@ -0,0 +1,60 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from utilities.counters import get_counter_mappings, update_all_counts
+from utilities.parallel import iterate_pks, run_parallel
+
+
+def recalculate_chunk(label, pks):
+    """
+    Recalculate all counter fields for the objects of the given model with the specified primary keys. Returns the
+    number of objects updated.
+    """
+    model = apps.get_model(label)
+    return update_all_counts(model, get_counter_mappings()[model], pks=pks)
+
+
+class Command(BaseCommand):
+    help = "Recalculate all cached counter fields in chunks, optionally in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'args', metavar='app_label.ModelName', nargs='*',
+            help="One or more specific models with counter fields to update (default: all)"
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help="Number of worker processes among which chunks are divided (default: 1)"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help="Number of objects updated per query (default: 1000)"
+        )
+
+    def handle(self, *model_names, **options):
+        mappings = get_counter_mappings()
+        models = list(mappings)
+        if model_names:
+            try:
+                models = [apps.get_model(label) for label in model_names]
+            except (LookupError, ValueError) as e:
+                raise CommandError(e)
+            if invalid := [model for model in models if model not in mappings]:
+                raise CommandError(f"Model {invalid[0]._meta.label} has no counter fields.")
+
+        start_time = time.monotonic()
+        for model in models:
+            counters = ', '.join(mappings[model])
+            self.stdout.write(f"Recalculating {model._meta.verbose_name} counters ({counters})...")
+            tasks = [
+                (model._meta.label, pks)
+                for pks in iterate_pks(model.objects.all(), chunk_size=options['chunk_size'])
+            ]
+            updated_count = sum(run_parallel(recalculate_chunk, tasks, workers=options['workers']))
+            self.stdout.write(f"  Updated {updated_count} {model._meta.verbose_name_plural}")
+
+        elapsed = time.monotonic() - start_time
+        self.stdout.write(f"Completed in {elapsed:.1f} seconds.")
+        self.stdout.write(self.style.SUCCESS('Finished.'))
@@ -0,0 +1,48 @@
+import multiprocessing
+
+from django.db import connections
+
+__all__ = (
+    'iterate_pks',
+    'run_parallel',
+)
+
+
+def iterate_pks(queryset, chunk_size=1000):
+    """
+    Iterate through the primary keys of all objects in a queryset using keyset pagination, yielding a list of PKs for
+    each chunk. Unlike OFFSET-based pagination, the cost of retrieving each chunk remains constant.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+
+    while True:
+        qs = queryset.filter(pk__gt=last_pk) if last_pk is not None else queryset
+        if not (pks := list(qs[:chunk_size])):
+            return
+        yield pks
+        last_pk = pks[-1]
+
+
+def run_parallel(func, tasks, workers=1):
+    """
+    Call func() with the arguments of each task (an iterable of tuples), yielding each result as it becomes
+    available. If more than one worker is requested, tasks are distributed among a pool of forked worker processes,
+    and results are yielded in order of completion.
+
+    Each worker process establishes its own database connections: Any connections held by the calling process are
+    closed before forking, and will be reopened automatically upon next use.
+    """
+    if workers <= 1:
+        for args in tasks:
+            yield func(*args)
+        return
+
+    connections.close_all()
+    with multiprocessing.get_context('fork').Pool(processes=workers) as pool:
+        yield from pool.imap_unordered(_call, [(func, args) for args in tasks])
+
+
+def _call(task):
+    func, args = task
+    return func(*args)
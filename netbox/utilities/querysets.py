@@ -4,11 +4,38 @@ from users.constants import CONSTRAINT_TOKEN_USER
 from utilities.permissions import get_permission_for_model, permission_is_exempt, qs_filter_from_constraints
 
 __all__ = (
+    'ChunkedQuerySet',
     'RestrictedPrefetch',
     'RestrictedQuerySet',
 )
 
 
+class ChunkedQuerySet:
+    """
+    Wraps a QuerySet such that iterating over it retrieves objects in chunks (using a server-side cursor, where
+    supported) without caching them, so that memory consumption remains constant regardless of the number of objects.
+    All other attributes are proxied to the underlying QuerySet.
+    """
+    def __init__(self, queryset, chunk_size=1000):
+        self.queryset = queryset
+        self.chunk_size = chunk_size
+
+    def __iter__(self):
+        return self.queryset.iterator(chunk_size=self.chunk_size)
+
+    def __len__(self):
+        return self.queryset.count()
+
+    def __bool__(self):
+        return self.queryset.exists()
+
+    def __getitem__(self, key):
+        return self.queryset[key]
+
+    def __getattr__(self, name):
+        return getattr(self.queryset, name)
+
+
 class RestrictedPrefetch(Prefetch):
     """
     Extend Django's Prefetch to accept a user and action to be passed to the
@@ -1,8 +1,12 @@
+import datetime
+import decimal
 import json
 
 from django.apps import apps
 from django.contrib.contenttypes.models import ContentType
 from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Field
 
 from extras.utils import is_taggable
 
@@ -12,11 +16,82 @@ __all__ = (
 )
 
 
+# Types which Django's serializer passes through as-is (see django.utils.encoding.is_protected_type()), and which are
+# then either preserved by its JSON round trip or converted to strings by DjangoJSONEncoder
+_PRIMITIVE_TYPES = (type(None), bool, int, float)
+_ENCODED_TYPES = (decimal.Decimal, datetime.datetime, datetime.date, datetime.time)
+
+_json_encoder = DjangoJSONEncoder()
+
+# Field value extractors, cached by model
+_field_extractors = {}
+
+
+def _get_value_extractor(field):
+    """
+    Return a function which extracts the serialized value of a field from an object, replicating the conversion
+    applied by Django's JSON serializer (including its final round trip through JSON).
+    """
+    attname = field.attname
+    # Field.value_to_string() returns str(value) unless overridden
+    is_plain = type(field).value_to_string is Field.value_to_string
+
+    def extract(obj):
+        value = getattr(obj, attname)
+        if is_plain and type(value) is str:
+            return value
+        if isinstance(value, _PRIMITIVE_TYPES):
+            return value
+        if isinstance(value, _ENCODED_TYPES):
+            return _json_encoder.default(value)
+        value = field.value_to_string(obj)
+        if isinstance(value, str):
+            return value
+        return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+    return extract
+
+
+def _get_m2m_extractor(field):
+    """
+    Return a function which extracts the primary keys of the objects assigned to a many-to-many field, using any
+    prefetched objects.
+    """
+    name = field.name
+    pk_extractor = _get_value_extractor(field.remote_field.model._meta.pk)
+
+    def extract(obj):
+        related_objects = getattr(obj, '_prefetched_objects_cache', {}).get(name)
+        if related_objects is None:
+            related_objects = getattr(obj, name).select_related(None).only('pk')
+        return [pk_extractor(related) for related in related_objects]
+
+    return extract
+
+
+def get_field_extractors(model):
+    """
+    Return a list of (field name, extractor) pairs for the fields of a model included by Django's serializer. Each
+    extractor is a function which returns the field's serialized value for a given object.
+    """
+    if model not in _field_extractors:
+        opts = model._meta.concrete_model._meta
+        extractors = [
+            (field.name, _get_value_extractor(field)) for field in opts.local_fields if field.serialize
+        ]
+        extractors.extend(
+            (field.name, _get_m2m_extractor(field)) for field in opts.local_many_to_many
+            if field.serialize and field.remote_field.through._meta.auto_created
+        )
+        _field_extractors[model] = extractors
+    return _field_extractors[model]
+
+
 def serialize_object(obj, resolve_tags=True, extra=None, exclude=None):
     """
-    Return a generic JSON representation of an object using Django's built-in serializer. (This is used for things like
-    change logging, not the REST API.) Optionally include a dictionary to supplement the object data. A list of keys
-    can be provided to exclude them from the returned dictionary.
+    Return a generic JSON representation of an object, identical to that produced by Django's built-in JSON serializer.
+    (This is used for things like change logging, not the REST API.) Optionally include a dictionary to supplement the
+    object data. A list of keys can be provided to exclude them from the returned dictionary.
 
     Args:
         obj: The object to serialize
@@ -25,8 +100,8 @@ def serialize_object(obj, resolve_tags=True, extra=None, exclude=None):
             override object attributes.
         exclude: An iterable of attributes to exclude from the serialized output
     """
-    json_str = serializers.serialize('json', [obj])
-    data = json.loads(json_str)[0]['fields']
+    # Build the field data directly, as Django's JSON serializer would (but without encoding and decoding JSON)
+    data = {name: extract(obj) for name, extract in get_field_extractors(type(obj))}
     exclude = exclude or []
 
     # Include custom_field_data as "custom_fields"
@@ -1,9 +1,12 @@
 import json
 import logging
+import os
 import re
 from contextlib import contextmanager
+from unittest import skipUnless
 
 from django.contrib.auth.models import Permission
+from django.test import tag
 from django.utils.text import slugify
 
 from core.models import ObjectType
@@ -117,6 +120,27 @@ def disable_logging(level=logging.CRITICAL):
     logging.disable(logging.NOTSET)
 
 
+#
+# Benchmarks
+#
+
+benchmark_logger = logging.getLogger('netbox.tests.benchmarks')
+
+
+def benchmark(test_case):
+    """
+    Designate a test case (or test method) as a benchmark. Benchmarks are tagged "benchmark", and are skipped unless
+    the NETBOX_BENCHMARKS environment variable is set. Results should be reported via benchmark_logger.
+    """
+    enabled = bool(os.environ.get('NETBOX_BENCHMARKS'))
+    if enabled and not benchmark_logger.handlers:
+        benchmark_logger.addHandler(logging.StreamHandler())
+        benchmark_logger.setLevel(logging.INFO)
+
+    test_case = tag('benchmark')(test_case)
+    return skipUnless(enabled, "Benchmarks are run only if NETBOX_BENCHMARKS is set")(test_case)
+
+
 #
 # Custom field testing
 #
@@ -1,7 +1,13 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from dcim.models import *
+from utilities.counters import deferred_counter_updates
 from utilities.testing.base import TestCase
 from utilities.testing.utils import create_test_device
 
@@ -102,3 +108,56 @@ class CountersTest(TestCase):
         self.client.post(reverse("dcim:inventoryitem_bulk_delete"), data)
         device1.refresh_from_db()
         self.assertEqual(device1.inventory_item_count, 0)
+
+    def test_deferred_counter_updates(self):
+        """
+        Counters should be updated only once a deferred_counter_updates() context has exited.
+        """
+        device1, device2 = Device.objects.all()
+
+        with deferred_counter_updates():
+            Interface.objects.create(device=device1, name='Interface 5')
+            Interface.objects.create(device=device1, name='Interface 6')
+            Interface.objects.get(name='Interface 3').delete()
+            interface4 = Interface.objects.get(name='Interface 4')
+            interface4.device = device1
+            interface4.save()
+
+            device1.refresh_from_db()
+            device2.refresh_from_db()
+            self.assertEqual(device1.interface_count, 2)
+            self.assertEqual(device2.interface_count, 2)
+
+        device1.refresh_from_db()
+        device2.refresh_from_db()
+        self.assertEqual(device1.interface_count, 5)
+        self.assertEqual(device2.interface_count, 0)
+
+    def test_interface_count_instantiation(self):
+        """
+        Counters should reflect the components instantiated from a device type.
+        """
+        device1 = Device.objects.first()
+        InterfaceTemplate.objects.bulk_create([
+            InterfaceTemplate(device_type=device1.device_type, name=f'Interface {i}', type='1000base-t')
+            for i in range(10)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            device3 = create_test_device('Device 3')
+        device3.refresh_from_db()
+        self.assertEqual(device3.interface_count, 10)
+
+        # The device's counters should be updated by a single query, rather than once per interface
+        counter_updates = [
+            q['sql'] for q in ctx.captured_queries
+            if q['sql'].startswith('UPDATE "dcim_device"') and '"interface_count"' in q['sql']
+        ]
+        self.assertEqual(len(counter_updates), 1)
+
+    def test_recalculate_counters(self):
+        Device.objects.update(interface_count=0)
+
+        call_command('recalculate_counters', 'dcim.Device', chunk_size=1, stdout=StringIO())
+        device1, device2 = Device.objects.all()
+        self.assertEqual(device1.interface_count, 2)
+        self.assertEqual(device2.interface_count, 2)
@@ -0,0 +1,43 @@
+from django.test import TestCase
+
+from extras.models import CustomLink
+from utilities.jinja2 import TemplateCache
+
+
+class TemplateCacheTestCase(TestCase):
+
+    def test_reuse_compiled_template(self):
+        cache = TemplateCache(maxsize=10)
+        template = cache.get('Hello {{ name }}')
+
+        self.assertIs(cache.get('Hello {{ name }}'), template)
+        self.assertIsNot(cache.get('Hello {{ name }}', {'trim_blocks': True}), template)
+        self.assertIsNot(cache.get('Goodbye {{ name }}'), template)
+        self.assertEqual(template.render(name='world'), 'Hello world')
+        self.assertEqual(cache.info(), {'hits': 1, 'misses': 3, 'size': 3, 'maxsize': 10})
+
+    def test_evict_least_recently_used(self):
+        cache = TemplateCache(maxsize=2)
+        template1 = cache.get('Template 1')
+        template2 = cache.get('Template 2')
+        cache.get('Template 1')
+        cache.get('Template 3')
+
+        self.assertEqual(cache.info()['size'], 2)
+        self.assertIs(cache.get('Template 1'), template1)
+        self.assertIsNot(cache.get('Template 2'), template2)
+
+    def test_invalidate_owner(self):
+        cache = TemplateCache(maxsize=10)
+        owner = CustomLink(pk=1, name='Custom Link 1')
+        template = cache.get('{{ object.name }}', owner=owner)
+        cache.get('{{ object.pk }}')
+
+        cache.invalidate(owner)
+        self.assertEqual(cache.info()['size'], 1)
+        self.assertIsNot(cache.get('{{ object.name }}', owner=owner), template)
+
+    def test_cache_disabled(self):
+        cache = TemplateCache(maxsize=0)
+        self.assertIsNot(cache.get('Hello {{ name }}'), cache.get('Hello {{ name }}'))
+        self.assertEqual(cache.info()['size'], 0)
@@ -0,0 +1,120 @@
+import json
+import time
+
+from django.core import serializers
+from django.test import TestCase
+
+from dcim.models import Device, Interface
+from extras.models import Tag
+from ipam.models import IPAddress, VLAN
+from utilities.serialization import serialize_object
+from utilities.testing import benchmark, benchmark_logger, create_test_device
+
+
+def serialize_object_legacy(obj):
+    """
+    Serialize an object's fields using Django's JSON serializer (the reference implementation).
+    """
+    data = json.loads(serializers.serialize('json', [obj]))[0]['fields']
+    if 'custom_field_data' in data:
+        data['custom_fields'] = data.pop('custom_field_data')
+    data['tags'] = sorted([tag.name for tag in obj.tags.all()])
+    return data
+
+
+class SerializeObjectTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        tags = Tag.objects.bulk_create((
+            Tag(name='Tag 1', slug='tag-1'),
+            Tag(name='Tag 2', slug='tag-2'),
+        ))
+        vlans = VLAN.objects.bulk_create((
+            VLAN(name='VLAN 1', vid=1),
+            VLAN(name='VLAN 2', vid=2),
+        ))
+
+        device = create_test_device('Device 1')
+        device.description = 'Test device'
+        device.comments = 'Comments with "quotes" and unicode: é'
+        device.custom_field_data = {'foo': {'bar': [1, 2]}}
+        device.save()
+        device.tags.set(tags)
+
+        interface = Interface.objects.create(
+            device=device,
+            name='Interface 1',
+            mtu=1500,
+            mode='tagged',
+            tx_power=10,
+            rf_channel_frequency='2412.00'
+        )
+        interface.tagged_vlans.set(vlans)
+        interface.tags.set(tags[:1])
+
+        ip_address = IPAddress.objects.create(address='192.0.2.1/24', assigned_object=interface, dns_name='test')
+        ip_address.tags.set(tags)
+
+    def assertSerializationMatches(self, obj):
+        data = serialize_object(obj)
+        self.assertEqual(json.dumps(data), json.dumps(serialize_object_legacy(obj)))
+
+    def test_serialize_device(self):
+        self.assertSerializationMatches(Device.objects.get())
+
+    def test_serialize_interface(self):
+        self.assertSerializationMatches(Interface.objects.get())
+        self.assertSerializationMatches(Interface.objects.prefetch_related('tagged_vlans', 'tags').get())
+
+    def test_serialize_ipaddress(self):
+        self.assertSerializationMatches(IPAddress.objects.get())
+
+    def test_exclude_and_extra(self):
+        data = serialize_object(Device.objects.get(), extra={'foo': 1}, exclude=['description', 'last_updated'])
+        self.assertNotIn('description', data)
+        self.assertNotIn('last_updated', data)
+        self.assertEqual(data['foo'], 1)
+
+
+@benchmark
+class SerializeObjectBenchmarkTestCase(TestCase):
+    """
+    Compare the rate at which objects are serialized by serialize_object() against that of Django's JSON serializer.
+    """
+    OBJECT_COUNT = 100
+    ITERATIONS = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        device = create_test_device('Device 1')
+        interfaces = Interface.objects.bulk_create([
+            Interface(device=device, name=f'Interface {i}', type='1000base-t') for i in range(cls.OBJECT_COUNT)
+        ])
+        IPAddress.objects.bulk_create([
+            IPAddress(address=f'192.0.2.{i}/24', assigned_object=interface)
+            for i, interface in enumerate(interfaces, start=1)
+        ])
+
+    def test_serialization_rate(self):
+        for queryset in (
+            Device.objects.prefetch_related('tags'),
+            Interface.objects.prefetch_related('tags', 'tagged_vlans', 'vdcs', 'wireless_lans'),
+            IPAddress.objects.prefetch_related('tags'),
+        ):
+            objects = list(queryset)
+            count = len(objects) * self.ITERATIONS
+
+            start = time.perf_counter()
+            expected = [serialize_object_legacy(obj) for _ in range(self.ITERATIONS) for obj in objects]
+            legacy_rate = count / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            results = [serialize_object(obj) for _ in range(self.ITERATIONS) for obj in objects]
+            rate = count / (time.perf_counter() - start)
+
+            self.assertEqual(results, expected)
+            benchmark_logger.info(
+                f"{queryset.model._meta.verbose_name} serialization: {legacy_rate:.0f} objects/sec (Django "
+                f"serializer), {rate:.0f} objects/sec (serialize_object)"
+            )
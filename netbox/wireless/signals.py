@@ -57,5 +57,4 @@ def nullify_connected_interfaces(instance, **kwargs):
         Interface.objects.filter(pk=instance.interface_b.pk).update(wireless_link=None)
 
     # Delete and retrace any dependent cable paths
-    for cablepath in CablePath.objects.filter(_nodes__contains=instance):
-        cablepath.delete()
+    CablePath.objects.filter(_nodes__contains=instance).delete()